@@ -0,0 +1,175 @@
+"""
+test_chunking.py
+Unit tests for the streaming chunker
+Checks iter_merged_small_chunks / iter_smart_chunks against the list-based
+merge they replaced: small-chunk merging, has_more and index renumbering
+"""
+
+import os
+import sys
+import copy
+import random
+from itertools import islice
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline.chunking import (
+    iter_smart_chunks,
+    iter_merged_small_chunks,
+    create_smart_chunks,
+    merge_small_chunks
+)
+
+
+def reference_merge_small_chunks(chunks, min_size):
+    """The list-based merge_small_chunks before chunking was streamed"""
+    if not chunks:
+        return []
+
+    merged_chunks = []
+    i = 0
+
+    while i < len(chunks):
+        current_chunk = chunks[i]
+
+        if len(current_chunk['text']) >= min_size or i == len(chunks) - 1:
+            merged_chunks.append(current_chunk)
+            i += 1
+        else:
+            if i + 1 < len(chunks):
+                next_chunk = chunks[i + 1]
+                merged_chunks.append({
+                    "index": current_chunk['index'],
+                    "text": current_chunk['text'] + "\n\n" + next_chunk['text'],
+                    "start_pos": current_chunk.get('start_pos', 0),
+                    "end_pos": next_chunk.get('end_pos', 0),
+                    "overlap_previous": current_chunk['overlap_previous'],
+                    "has_more": next_chunk['has_more']
+                })
+                i += 2
+            else:
+                merged_chunks.append(current_chunk)
+                i += 1
+
+    for idx, chunk in enumerate(merged_chunks):
+        chunk['index'] = idx
+        if idx == len(merged_chunks) - 1:
+            chunk['has_more'] = False
+
+    return merged_chunks
+
+
+def make_chunks(sizes):
+    """Raw chunks with the given text lengths, as _iter_raw_chunks yields them"""
+    chunks = []
+    pos = 0
+    for idx, size in enumerate(sizes):
+        chunks.append({
+            "index": idx,
+            "text": chr(ord('a') + idx % 26) * size,
+            "start_pos": pos,
+            "end_pos": pos + size,
+            "overlap_previous": "",
+            "has_more": idx < len(sizes) - 1
+        })
+        pos += size
+    return chunks
+
+
+def make_document(rng, paragraphs):
+    """Random text of short and long paragraphs (some longer than chunk_size)"""
+    words = ["graph", "node", "vector", "model", "data", "learning", "query", "index"]
+    parts = []
+    for _ in range(paragraphs):
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 15))) + rng.choice(".!?")
+            for _ in range(rng.randint(1, 40))
+        ]
+        parts.append(" ".join(sentences))
+    return ("\n\n" + "\n" * rng.randint(0, 2)).join(parts)
+
+
+# ============================================================================
+# TESTS FOR iter_merged_small_chunks
+# ============================================================================
+
+class TestMergeSmallChunks:
+    def test_small_chunk_merges_into_next(self):
+        """A chunk under min_size absorbs the following chunk"""
+        merged = list(iter_merged_small_chunks(make_chunks([50, 300, 400]), 200))
+
+        assert [len(c['text']) for c in merged] == [50 + 2 + 300, 400]
+        assert merged[0]['start_pos'] == 0
+        assert merged[0]['end_pos'] == 350
+
+    def test_indices_renumbered_and_last_has_no_more(self):
+        """Merged output is numbered 0..n-1 and only the last has has_more=False"""
+        merged = list(iter_merged_small_chunks(make_chunks([10, 10, 300, 10, 300, 10]), 200))
+
+        assert [c['index'] for c in merged] == list(range(len(merged)))
+        assert [c['has_more'] for c in merged] == [True] * (len(merged) - 1) + [False]
+
+    def test_trailing_small_chunk_is_kept(self):
+        """The last chunk stays even when it is under min_size"""
+        merged = list(iter_merged_small_chunks(make_chunks([300, 20]), 200))
+
+        assert [len(c['text']) for c in merged] == [300, 20]
+        assert merged[-1]['has_more'] is False
+
+    def test_empty_input(self):
+        assert list(iter_merged_small_chunks([], 200)) == []
+        assert merge_small_chunks([], 200) == []
+
+    def test_matches_list_version_on_random_inputs(self):
+        """Same output as the previous list implementation"""
+        rng = random.Random(1234)
+        for _ in range(300):
+            sizes = [rng.choice([5, 50, 150, 199, 200, 201, 400]) for _ in range(rng.randint(1, 12))]
+            chunks = make_chunks(sizes)
+
+            expected = reference_merge_small_chunks(copy.deepcopy(chunks), 200)
+
+            assert list(iter_merged_small_chunks(copy.deepcopy(chunks), 200)) == expected
+            assert merge_small_chunks(copy.deepcopy(chunks), 200) == expected
+
+
+# ============================================================================
+# TESTS FOR iter_smart_chunks
+# ============================================================================
+
+class TestIterSmartChunks:
+    def test_matches_create_smart_chunks(self):
+        """Lazy and list chunking produce the same chunks"""
+        rng = random.Random(42)
+        for _ in range(30):
+            text = make_document(rng, rng.randint(1, 25))
+
+            assert list(iter_smart_chunks(text, 500, 100, 80)) == create_smart_chunks(text, 500, 100, 80)
+
+    def test_matches_list_merge_of_raw_chunks(self):
+        """Streaming the merge gives what merging the full raw list gave"""
+        rng = random.Random(7)
+        for _ in range(30):
+            text = make_document(rng, rng.randint(1, 25))
+            raw = list(iter_smart_chunks(text, 500, 100, 0))
+
+            # Threshold close to chunk_size, so interior chunks get merged too
+            expected = reference_merge_small_chunks(copy.deepcopy(raw), 400)
+
+            assert list(iter_merged_small_chunks(copy.deepcopy(raw), 400)) == expected
+
+    def test_islice_prefix_equals_full_prefix(self):
+        """Taking the first N chunks lazily returns the first N of the full run"""
+        rng = random.Random(99)
+        text = make_document(rng, 40)
+        full = create_smart_chunks(text, 500, 100, 80)
+
+        first = list(islice(iter_smart_chunks(text, 500, 100, 80), 3))
+
+        assert len(full) > 3
+        assert [c['text'] for c in first] == [c['text'] for c in full[:3]]
+        assert [c['index'] for c in first] == [0, 1, 2]
+
+    def test_blank_text_yields_nothing(self):
+        assert list(iter_smart_chunks("   \n\n  ")) == []
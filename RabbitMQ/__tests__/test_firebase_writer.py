@@ -0,0 +1,149 @@
+"""
+test_firebase_writer.py
+Unit tests for the background Firebase writer
+Tests coalescing of pending payloads, flush() and stop() against a fake client
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.handler.firebase import FirebaseWriter
+
+
+class RecordingClient:
+    """Stands in for FirebaseClient; records pushes, optionally blocks or fails"""
+
+    def __init__(self, release=None, fail_jobs=()):
+        self.pushes = []
+        self.release = release
+        self.fail_jobs = set(fail_jobs)
+
+    def push_job_result(self, job_id, result, path="job_results"):
+        if self.release is not None:
+            self.release.wait(5)
+        if job_id in self.fail_jobs:
+            raise RuntimeError("RTDB unavailable")
+        self.pushes.append((path, job_id, result))
+
+
+# ============================================================================
+# TESTS FOR submit / coalescing
+# ============================================================================
+
+class TestSubmit:
+    def test_updates_of_one_job_are_coalesced(self):
+        """Only the newest pending payload of a (path, job_id) is written"""
+        # Setup: queue several progress updates before the writer runs
+        client = RecordingClient()
+        writer = FirebaseWriter(client, coalesce_interval=0.01)
+        writer.submit("job-1", {"progress": 10})
+        writer.submit("job-1", {"progress": 50})
+        writer.submit("job-1", {"progress": 100})
+
+        # Test
+        writer.start()
+        assert writer.flush(timeout=5)
+
+        # Assert
+        assert client.pushes == [("job_results", "job-1", {"progress": 100})]
+        writer.stop()
+
+    def test_jobs_and_paths_are_written_separately(self):
+        """Different jobs, or one job under different paths, are not merged"""
+        # Setup
+        client = RecordingClient()
+        writer = FirebaseWriter(client, coalesce_interval=0.01)
+        writer.submit("job-1", "a")
+        writer.submit("job-2", "b")
+        writer.submit("job-1", "c", path="job_status")
+
+        # Test
+        writer.start()
+        assert writer.flush(timeout=5)
+
+        # Assert
+        assert sorted(client.pushes) == [
+            ("job_results", "job-1", "a"),
+            ("job_results", "job-2", "b"),
+            ("job_status", "job-1", "c"),
+        ]
+        writer.stop()
+
+    def test_failed_write_does_not_stop_the_writer(self):
+        """A push error is logged and later payloads are still written"""
+        # Setup
+        client = RecordingClient(fail_jobs={"job-bad"})
+        writer = FirebaseWriter(client, coalesce_interval=0.01)
+        writer.start()
+
+        # Test
+        writer.submit("job-bad", "x")
+        assert writer.flush(timeout=5)
+        writer.submit("job-good", "y")
+        assert writer.flush(timeout=5)
+
+        # Assert
+        assert client.pushes == [("job_results", "job-good", "y")]
+        assert writer.is_alive()
+        writer.stop()
+
+
+# ============================================================================
+# TESTS FOR flush / stop
+# ============================================================================
+
+class TestFlushAndStop:
+    def test_flush_times_out_while_a_write_is_in_flight(self):
+        """flush() reports False when the payloads are not written in time"""
+        # Setup: the client blocks until released
+        release = threading.Event()
+        client = RecordingClient(release=release)
+        writer = FirebaseWriter(client, coalesce_interval=0.01)
+        writer.submit("job-1", "done")
+        writer.start()
+
+        # Test / Assert
+        assert writer.flush(timeout=0.1) is False
+        release.set()
+        assert writer.flush(timeout=5) is True
+        assert client.pushes == [("job_results", "job-1", "done")]
+        writer.stop()
+
+    def test_flush_without_pending_returns_immediately(self):
+        """Nothing queued means nothing to wait for"""
+        writer = FirebaseWriter(RecordingClient(), coalesce_interval=0.01)
+
+        assert writer.flush(timeout=0) is True
+
+    def test_stop_writes_pending_payloads_and_ends_thread(self):
+        """stop() drains the queue before the thread exits"""
+        # Setup
+        client = RecordingClient()
+        writer = FirebaseWriter(client, coalesce_interval=0.01)
+        writer.submit("job-1", "final")
+        writer.start()
+
+        # Test
+        writer.stop(timeout=5)
+
+        # Assert
+        assert client.pushes == [("job_results", "job-1", "final")]
+        assert not writer.is_alive()
+
+    def test_stop_on_idle_writer_ends_thread(self):
+        """A writer with nothing queued stops without writing"""
+        # Setup
+        client = RecordingClient()
+        writer = FirebaseWriter(client, coalesce_interval=0.01)
+        writer.start()
+
+        # Test
+        writer.stop(timeout=5)
+
+        # Assert
+        assert client.pushes == []
+        assert not writer.is_alive()
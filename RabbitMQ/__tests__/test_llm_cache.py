@@ -0,0 +1,199 @@
+"""
+test_llm_cache.py
+Unit tests for the LLM response cache
+Tests key normalization, endpoint/version keying, LRU eviction, TTL expiry,
+the on-disk store and the llm_cached decorator
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline.llm_cache import LLMResponseCache, make_cache_key, llm_cached
+
+
+def make_counting_llm(response):
+    """Fake call_llm_sync that records every real call"""
+    calls = []
+
+    def call_llm(prompt, system_message="", max_tokens=2000, clova_api_key="", clova_api_url=""):
+        calls.append(prompt)
+        return response
+
+    return call_llm, calls
+
+
+# ============================================================================
+# TESTS FOR make_cache_key
+# ============================================================================
+
+class TestCacheKey:
+    def test_whitespace_differences_share_a_key(self):
+        """Re-extracted text with other spacing/line breaks hits the same entry"""
+        key = make_cache_key("Analyze  this\n\ntext", "You are\tan expert", 100, "url")
+        assert key == make_cache_key("Analyze this text", "You are an expert", 100, "url")
+
+    def test_parts_do_not_bleed_into_each_other(self):
+        """Moving text between system message and prompt changes the key"""
+        assert make_cache_key("b c", "a", 100, "url") != make_cache_key("c", "a b", 100, "url")
+
+    def test_max_tokens_endpoint_and_version_are_keyed(self):
+        """Other max_tokens, another endpoint (model) or a bumped version miss"""
+        key = make_cache_key("prompt", "system", 100, "https://clova/v1/model-a")
+        assert key != make_cache_key("prompt", "system", 200, "https://clova/v1/model-a")
+        assert key != make_cache_key("prompt", "system", 100, "https://clova/v1/model-b")
+        with patch('src.pipeline.llm_cache.LLM_CACHE_VERSION', 'v2'):
+            assert key != make_cache_key("prompt", "system", 100, "https://clova/v1/model-a")
+
+
+# ============================================================================
+# TESTS FOR LLMResponseCache
+# ============================================================================
+
+class TestLLMResponseCache:
+    def test_lru_evicts_least_recently_used(self):
+        """A read refreshes an entry, so the untouched one is evicted"""
+        # Setup
+        cache = LLMResponseCache(max_size=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+
+        # Test
+        cache.get("a")
+        cache.set("c", {"v": 3})
+
+        # Assert
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("c") == {"v": 3}
+
+    def test_entries_expire_after_ttl(self):
+        """Entries older than ttl_seconds are dropped on read"""
+        # Setup
+        cache = LLMResponseCache(ttl_seconds=60)
+        with patch('src.pipeline.llm_cache.time.time', return_value=1000.0):
+            cache.set("a", {"v": 1})
+
+        # Test / Assert
+        with patch('src.pipeline.llm_cache.time.time', return_value=1059.0):
+            assert cache.get("a") == {"v": 1}
+        with patch('src.pipeline.llm_cache.time.time', return_value=1061.0):
+            assert cache.get("a") is None
+        assert "a" not in cache.cache
+
+    def test_returned_values_are_isolated_copies(self):
+        """Mutating a stored or returned value does not change the cache"""
+        # Setup
+        value = {"structure": {"categories": ["A"]}}
+        cache = LLMResponseCache()
+        cache.set("a", value)
+
+        # Test
+        value["structure"]["categories"].append("B")
+        cache.get("a")["structure"]["categories"].append("C")
+
+        # Assert
+        assert cache.get("a") == {"structure": {"categories": ["A"]}}
+
+    def test_disk_round_trip(self):
+        """A new cache instance (worker restart) reads entries from disk"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Setup
+            LLMResponseCache(cache_dir=cache_dir).set("a", {"v": "한국어"})
+
+            # Test
+            restarted = LLMResponseCache(cache_dir=cache_dir)
+
+            # Assert
+            assert restarted.get("a") == {"v": "한국어"}
+            assert restarted.hits == 1
+            assert "a" in restarted.cache
+
+    def test_expired_disk_entries_are_removed(self):
+        """The file's mtime is its write time; stale files are deleted on read"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Setup
+            LLMResponseCache(cache_dir=cache_dir).set("a", {"v": 1})
+            path = os.path.join(cache_dir, "a.json")
+            os.utime(path, (0, 0))
+
+            # Test
+            result = LLMResponseCache(cache_dir=cache_dir, ttl_seconds=60).get("a")
+
+            # Assert
+            assert result is None
+            assert not os.path.exists(path)
+
+
+# ============================================================================
+# TESTS FOR llm_cached
+# ============================================================================
+
+class TestLLMCachedDecorator:
+    def test_repeated_call_is_served_from_cache(self):
+        """The same request reaches the LLM once"""
+        call_llm, calls = make_counting_llm({"ok": True})
+        with patch('src.pipeline.llm_cache.llm_response_cache', LLMResponseCache()), \
+                patch('src.pipeline.llm_cache.FEATURE_LLM_CACHE', True):
+            cached_call = llm_cached(call_llm)
+
+            # Test
+            first = cached_call("prompt", system_message="system")
+            second = cached_call("prompt", system_message="system")
+
+        # Assert
+        assert first == second == {"ok": True}
+        assert len(calls) == 1
+
+    def test_endpoint_is_part_of_the_key(self):
+        """Another clova_api_url (model) is a different request"""
+        call_llm, calls = make_counting_llm({"ok": True})
+        with patch('src.pipeline.llm_cache.llm_response_cache', LLMResponseCache()), \
+                patch('src.pipeline.llm_cache.FEATURE_LLM_CACHE', True):
+            cached_call = llm_cached(call_llm)
+
+            # Test
+            cached_call("prompt", clova_api_url="https://clova/model-a")
+            cached_call("prompt", clova_api_url="https://clova/model-b")
+
+        # Assert
+        assert len(calls) == 2
+
+    def test_empty_results_are_not_cached(self):
+        """Failed calls (empty responses) are retried next time"""
+        call_llm, calls = make_counting_llm({})
+        with patch('src.pipeline.llm_cache.llm_response_cache', LLMResponseCache()), \
+                patch('src.pipeline.llm_cache.FEATURE_LLM_CACHE', True):
+            cached_call = llm_cached(call_llm)
+
+            # Test
+            cached_call("prompt")
+            cached_call("prompt")
+
+        # Assert
+        assert len(calls) == 2
+
+    def test_async_functions_are_cached(self):
+        """call_llm_async is wrapped with an async wrapper"""
+        calls = []
+
+        async def call_llm_async(prompt, system_message="", max_tokens=2000, clova_api_key="", clova_api_url=""):
+            calls.append(prompt)
+            return {"ok": True}
+
+        with patch('src.pipeline.llm_cache.llm_response_cache', LLMResponseCache()), \
+                patch('src.pipeline.llm_cache.FEATURE_LLM_CACHE', True):
+            cached_call = llm_cached(call_llm_async)
+
+            # Test
+            asyncio.run(cached_call("prompt"))
+            result = asyncio.run(cached_call("prompt"))
+
+        # Assert
+        assert result == {"ok": True}
+        assert len(calls) == 1
@@ -15,11 +15,13 @@ from unittest.mock import Mock, MagicMock, patch, call
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.config import EMBEDDING_DIMENSION
 from src.model.KnowledgeNode import KnowledgeNode
 from src.model.Evidence import Evidence
 from src.model.GapSuggestion import GapSuggestion
 from src.pipeline.neo4j_graph import (
     find_best_match,
+    find_best_matches,
     create_evidence_node,
     create_gap_suggestion_node,
     create_knowledge_node,
@@ -28,7 +30,10 @@ from src.pipeline.neo4j_graph import (
     create_parent_child_relationship,
     create_hierarchical_knowledge_graph,
     add_gap_suggestions_to_node,
-    get_knowledge_node_with_evidence
+    get_knowledge_node_with_evidence,
+    run_in_batches,
+    get_file_completion_state,
+    mark_file_completed
 )
 
 
@@ -99,6 +104,13 @@ def sample_embedding():
     return [0.1] * 768  # Typical embedding dimension
 
 
+def unit_embedding(axis, dimension=768):
+    """Embedding along one axis: orthogonal to the embeddings of other axes"""
+    embedding = [0.0] * dimension
+    embedding[axis] = 1.0
+    return embedding
+
+
 @pytest.fixture
 def sample_hierarchical_structure():
     """Create a sample hierarchical structure for testing"""
@@ -214,6 +226,78 @@ class TestFindBestMatch:
         assert result is None
 
 
+# ============================================================================
+# TESTS FOR find_best_matches
+# ============================================================================
+
+class TestFindBestMatches:
+    def test_exact_matches_skip_similarity_lookup(self, mock_session):
+        """Keys matched by name are not sent to the similarity query"""
+        # Setup: exact batch matches one key, similarity batch matches the other
+        mock_exact_result = Mock()
+        mock_exact_result.single.return_value = {'matches': [
+            {'key': 'machine learning', 'id': 'node-123', 'name': 'Machine Learning',
+             'sim': 1.0, 'match_type': 'exact'}
+        ]}
+        mock_sim_result = Mock()
+        mock_sim_result.single.return_value = {'matches': [
+            {'key': 'ml algorithms', 'id': 'node-456', 'name': 'ML Algorithms',
+             'sim': 0.92, 'match_type': 'very_high'}
+        ]}
+        mock_session.run.side_effect = [mock_exact_result, mock_sim_result]
+
+        # Test
+        result = find_best_matches(
+            mock_session,
+            "workspace-1",
+            {'machine learning': [0.1] * 768, 'ml algorithms': [0.2] * 768}
+        )
+
+        # Assert: two round trips, second one only for the unmatched key
+        assert mock_session.run.call_count == 2
+        similarity_rows = mock_session.run.call_args_list[1][1]['rows']
+        assert [row['key'] for row in similarity_rows] == ['ml algorithms']
+        assert result['machine learning']['match_type'] == 'exact'
+        assert result['ml algorithms']['match_type'] == 'very_high'
+
+    def test_index_miss_falls_back_to_scan(self, mock_session):
+        """Keys whose vector candidates hold no workspace node are re-scanned"""
+        # Setup: no exact match; the index finds a (too distant) workspace
+        # node for one key only, the scan matches the other
+        mock_exact_result = Mock()
+        mock_exact_result.single.return_value = {'matches': []}
+        mock_index_result = Mock()
+        mock_index_result.single.return_value = {'matches': [
+            {'key': 'graph theory', 'id': 'node-1', 'name': 'Topology',
+             'sim': 0.41, 'match_type': None}
+        ]}
+        mock_scan_result = Mock()
+        mock_scan_result.single.return_value = {'matches': [
+            {'key': 'ml algorithms', 'id': 'node-456', 'name': 'ML Algorithms',
+             'sim': 0.85, 'match_type': 'high'}
+        ]}
+        mock_session.run.side_effect = [mock_exact_result, mock_index_result, mock_scan_result]
+
+        # Test
+        with patch('src.pipeline.neo4j_graph._vector_index_ready', True):
+            result = find_best_matches(
+                mock_session,
+                "workspace-1",
+                {'graph theory': [0.1] * EMBEDDING_DIMENSION, 'ml algorithms': [0.2] * EMBEDDING_DIMENSION}
+            )
+
+        # Assert: only the key the index could not answer is scanned
+        scan_rows = mock_session.run.call_args_list[2][1]['rows']
+        assert [row['key'] for row in scan_rows] == ['ml algorithms']
+        assert 'graph theory' not in result
+        assert result['ml algorithms']['id'] == 'node-456'
+
+    def test_no_keys_no_queries(self, mock_session):
+        """An empty lookup does not touch Neo4j"""
+        assert find_best_matches(mock_session, "workspace-1", {}) == {}
+        assert not mock_session.run.called
+
+
 # ============================================================================
 # TESTS FOR create_evidence_node
 # ============================================================================
@@ -258,7 +342,7 @@ class TestCreateKnowledgeNode:
 
         # Assert
         assert node_id == sample_knowledge_node.Id
-        assert mock_session.run.call_count >= 3  # Create node, create evidence, create relationship
+        assert mock_session.run.call_count == 1  # Node, evidence and relationship in one query
 
         # Verify calls contain expected patterns
         calls = [str(call) for call in mock_session.run.call_args_list]
@@ -345,9 +429,12 @@ class TestCreateOrMergeKnowledgeNode:
                 sample_embedding
             )
 
-            # Assert
+            # Assert: synthesis update and new evidence share one query
             assert node_id == 'existing-node-123'
-            assert mock_session.run.called
+            assert mock_session.run.call_count == 1
+            query = mock_session.run.call_args[0][0]
+            assert 'SET n.synthesis' in query
+            assert 'HAS_EVIDENCE' in query
 
     def test_skip_node_with_empty_name(
         self, mock_session, sample_knowledge_node, sample_evidence, sample_embedding
@@ -461,10 +548,10 @@ class TestCreateHierarchicalKnowledgeGraph:
 
         # Create embeddings cache
         embeddings_cache = {
-            "Artificial Intelligence": [0.1] * 768,
-            "Machine Learning": [0.2] * 768,
-            "Supervised Learning": [0.3] * 768,
-            "Classification": [0.4] * 768
+            "Artificial Intelligence": unit_embedding(0),
+            "Machine Learning": unit_embedding(1),
+            "Supervised Learning": unit_embedding(2),
+            "Classification": unit_embedding(3)
         }
 
         with patch('src.pipeline.neo4j_graph.find_best_match', return_value=None):
@@ -511,6 +598,164 @@ class TestCreateHierarchicalKnowledgeGraph:
         assert stats is not None
         assert stats['nodes_created'] == 0
 
+    def test_empty_workspace_skips_match_lookup(
+        self, mock_session, sample_hierarchical_structure
+    ):
+        """Nothing can be merged into an empty workspace, so no match queries run"""
+        # Setup
+        mock_result = Mock()
+        mock_result.single.return_value = {'total': 0}
+        mock_session.run.return_value = mock_result
+
+        embeddings_cache = {"Artificial Intelligence": unit_embedding(0)}
+
+        with patch('src.pipeline.neo4j_graph.find_best_matches') as mock_find:
+            # Test
+            stats = create_hierarchical_knowledge_graph(
+                mock_session,
+                "workspace-1",
+                sample_hierarchical_structure,
+                "file-123",
+                "AI Guide.pdf",
+                embeddings_cache
+            )
+
+            # Assert
+            assert not mock_find.called
+            assert stats['evidence_created'] == 1
+
+    def test_leaf_nodes_tracked_while_building(
+        self, mock_session, sample_hierarchical_structure
+    ):
+        """Only nodes never linked as a parent are reported as leaves"""
+        # Setup
+        mock_result = Mock()
+        mock_result.single.return_value = {'total': 0}
+        mock_session.run.return_value = mock_result
+
+        embeddings_cache = {
+            "Artificial Intelligence": unit_embedding(0),
+            "Machine Learning": unit_embedding(1),
+            "Supervised Learning": unit_embedding(2),
+            "Classification": unit_embedding(3)
+        }
+
+        # Test
+        stats = create_hierarchical_knowledge_graph(
+            mock_session,
+            "workspace-1",
+            sample_hierarchical_structure,
+            "file-123",
+            "AI Guide.pdf",
+            embeddings_cache
+        )
+
+        # Assert - Classification is the only node without children
+        assert len(stats['node_ids']) == 4
+        assert stats['leaf_node_ids'] == [stats['node_ids'][-1]]
+
+    def test_near_duplicates_merge_within_build(
+        self, mock_session, sample_hierarchical_structure
+    ):
+        """A name close to one created earlier in the same build reuses its node"""
+        # Setup: Supervised Learning embeds like Machine Learning
+        mock_result = Mock()
+        mock_result.single.return_value = {'total': 0}
+        mock_session.run.return_value = mock_result
+
+        embeddings_cache = {
+            "Artificial Intelligence": unit_embedding(0),
+            "Machine Learning": unit_embedding(1),
+            "Supervised Learning": unit_embedding(1),
+            "Classification": unit_embedding(3)
+        }
+
+        # Test
+        stats = create_hierarchical_knowledge_graph(
+            mock_session,
+            "workspace-1",
+            sample_hierarchical_structure,
+            "file-123",
+            "AI Guide.pdf",
+            embeddings_cache
+        )
+
+        # Assert: one node less, and no self-loop for the merged pair
+        assert stats['nodes_created'] == 3
+        assert stats['node_ids'][1] == stats['node_ids'][2]
+        for args, kwargs in mock_session.run.call_args_list:
+            for row in kwargs.get('rows', []):
+                if 'parent_id' in row:
+                    assert row['parent_id'] != row['child_id']
+
+    def test_created_ids_are_scoped_to_the_file(
+        self, mock_session, sample_hierarchical_structure
+    ):
+        """New node ids start with the file id, as cleanup and status expect"""
+        # Setup
+        mock_result = Mock()
+        mock_result.single.return_value = {'total': 0}
+        mock_session.run.return_value = mock_result
+
+        embeddings_cache = {
+            "Artificial Intelligence": unit_embedding(0),
+            "Machine Learning": unit_embedding(1)
+        }
+
+        # Test
+        stats = create_hierarchical_knowledge_graph(
+            mock_session,
+            "workspace-1",
+            sample_hierarchical_structure,
+            "file_1a2b3c4d",
+            "AI Guide.pdf",
+            embeddings_cache
+        )
+
+        # Assert
+        assert stats['node_ids']
+        assert all(node_id.startswith("file_1a2b3c4d-") for node_id in stats['node_ids'])
+
+
+# ============================================================================
+# TESTS FOR file completion markers
+# ============================================================================
+
+FILE_KEY = "ab12cd34" + "0" * 24
+
+
+class TestFileCompletionMarker:
+    def test_state_reports_marker_and_partial_data(self, mock_session):
+        """Completion state is read in one query inside a read transaction"""
+        # Setup
+        tx = Mock()
+        tx.run.return_value.single.return_value = {'completed': False, 'partial': True}
+        mock_session.execute_read.side_effect = lambda work: work(tx)
+
+        # Test
+        state = get_file_completion_state(mock_session, FILE_KEY, "file_ab12cd34")
+
+        # Assert
+        assert state == {'completed': False, 'partial': True}
+        assert tx.run.call_count == 1
+        assert tx.run.call_args.kwargs['file_key'] == FILE_KEY
+        assert tx.run.call_args.kwargs['file_id'] == "file_ab12cd34"
+
+    def test_mark_completed_merges_marker(self, mock_session):
+        """The marker is MERGEd so writing it twice is harmless"""
+        # Setup
+        tx = Mock()
+        mock_session.execute_write.side_effect = lambda work: work(tx)
+
+        # Test
+        mark_file_completed(mock_session, FILE_KEY, "file_ab12cd34", "workspace-1", "job-1", "https://x/a.pdf")
+
+        # Assert
+        query = tx.run.call_args.args[0]
+        assert "MERGE (p:ProcessedFile {id: $file_key})" in query
+        assert tx.run.call_args.kwargs['file_key'] == FILE_KEY
+        assert tx.run.call_args.kwargs['ws'] == "workspace-1"
+
 
 # ============================================================================
 # TESTS FOR add_gap_suggestions_to_node
@@ -555,8 +800,11 @@ class TestAddGapSuggestionsToNode:
             suggestions
         )
 
-        # Assert
-        assert mock_session.run.call_count == 3
+        # Assert - all suggestions are written in a single UNWIND query
+        assert mock_session.run.call_count == 1
+        rows = mock_session.run.call_args[1]['rows']
+        assert len(rows) == 3
+        assert 'UNWIND' in mock_session.run.call_args[0][0]
 
 
 # ============================================================================
@@ -628,6 +876,26 @@ class TestGetKnowledgeNodeWithEvidence:
         assert result is None
 
 
+# ============================================================================
+# TESTS FOR batch writers
+# ============================================================================
+
+class TestBatchWriters:
+    def test_run_in_batches_chunks_rows(self, mock_session):
+        """Test that rows are split into NEO4J_WRITE_BATCH_SIZE chunks"""
+        # Setup
+        rows = [{'id': f"node-{i}"} for i in range(5)]
+
+        # Test
+        with patch('src.pipeline.neo4j_graph.NEO4J_WRITE_BATCH_SIZE', 2):
+            written = run_in_batches(mock_session, "UNWIND $rows AS row RETURN row", rows)
+
+        # Assert
+        assert written == 5
+        assert mock_session.run.call_count == 3
+        assert [len(c[1]['rows']) for c in mock_session.run.call_args_list] == [2, 2, 1]
+
+
 # ============================================================================
 # INTEGRATION TESTS
 # ============================================================================
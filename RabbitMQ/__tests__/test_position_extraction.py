@@ -13,7 +13,9 @@ from pipeline.position_extraction import (
     clamp_positions_to_range,
     split_text_to_paragraphs,
     merge_overlapping_ranges,
-    get_position_coverage
+    get_position_coverage,
+    estimate_paragraph_pages,
+    representative_sample
 )
 
 
@@ -209,6 +211,52 @@ def test_get_position_coverage():
     print("✓ Full coverage detection works")
 
 
+
+def test_estimate_paragraph_pages():
+    """Test paragraph -> page estimation"""
+    print("\n=== Test: estimate_paragraph_pages ===")
+    
+    paragraphs = ["a" * 600, "b" * 600, "c" * 600, "d" * 600]
+    pages = estimate_paragraph_pages(paragraphs, 1000)
+    
+    print(f"Pages: {pages}")
+    assert pages == [1, 1, 2, 2], f"Expected [1, 1, 2, 2], got {pages}"
+    print("✓ Pages follow cumulative text offset")
+    
+    # Empty input and degenerate page size
+    assert estimate_paragraph_pages([], 1000) == [], "Expected no pages"
+    assert estimate_paragraph_pages(["x"], 0) == [1], "Expected page 1"
+    print("✓ Edge cases handled")
+
+
+
+def test_representative_sample():
+    """Test start/middle/end paragraph sampling"""
+    print("\n=== Test: representative_sample ===")
+    
+    paragraphs = [f"Paragraph {i}" for i in range(30)]
+    sample = representative_sample(paragraphs, budget=4000, window=2)
+    
+    print(f"Sample: {sample!r}")
+    assert sample.split("\n\n") == [
+        "[0] Paragraph 0", "[1] Paragraph 1",
+        "[14] Paragraph 14", "[15] Paragraph 15",
+        "[28] Paragraph 28", "[29] Paragraph 29"
+    ], "Expected labeled start, middle and end windows"
+    print("✓ Windows from start, middle and end")
+    
+    # Budget caps the total length
+    long_paragraphs = ["x" * 5000] * 30
+    capped = representative_sample(long_paragraphs, budget=3000, window=3)
+    assert len(capped) <= 3000, f"Expected <= 3000 chars, got {len(capped)}"
+    print("✓ Budget respected")
+    
+    # Short documents: windows overlap, each paragraph appears once
+    assert representative_sample(["A", "B"], window=3) == "[0] A\n\n[1] B", "Expected no duplicates"
+    assert representative_sample([]) == "", "Expected empty sample"
+    print("✓ Edge cases handled")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Position Extraction Module Tests")
@@ -222,6 +270,8 @@ if __name__ == "__main__":
         test_split_text_to_paragraphs()
         test_merge_overlapping_ranges()
         test_get_position_coverage()
+        test_estimate_paragraph_pages()
+        test_representative_sample()
         
         print("\n" + "=" * 60)
         print("✅ ALL TESTS PASSED")
@@ -223,6 +223,26 @@ class TestEnsureCollectionExists:
         # Assert
         assert collection_name == f"workspace_{sample_workspace_id}"
 
+    def test_verified_collection_is_not_checked_again(
+        self, mock_qdrant_client, sample_workspace_id
+    ):
+        """Test that a second PDF of the same workspace skips the round trips"""
+        # Setup
+        mock_qdrant_client.collection_exists.return_value = False
+
+        # Test
+        ensure_collection_exists(mock_qdrant_client, sample_workspace_id, vector_size=384)
+        collection_name = ensure_collection_exists(
+            mock_qdrant_client,
+            sample_workspace_id,
+            vector_size=384
+        )
+
+        # Assert
+        assert collection_name == f"workspace_{sample_workspace_id}"
+        mock_qdrant_client.collection_exists.assert_called_once()
+        mock_qdrant_client.create_collection.assert_called_once()
+
     def test_collection_creation_failure(
         self, mock_qdrant_client, sample_workspace_id
     ):
@@ -0,0 +1,94 @@
+"""
+test_rate_limiter.py
+Unit tests for the CLOVA request pacer
+Time is frozen with a patched time.monotonic, so delays are exact
+"""
+
+import os
+import sys
+import asyncio
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline.rate_limiter import RequestRateLimiter
+
+
+def reserve_at(limiter, now):
+    """Reserve a slot with the clock at `now`"""
+    with patch('src.pipeline.rate_limiter.time.monotonic', return_value=now):
+        return limiter.reserve()
+
+
+# ============================================================================
+# TESTS FOR RequestRateLimiter.reserve
+# ============================================================================
+
+class TestReserve:
+    def test_requests_are_spaced_by_interval(self):
+        """60 RPM without burst: one request per second"""
+        limiter = RequestRateLimiter(60)
+
+        delays = [reserve_at(limiter, 100.0) for _ in range(3)]
+
+        assert delays == [0.0, 1.0, 2.0]
+
+    def test_burst_starts_back_to_back(self):
+        """The first `burst` requests do not wait; pacing starts after them"""
+        limiter = RequestRateLimiter(60, burst=3)
+
+        delays = [reserve_at(limiter, 100.0) for _ in range(5)]
+
+        assert delays == [0.0, 0.0, 0.0, 1.0, 2.0]
+
+    def test_idle_time_frees_slots(self):
+        """After a quiet period the next request goes out immediately"""
+        limiter = RequestRateLimiter(120)
+        assert reserve_at(limiter, 100.0) == 0.0
+        assert reserve_at(limiter, 100.0) == 0.5
+
+        assert reserve_at(limiter, 110.0) == 0.0
+        assert reserve_at(limiter, 110.0) == 0.5
+
+    def test_zero_rpm_disables_pacing(self):
+        """CLOVA_REQUESTS_PER_MINUTE = 0 never delays a request"""
+        limiter = RequestRateLimiter(0, burst=5)
+
+        delays = [reserve_at(limiter, 100.0) for _ in range(10)]
+
+        assert delays == [0.0] * 10
+
+
+# ============================================================================
+# TESTS FOR acquire / acquire_async
+# ============================================================================
+
+class TestAcquire:
+    def test_acquire_sleeps_for_the_reserved_delay(self):
+        """Only requests past the burst actually sleep"""
+        limiter = RequestRateLimiter(60)
+        with patch('src.pipeline.rate_limiter.time.monotonic', return_value=100.0), \
+                patch('src.pipeline.rate_limiter.time.sleep') as mock_sleep:
+            limiter.acquire()
+            limiter.acquire()
+
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_acquire_async_awaits_the_reserved_delay(self):
+        """The async path waits on the loop instead of blocking the thread"""
+        limiter = RequestRateLimiter(60)
+        slept = []
+
+        async def fake_sleep(delay):
+            slept.append(delay)
+
+        async def acquire_twice():
+            await limiter.acquire_async()
+            await limiter.acquire_async()
+
+        with patch('src.pipeline.rate_limiter.time.monotonic', return_value=100.0), \
+                patch('src.pipeline.rate_limiter.asyncio.sleep', fake_sleep):
+            asyncio.run(acquire_twice())
+
+        assert slept == [1.0]
@@ -0,0 +1,324 @@
+"""
+test_recursive_expander.py
+Unit tests for the recursive expander: node quality gate, two-level (subtree)
+expansion and shared expansion calls
+"""
+
+import os
+import sys
+import asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.recursive_expander import (
+    NodeData,
+    RecursiveExpander,
+    is_generic_name,
+    is_valid_node,
+    filter_valid_nodes,
+)
+
+
+SYNTHESIS = "A comprehensive synthesis with more than enough characters to pass every level"
+
+PARAGRAPHS = [
+    f"Paragraph {i} discusses topic number {i} in reasonable detail for testing."
+    for i in range(6)
+]
+
+
+def make_node(node_id, name, level, parent_id=None):
+    """Build a node that passes every rule except, possibly, the name"""
+    return NodeData(
+        id=node_id,
+        name=name,
+        synthesis=SYNTHESIS,
+        level=level,
+        type="concept",
+        evidence_positions=[[0, 2]],
+        evidence_content=[{"text": "Sample", "position_range": [0, 2]}],
+        parent_id=parent_id
+    )
+
+
+# ============================================================================
+# TESTS FOR is_generic_name / is_valid_node
+# ============================================================================
+
+class TestGenericNames:
+    def test_placeholder_names_are_generic(self):
+        """Bare template names (with optional numbering) are rejected"""
+        for name in ["Child 1", "Node 3", "Item #2", "Untitled", "Unknown", "Concept 1", "Category 1"]:
+            assert is_generic_name(name), name
+
+    def test_real_concepts_containing_keywords_are_kept(self):
+        """Generic words inside real names, or as word prefixes, do not count"""
+        for name in ["Graph Node Embeddings", "Item Response Theory", "Childhood Obesity", "Network Nodes"]:
+            assert not is_generic_name(name), name
+            assert is_valid_node(make_node("n", name, 2, parent_id="root"))
+
+
+# ============================================================================
+# TESTS FOR filter_valid_nodes
+# ============================================================================
+
+class TestFilterValidNodes:
+    def test_real_concepts_keep_their_subtrees(self):
+        """Nodes named after real concepts survive together with their children"""
+        nodes = [
+            make_node("root", "Machine Learning", 0),
+            make_node("c1", "Graph Node Embeddings", 1, parent_id="root"),
+            make_node("c1-1", "Random Walk Sampling", 2, parent_id="c1"),
+            make_node("c2", "Item Response Theory", 1, parent_id="root"),
+            make_node("c2-1", "Childhood Obesity", 2, parent_id="c2"),
+        ]
+
+        kept = filter_valid_nodes(nodes)
+
+        assert [n.id for n in kept] == ["root", "c1", "c1-1", "c2", "c2-1"]
+
+    def test_placeholder_drops_its_subtree(self):
+        """A rejected node takes its descendants with it; the root stays"""
+        nodes = [
+            make_node("root", "Untitled", 0),
+            make_node("c1", "Child 1", 1, parent_id="root"),
+            make_node("c1-1", "Gradient Descent", 2, parent_id="c1"),
+            make_node("c2", "Optimization Methods", 1, parent_id="root"),
+        ]
+
+        kept = filter_valid_nodes(nodes)
+
+        assert [n.id for n in kept] == ["root", "c2"]
+
+    def test_dropped_nodes_are_pruned_from_the_tree(self):
+        """The root's children match the filtered list, not the raw tree"""
+        # Setup
+        root = make_node("root", "Machine Learning", 0)
+        bad = make_node("c1", "Child 1", 1, parent_id="root")
+        good = make_node("c2", "Optimization Methods", 1, parent_id="root")
+        bad.children = [make_node("c1-1", "Gradient Descent", 2, parent_id="c1")]
+        root.children = [bad, good]
+
+        # Test
+        filter_valid_nodes([root, bad, bad.children[0], good])
+
+        # Assert
+        assert [n.id for n in root.children] == ["c2"]
+
+
+def make_root(name="Machine Learning"):
+    """Level-0 node citing every paragraph"""
+    return NodeData(
+        id="root",
+        name=name,
+        synthesis=SYNTHESIS,
+        level=0,
+        type="domain",
+        evidence_positions=[[0, 5]]
+    )
+
+
+def child_entry(name, positions, children=None):
+    """One child as the LLM returns it (positions relative to the parent content)"""
+    entry = {
+        "name": name,
+        "synthesis": SYNTHESIS,
+        "evidence_positions": positions,
+        "key_claims_positions": [],
+        "questions_positions": []
+    }
+    if children is not None:
+        entry["children"] = children
+    return entry
+
+
+class StubLLM:
+    """Async llm_caller returning queued responses and recording each call"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def __call__(self, prompt, system_message, max_tokens):
+        self.calls.append({"prompt": prompt, "max_tokens": max_tokens})
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+def make_expander(llm, subtree_levels=2):
+    return RecursiveExpander(
+        PARAGRAPHS,
+        llm,
+        max_depth=2,
+        children_per_level=2,
+        min_content_length=10,
+        subtree_levels=subtree_levels
+    )
+
+
+# ============================================================================
+# TESTS FOR two-level (subtree) expansion
+# ============================================================================
+
+class TestSubtreeExpansion:
+    def test_one_call_builds_children_and_grandchildren(self):
+        """Grandchildren in the response become level-2 nodes under their child"""
+        # Setup
+        llm = StubLLM({"children": [
+            child_entry("Supervised Learning", [[0, 2]], children=[
+                child_entry("Classification", [[0, 0]]),
+                child_entry("Regression", [[1, 2]]),
+            ]),
+            child_entry("Unsupervised Learning", [[3, 5]], children=[
+                child_entry("Clustering", [[4, 4]]),
+                child_entry("Dimensionality Reduction", [[5, 5]]),
+            ]),
+        ]})
+        expander = make_expander(llm)
+        root = make_root()
+
+        # Test
+        asyncio.run(expander.expand_node_recursively(root, 0, 2))
+
+        # Assert
+        assert len(llm.calls) == 1
+        assert llm.calls[0]["max_tokens"] == 4000
+        assert [c.name for c in root.children] == ["Supervised Learning", "Unsupervised Learning"]
+        unsupervised = root.children[1]
+        assert [g.name for g in unsupervised.children] == ["Clustering", "Dimensionality Reduction"]
+        clustering = unsupervised.children[0]
+        assert clustering.level == 2
+        assert clustering.parent_id == unsupervised.id
+        assert clustering.evidence_positions == [[4, 4]]
+        assert clustering.evidence_content[0]["text"] == PARAGRAPHS[4]
+        assert expander.stats["total_nodes"] == 6
+
+    def test_grandchild_positions_are_clamped(self):
+        """Out-of-range grandchild positions are clamped to the parent content"""
+        # Setup
+        llm = StubLLM({"children": [
+            child_entry("Supervised Learning", [[0, 2]], children=[
+                child_entry("Classification", [[3, 99]]),
+                child_entry("Regression", [[-4, 1]]),
+            ]),
+            child_entry("Unsupervised Learning", [[3, 5]], children=[]),
+        ]})
+        root = make_root()
+
+        # Test
+        asyncio.run(make_expander(llm).expand_node_recursively(root, 0, 2))
+
+        # Assert
+        classification, regression = root.children[0].children
+        assert classification.evidence_positions == [[3, 5]]
+        assert regression.evidence_positions == [[0, 1]]
+
+    def test_children_without_grandchildren_expand_separately(self):
+        """A child the response left empty gets its own one-level call"""
+        # Setup: the first response has no grandchildren at all
+        llm = StubLLM(
+            {"children": [
+                child_entry("Supervised Learning", [[0, 2]]),
+                child_entry("Unsupervised Learning", [[3, 5]], children=[]),
+            ]},
+            {"children": [
+                child_entry("Classification", [[0, 0]]),
+                child_entry("Regression", [[1, 2]]),
+            ]},
+        )
+        expander = make_expander(llm)
+        root = make_root()
+
+        # Test
+        asyncio.run(expander.expand_node_recursively(root, 0, 2))
+
+        # Assert: one subtree call, then one single-level call per child
+        assert [call["max_tokens"] for call in llm.calls] == [4000, 2000, 2000]
+        for child in root.children:
+            assert [g.level for g in child.children] == [2, 2]
+            assert all(g.parent_id == child.id for g in child.children)
+
+    def test_single_level_mode_asks_for_children_only(self):
+        """subtree_levels=1 ignores grandchildren and expands level by level"""
+        # Setup
+        llm = StubLLM({"children": [
+            child_entry("Supervised Learning", [[0, 2]], children=[
+                child_entry("Classification", [[0, 0]]),
+                child_entry("Regression", [[1, 2]]),
+            ]),
+            child_entry("Unsupervised Learning", [[3, 5]]),
+        ]})
+        root = make_root()
+
+        # Test
+        asyncio.run(make_expander(llm, subtree_levels=1).expand_node_recursively(root, 0, 1))
+
+        # Assert
+        assert [call["max_tokens"] for call in llm.calls] == [2000]
+        assert all(not child.children for child in root.children)
+
+
+# ============================================================================
+# TESTS FOR shared expansion calls
+# ============================================================================
+
+class TestSharedExpansions:
+    RESPONSE = {"children": [
+        child_entry("Supervised Learning", [[0, 2]]),
+        child_entry("Unsupervised Learning", [[3, 5]]),
+    ]}
+
+    def expand_both(self, expander, first, second):
+        async def run():
+            await asyncio.gather(
+                expander.expand_node_recursively(first, 0, 1),
+                expander.expand_node_recursively(second, 0, 1)
+            )
+        asyncio.run(run())
+
+    def test_identical_prompts_share_one_call(self):
+        """Same name, synthesis and content: one LLM call, children built per node"""
+        # Setup
+        llm = StubLLM(self.RESPONSE)
+        expander = make_expander(llm, subtree_levels=1)
+        first, second = make_root(), make_root()
+        second.id = "root-2"
+
+        # Test
+        self.expand_both(expander, first, second)
+
+        # Assert
+        assert len(llm.calls) == 1
+        assert expander.stats["shared_expansions"] == 1
+        assert [c.parent_id for c in second.children] == ["root-2", "root-2"]
+        assert {c.id for c in first.children}.isdisjoint(c.id for c in second.children)
+
+    def test_different_parent_names_do_not_share(self):
+        """The parent name is part of the prompt, so it is part of the key"""
+        # Setup
+        llm = StubLLM(self.RESPONSE)
+        expander = make_expander(llm, subtree_levels=1)
+        first, second = make_root("Machine Learning"), make_root("Statistics")
+
+        # Test
+        self.expand_both(expander, first, second)
+
+        # Assert
+        assert len(llm.calls) == 2
+        assert expander.stats["shared_expansions"] == 0
+
+    def test_empty_result_is_not_reused(self):
+        """A failed (empty) expansion is retried by the next identical node"""
+        # Setup
+        llm = StubLLM({}, self.RESPONSE)
+        expander = make_expander(llm, subtree_levels=1)
+        first, second = make_root(), make_root()
+
+        # Test: sequential, so the second node sees the finished empty call
+        asyncio.run(expander.expand_node_recursively(first, 0, 1))
+        asyncio.run(expander.expand_node_recursively(second, 0, 1))
+
+        # Assert
+        assert len(llm.calls) == 2
+        assert not first.children
+        assert len(second.children) == 2
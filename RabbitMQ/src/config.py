@@ -101,7 +101,9 @@ PAPAGO_CLIENT_SECRET = os.getenv('PAPAGO_CLIENT_SECRET', '')
 NEO4J_URI = os.getenv('NEO4J_URI', os.getenv('NEO4J_URL', 'bolt://localhost:7687'))
 NEO4J_USER = os.getenv('NEO4J_USER', 'neo4j')
 NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD', 'password')
-NEO4J_MAX_CONNECTION_LIFETIME = int(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '3600'))  # 1 hour
+NEO4J_MAX_CONNECTION_LIFETIME = int(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '1800'))  # 30 minutes
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv('NEO4J_CONNECTION_ACQUISITION_TIMEOUT', '60'))  # seconds
+NEO4J_DATABASE = os.getenv('NEO4J_DATABASE', 'neo4j')  # explicit name skips home-database resolution per session
 
 # Qdrant Vector Database
 QDRANT_HOST = os.getenv('QDRANT_HOST', 'localhost')
@@ -134,6 +136,9 @@ RABBITMQ_PREFETCH_COUNT = int(os.getenv('RABBITMQ_PREFETCH_COUNT', '1'))
 FIREBASE_SERVICE_ACCOUNT = os.getenv('FIREBASE_SERVICE_ACCOUNT', '')
 FIREBASE_DATABASE_URL = os.getenv('FIREBASE_DATABASE_URL', '')
 FIREBASE_TIMEOUT = int(os.getenv('FIREBASE_TIMEOUT', '30'))
+# Progress writes are debounced: at most one per interval (seconds) or every N files
+FIREBASE_PROGRESS_INTERVAL = float(os.getenv('FIREBASE_PROGRESS_INTERVAL', '2.0'))
+FIREBASE_PROGRESS_EVERY_N_FILES = int(os.getenv('FIREBASE_PROGRESS_EVERY_N_FILES', '5'))
 
 # ============================
 # Pipeline Optimization Configuration
@@ -155,10 +160,24 @@ MIN_CHUNK_SIZE = int(os.getenv('MIN_CHUNK_SIZE', '200'))
 BATCH_SIZE = int(os.getenv('BATCH_SIZE', '10'))
 EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '50'))
 QDRANT_BATCH_SIZE = int(os.getenv('QDRANT_BATCH_SIZE', '100'))
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', '4'))
+# Each PDF worker of each in-flight job holds its own session; leave headroom
+# for schema/discovery sessions
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv(
+    'NEO4J_MAX_CONNECTION_POOL_SIZE',
+    str(max(16, PDF_WORKERS * max(RABBITMQ_PREFETCH_COUNT, 1) * 4))
+))
+ANALYSIS_BATCH_SIZE = int(os.getenv('ANALYSIS_BATCH_SIZE', '5'))
+NEO4J_WRITE_BATCH_SIZE = int(os.getenv('NEO4J_WRITE_BATCH_SIZE', '1000'))  # UNWIND rows per query
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))  # In-flight async CLOVA requests per PDF
+CLOVA_REQUESTS_PER_MINUTE = int(os.getenv('CLOVA_REQUESTS_PER_MINUTE', '0'))  # Process-wide chat pacing; 0 = unpaced
+CLOVA_RATE_BURST = int(os.getenv('CLOVA_RATE_BURST', str(LLM_MAX_CONCURRENCY)))  # Requests allowed back to back
 
 # Text Processing Limits
 MAX_SYNTHESIS_LENGTH = int(os.getenv('MAX_SYNTHESIS_LENGTH', '150'))
 MAX_CHUNK_TEXT_LENGTH = int(os.getenv('MAX_CHUNK_TEXT_LENGTH', '300'))
+MAX_EVIDENCE_TEXT_LENGTH = int(os.getenv('MAX_EVIDENCE_TEXT_LENGTH', '1000'))
+MAX_STORED_EVIDENCE_TEXT_LENGTH = int(os.getenv('MAX_STORED_EVIDENCE_TEXT_LENGTH', '2048'))  # Evidence.text cap in Neo4j; full chunk text lives in Qdrant
 MAX_PDF_TEXT_EXTRACT = int(os.getenv('MAX_PDF_TEXT_EXTRACT', '5000'))
 
 # Search Configuration
@@ -186,6 +205,12 @@ MAX_PDF_PAGES = int(os.getenv('MAX_PDF_PAGES', '50'))
 MAX_CONCEPTS_PER_NODE = int(os.getenv('MAX_CONCEPTS_PER_NODE', '5'))
 MAX_EVIDENCE_PER_NODE = int(os.getenv('MAX_EVIDENCE_PER_NODE', '10'))
 
+# LLM Response Cache (empty LLM_CACHE_DIR = memory only)
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '')
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '2000'))
+LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))  # 0 = never expire
+LLM_CACHE_VERSION = os.getenv('LLM_CACHE_VERSION', 'v1')  # bump to invalidate every cached response
+
 # ============================
 # Feature Flags
 # ============================
@@ -195,6 +220,7 @@ FEATURE_TRANSLATION = os.getenv('FEATURE_TRANSLATION', 'true').lower() == 'true'
 FEATURE_RESOURCE_DISCOVERY = os.getenv('FEATURE_RESOURCE_DISCOVERY', 'true').lower() == 'true'
 FEATURE_SEMANTIC_DEDUPLICATION = os.getenv('FEATURE_SEMANTIC_DEDUPLICATION', 'true').lower() == 'true'
 FEATURE_BATCH_PROCESSING = os.getenv('FEATURE_BATCH_PROCESSING', 'true').lower() == 'true'
+FEATURE_LLM_CACHE = os.getenv('FEATURE_LLM_CACHE', 'true').lower() == 'true'
 
 # Debug and Logging
 DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
@@ -286,6 +312,7 @@ __all__ = [
     
     # Database Configuration
     'NEO4J_URI', 'NEO4J_USER', 'NEO4J_PASSWORD', 'NEO4J_MAX_CONNECTION_LIFETIME',
+    'NEO4J_CONNECTION_ACQUISITION_TIMEOUT', 'NEO4J_MAX_CONNECTION_POOL_SIZE', 'NEO4J_DATABASE',
     'QDRANT_HOST', 'QDRANT_PORT', 'QDRANT_URL', 'QDRANT_API_KEY', 'QDRANT_TIMEOUT',
     
     # Message Queue Configuration
@@ -295,13 +322,18 @@ __all__ = [
     
     # Firebase Configuration
     'FIREBASE_SERVICE_ACCOUNT', 'FIREBASE_DATABASE_URL', 'FIREBASE_TIMEOUT',
+    'FIREBASE_PROGRESS_INTERVAL', 'FIREBASE_PROGRESS_EVERY_N_FILES',
     
     # Pipeline Optimization
     'SEMANTIC_MERGE_THRESHOLD_VERY_HIGH', 'SEMANTIC_MERGE_THRESHOLD_HIGH',
     'SEMANTIC_MERGE_THRESHOLD_MEDIUM', 'SEMANTIC_MERGE_THRESHOLD_LOW',
     'CHUNK_SIZE', 'OVERLAP', 'MAX_CHUNKS', 'MIN_CHUNK_SIZE',
-    'BATCH_SIZE', 'EMBEDDING_BATCH_SIZE', 'QDRANT_BATCH_SIZE',
+    'BATCH_SIZE', 'EMBEDDING_BATCH_SIZE', 'QDRANT_BATCH_SIZE', 'PDF_WORKERS',
+    'ANALYSIS_BATCH_SIZE', 'NEO4J_WRITE_BATCH_SIZE', 'LLM_MAX_CONCURRENCY',
+    'CLOVA_REQUESTS_PER_MINUTE', 'CLOVA_RATE_BURST',
     'MAX_SYNTHESIS_LENGTH', 'MAX_CHUNK_TEXT_LENGTH', 'MAX_PDF_TEXT_EXTRACT',
+    'MAX_EVIDENCE_TEXT_LENGTH',
+    'MAX_STORED_EVIDENCE_TEXT_LENGTH',
     'SEARCH_THRESHOLD_HIGH', 'SEARCH_THRESHOLD_MEDIUM', 'SEARCH_THRESHOLD_LOW',
     'SEARCH_DEFAULT_LIMIT',
     
@@ -309,10 +341,11 @@ __all__ = [
     'CLOVA_API_TIMEOUT', 'PAPAGO_API_TIMEOUT', 'PDF_DOWNLOAD_TIMEOUT',
     'MAX_RETRY_ATTEMPTS', 'RETRY_BACKOFF_FACTOR', 'RETRY_INITIAL_DELAY',
     'MAX_PDF_PAGES', 'MAX_CONCEPTS_PER_NODE', 'MAX_EVIDENCE_PER_NODE',
+    'LLM_CACHE_DIR', 'LLM_CACHE_MAX_ENTRIES', 'LLM_CACHE_TTL_SECONDS', 'LLM_CACHE_VERSION',
     
     # Feature Flags
     'FEATURE_TRANSLATION', 'FEATURE_RESOURCE_DISCOVERY', 
-    'FEATURE_SEMANTIC_DEDUPLICATION', 'FEATURE_BATCH_PROCESSING',
+    'FEATURE_SEMANTIC_DEDUPLICATION', 'FEATURE_BATCH_PROCESSING', 'FEATURE_LLM_CACHE',
     'DEBUG_MODE', 'LOG_LEVEL', 'ENABLE_METRICS',
     
     # Constants
@@ -1,7 +1,25 @@
 import firebase_admin
 from firebase_admin import credentials, db
-from typing import Any
+from typing import Any, Dict, Tuple
+import threading
 import time
+import orjson
+
+def to_json_safe(value: Any) -> Any:
+    """
+    Chuẩn hóa payload về kiểu JSON thuần bằng orjson (dataclass, datetime, numpy, ...)
+    để SDK Firebase không bị lỗi khi serialize và serialize nhanh hơn
+    :param value: dữ liệu kết quả
+    :return: dữ liệu chỉ gồm dict/list/str/số/bool/None
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return orjson.loads(orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ))
+
 
 class FirebaseClient:
     def __init__(self, service_account_path: str, database_url: str):
@@ -25,7 +43,86 @@ class FirebaseClient:
         ref = db.reference(f"{path}/{job_id}")
         ref.set({
             "jobId": job_id,
-            "result": result,
+            "result": to_json_safe(result),
             "updatedAt": int(time.time() * 1000)
         })
         print(f"Pushed result for job {job_id} to Firebase under '{path}/{job_id}'")
+
+
+class FirebaseWriter(threading.Thread):
+    """
+    Ghi Firebase ở background thread để pipeline không bị chặn bởi HTTPS tới RTDB.
+    Chỉ giữ payload mới nhất cho mỗi (path, job_id): các update tiến độ liên tiếp
+    được gộp lại thành một lần ghi.
+    """
+
+    def __init__(self, client: FirebaseClient, coalesce_interval: float = 0.5):
+        """
+        :param client: FirebaseClient dùng để ghi thật sự
+        :param coalesce_interval: thời gian chờ (giây) để gộp các update mới hơn
+        """
+        super().__init__(name="firebase-writer", daemon=True)
+        self.client = client
+        self.coalesce_interval = coalesce_interval
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+
+    def submit(self, job_id: str, result: Any, path: str = "job_results"):
+        """
+        Đưa kết quả vào hàng đợi ghi (không chặn). Payload mới ghi đè payload
+        chưa gửi của cùng job.
+        """
+        with self._cond:
+            self._pending[(path, job_id)] = result
+            self._cond.notify_all()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending and self._stopping:
+                    return
+
+            # Chờ một chút để gộp các update mới hơn của cùng job
+            if not self._stopping:
+                time.sleep(self.coalesce_interval)
+
+            with self._cond:
+                batch = self._pending
+                self._pending = {}
+                self._in_flight = len(batch)
+
+            for (path, job_id), result in batch.items():
+                try:
+                    self.client.push_job_result(job_id, result, path=path)
+                except Exception as e:
+                    print(f"⚠️  Firebase background write failed for job {job_id}: {e}")
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Chờ tới khi mọi payload đang chờ đã được ghi.
+        :return: True nếu đã ghi hết trước timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 30.0):
+        """Ghi nốt các payload còn lại rồi dừng thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.join(timeout)
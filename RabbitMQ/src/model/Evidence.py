@@ -4,7 +4,7 @@ from typing import List
 from datetime import datetime, timezone
 import uuid
 
-@dataclass
+@dataclass(slots=True)
 class Evidence:
     Id: str = field(default_factory=lambda: str(uuid.uuid4()))
     SourceId: str = ""
@@ -6,7 +6,7 @@ import uuid
 from .Evidence import Evidence
 from .GapSuggestion import GapSuggestion
 
-@dataclass
+@dataclass(slots=True)
 class KnowledgeNode:
     Id: str = field(default_factory=lambda: str(uuid.uuid4()))
     Type: str = ""
@@ -0,0 +1,34 @@
+from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class StructureNodePayload(BaseModel):
+    """Any node of the merge-optimized structure (domain ... detail)"""
+    model_config = ConfigDict(extra="allow")
+
+    name: str = ""
+    synthesis: str = ""
+
+
+class SubconceptPayload(StructureNodePayload):
+    details: List[StructureNodePayload] = Field(default_factory=list)
+
+
+class ConceptPayload(StructureNodePayload):
+    subconcepts: List[SubconceptPayload] = Field(default_factory=list)
+
+
+class CategoryPayload(StructureNodePayload):
+    concepts: List[ConceptPayload] = Field(default_factory=list)
+
+
+class DomainPayload(StructureNodePayload):
+    name: str = Field(min_length=1)
+
+
+class MergeStructurePayload(BaseModel):
+    """Shape returned by extract_merge_optimized_structure (validated, not converted)"""
+    model_config = ConfigDict(extra="allow")
+
+    domain: DomainPayload
+    categories: List[CategoryPayload] = Field(min_length=1)
@@ -0,0 +1,28 @@
+from typing import List, Union
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class PositionedNodePayload(BaseModel):
+    """One node of the shallow-structure LLM response (positions index paragraphs)"""
+    model_config = ConfigDict(extra="ignore")
+
+    name: str = ""
+    synthesis: str = ""
+    # Usually [start, end] ranges; a bare index is tolerated
+    evidence_positions: List[Union[List[int], int]] = Field(default_factory=list)
+    key_claims_positions: List[int] = Field(default_factory=list)
+    questions_positions: List[int] = Field(default_factory=list)
+
+
+class ShallowHierarchyPayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    level_0: PositionedNodePayload = Field(default_factory=PositionedNodePayload)
+    level_1_nodes: List[PositionedNodePayload] = Field(default_factory=list)
+
+
+class ShallowStructurePayload(BaseModel):
+    """Top-level shape returned by the shallow-structure extraction prompt"""
+    model_config = ConfigDict(extra="ignore")
+
+    hierarchy: ShallowHierarchyPayload
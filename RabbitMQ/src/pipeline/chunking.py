@@ -1,35 +1,19 @@
 """Enhanced smart chunking module with semantic boundaries"""
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterator, Iterable
 
 
-def create_smart_chunks(
+def _iter_raw_chunks(
     text: str,
-    chunk_size: int = 2000,
-    overlap: int = 400,
-    min_chunk_size: int = 200
-) -> List[Dict]:
+    chunk_size: int,
+    overlap: int,
+    min_chunk_size: int
+) -> Iterator[Dict]:
     """
-    Create overlapping chunks with semantic boundaries
-
-    Args:
-        text: Input text to chunk
-        chunk_size: Target chunk size in characters
-        overlap: Overlap size between chunks
-        min_chunk_size: Minimum chunk size to avoid too small chunks
-
-    Returns:
-        List of chunk dictionaries with text, position, and metadata
-        Each chunk contains:
-        - text: The chunk text
-        - start_pos: Character position where chunk starts in original text
-        - end_pos: Character position where chunk ends in original text
-        - index: Sequential chunk number
-        - overlap_previous: Text that overlaps with previous chunk
-        - has_more: Whether there are more chunks after this one
+    Yield overlapping chunks with semantic boundaries (before small-chunk merging)
     """
     if not text or not text.strip():
-        return []
+        return
 
     # Store original text for position tracking
     original_text = text
@@ -52,9 +36,8 @@ def create_smart_chunks(
             current_pos = para_end
 
     if not paragraphs:
-        return []
+        return
 
-    chunks = []
     current_chunk = ""
     chunk_start_pos = 0
     chunk_index = 0
@@ -81,14 +64,14 @@ def create_smart_chunks(
                     chunk_end_pos = sentence_start + len(sentence_chunk)
 
                     # Save current sentence chunk
-                    chunks.append({
+                    yield {
                         "index": chunk_index,
                         "text": sentence_chunk.strip(),
                         "start_pos": chunk_start_pos,
                         "end_pos": chunk_end_pos,
                         "overlap_previous": "",
                         "has_more": True
-                    })
+                    }
                     chunk_index += 1
 
                     # Start new chunk with overlap from previous
@@ -119,14 +102,14 @@ def create_smart_chunks(
                 # Find end position in original text
                 chunk_end_pos = paragraph_positions[i-1][1]
 
-                chunks.append({
+                yield {
                     "index": chunk_index,
                     "text": current_chunk.strip(),
                     "start_pos": chunk_start_pos,
                     "end_pos": chunk_end_pos,
                     "overlap_previous": get_semantic_overlap(current_chunk, overlap),
                     "has_more": True
-                })
+                }
                 chunk_index += 1
 
                 # Start new chunk with overlap from previous
@@ -143,19 +126,73 @@ def create_smart_chunks(
     if current_chunk and len(current_chunk) >= min_chunk_size:
         chunk_end_pos = paragraph_positions[-1][1] if paragraph_positions else len(text)
 
-        chunks.append({
+        yield {
             "index": chunk_index,
             "text": current_chunk.strip(),
             "start_pos": chunk_start_pos,
             "end_pos": chunk_end_pos,
             "overlap_previous": get_semantic_overlap(current_chunk, overlap),
             "has_more": False
-        })
-    
-    # Post-process: Ensure chunks aren't too small (merge small chunks)
-    chunks = merge_small_chunks(chunks, min_chunk_size)
+        }
+
+
+def iter_smart_chunks(
+    text: str,
+    chunk_size: int = 2000,
+    overlap: int = 400,
+    min_chunk_size: int = 200
+) -> Iterator[Dict]:
+    """
+    Lazily yield overlapping chunks with semantic boundaries
+
+    Same output as create_smart_chunks, but chunks are produced one at a time,
+    so callers that only need the first N chunks (e.g. MAX_CHUNKS) stop early
+    and never hold every overlapping copy of the document at once.
+
+    Args:
+        text: Input text to chunk
+        chunk_size: Target chunk size in characters
+        overlap: Overlap size between chunks
+        min_chunk_size: Minimum chunk size to avoid too small chunks
+
+    Yields:
+        Chunk dictionaries (see create_smart_chunks)
+    """
+    return iter_merged_small_chunks(
+        _iter_raw_chunks(text, chunk_size, overlap, min_chunk_size),
+        min_chunk_size
+    )
+
+
+def create_smart_chunks(
+    text: str,
+    chunk_size: int = 2000,
+    overlap: int = 400,
+    min_chunk_size: int = 200
+) -> List[Dict]:
+    """
+    Create overlapping chunks with semantic boundaries
+
+    Args:
+        text: Input text to chunk
+        chunk_size: Target chunk size in characters
+        overlap: Overlap size between chunks
+        min_chunk_size: Minimum chunk size to avoid too small chunks
+
+    Returns:
+        List of chunk dictionaries with text, position, and metadata
+        Each chunk contains:
+        - text: The chunk text
+        - start_pos: Character position where chunk starts in original text
+        - end_pos: Character position where chunk ends in original text
+        - index: Sequential chunk number
+        - overlap_previous: Text that overlaps with previous chunk
+        - has_more: Whether there are more chunks after this one
+    """
+    chunks = list(iter_smart_chunks(text, chunk_size, overlap, min_chunk_size))
     
-    print(f"✓ Created {len(chunks)} chunks (size={chunk_size}, overlap={overlap})")
+    if chunks:
+        print(f"✓ Created {len(chunks)} chunks (size={chunk_size}, overlap={overlap})")
     return chunks
 
 
@@ -198,56 +235,59 @@ def get_semantic_overlap(text: str, overlap_size: int) -> str:
     return overlap_candidate
 
 
-def merge_small_chunks(chunks: List[Dict], min_size: int) -> List[Dict]:
+def iter_merged_small_chunks(chunks: Iterable[Dict], min_size: int) -> Iterator[Dict]:
     """
-    Merge chunks that are too small with their neighbors
+    Merge chunks that are too small with their neighbors, one lookahead at a time
 
     Args:
-        chunks: List of chunk dictionaries
+        chunks: Iterable of chunk dictionaries
         min_size: Minimum chunk size requirement
 
-    Returns:
-        Merged chunks list with updated positions
+    Yields:
+        Merged chunks with sequential indices; the last one has has_more=False
     """
-    if not chunks:
-        return []
+    it = iter(chunks)
+    current = next(it, None)
+    idx = 0
 
-    merged_chunks = []
-    i = 0
-
-    while i < len(chunks):
-        current_chunk = chunks[i]
+    while current is not None:
+        next_chunk = next(it, None)
 
-        # If chunk is large enough, keep it as is
-        if len(current_chunk['text']) >= min_size or i == len(chunks) - 1:
-            merged_chunks.append(current_chunk)
-            i += 1
+        # If chunk is large enough (or is the last one), keep it as is
+        if len(current['text']) >= min_size or next_chunk is None:
+            out = current
+            current = next_chunk
         else:
             # Merge with next chunk
-            if i + 1 < len(chunks):
-                next_chunk = chunks[i + 1]
-                merged_text = current_chunk['text'] + "\n\n" + next_chunk['text']
-
-                merged_chunks.append({
-                    "index": current_chunk['index'],
-                    "text": merged_text,
-                    "start_pos": current_chunk.get('start_pos', 0),
-                    "end_pos": next_chunk.get('end_pos', 0),
-                    "overlap_previous": current_chunk['overlap_previous'],
-                    "has_more": next_chunk['has_more']
-                })
-                i += 2  # Skip next chunk since we merged it
-            else:
-                merged_chunks.append(current_chunk)
-                i += 1
+            out = {
+                "index": current['index'],
+                "text": current['text'] + "\n\n" + next_chunk['text'],
+                "start_pos": current.get('start_pos', 0),
+                "end_pos": next_chunk.get('end_pos', 0),
+                "overlap_previous": current['overlap_previous'],
+                "has_more": next_chunk['has_more']
+            }
+            current = next(it, None)  # Skip next chunk since we merged it
+
+        out['index'] = idx
+        if current is None:
+            out['has_more'] = False
+        idx += 1
+        yield out
 
-    # Update indices
-    for idx, chunk in enumerate(merged_chunks):
-        chunk['index'] = idx
-        if idx == len(merged_chunks) - 1:
-            chunk['has_more'] = False
 
-    return merged_chunks
+def merge_small_chunks(chunks: List[Dict], min_size: int) -> List[Dict]:
+    """
+    Merge chunks that are too small with their neighbors
+
+    Args:
+        chunks: List of chunk dictionaries
+        min_size: Minimum chunk size requirement
+
+    Returns:
+        Merged chunks list with updated positions
+    """
+    return list(iter_merged_small_chunks(chunks, min_size))
 
 
 def calculate_chunk_stats(chunks: List[Dict]) -> Dict:
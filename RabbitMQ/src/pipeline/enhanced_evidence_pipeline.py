@@ -131,16 +131,22 @@ class EnhancedEvidencePipeline:
         # Step 3: Create Evidence objects
         print("📝 Step 3: Creating Evidence objects...")
         evidences = []
+        # Document-level fields are the same for every chunk
+        source_id = document["id"]
+        source_name = document.get("title", "")
+        page = document.get("page", 0)
+        language = document.get("language", "ENG")
+        created_at = datetime.now(timezone.utc)
         for chunk in optimized_chunks:
             evidence = Evidence(
-                Id=f"{document['id']}_CHUNK_{chunk['index']}",
-                SourceId=document["id"],
-                SourceName=document.get("title", ""),
+                Id=f"{source_id}_CHUNK_{chunk['index']}",
+                SourceId=source_id,
+                SourceName=source_name,
                 ChunkId=str(chunk["index"]),
                 Text=chunk["optimized_text"],
-                Page=document.get("page", 0),
-                Language=document.get("language", "ENG"),
-                SourceLanguage=document.get("language", "ENG"),
+                Page=page,
+                Language=language,
+                SourceLanguage=language,
 
                 # Position tracking
                 StartPos=chunk["start_pos"],
@@ -156,7 +162,7 @@ class EnhancedEvidencePipeline:
                 # Metadata
                 Confidence=1.0 if optimize_with_llm else 0.8,
                 EvidenceStrength=0.0,  # Can be calculated later
-                CreatedAt=datetime.now(timezone.utc)
+                CreatedAt=created_at
             )
             evidences.append(evidence)
 
@@ -6,12 +6,12 @@ Enhanced LLM analysis optimized for deep hierarchical node merging
 - Centralized config for API keys and timeouts
 """
 
-import json
 import re
 import uuid
+import orjson
+from collections import defaultdict
 from typing import Dict, Any, List, Optional
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import httpx
 import time
 from ..config import (
@@ -30,8 +30,8 @@ from ..config import (
     # Feature Flags
     FEATURE_TRANSLATION, FEATURE_RESOURCE_DISCOVERY,
     FEATURE_SEMANTIC_DEDUPLICATION,
-    DEBUG_MODE,MAX_CHUNK_TEXT_LENGTH,
-    BATCH_SIZE,
+    DEBUG_MODE,MAX_CHUNK_TEXT_LENGTH,MAX_EVIDENCE_TEXT_LENGTH,
+    BATCH_SIZE, ANALYSIS_BATCH_SIZE, LLM_MAX_CONCURRENCY,
     
     # Validation
     CONFIG_VALID, CONFIG_SUMMARY,
@@ -39,6 +39,8 @@ from ..config import (
     # Constants
     EMBEDDING_DIMENSION
 )
+from .llm_cache import llm_cached
+from .rate_limiter import clova_rate_limiter
 # ============================================================================
 # PROMPT TEMPLATES
 # ============================================================================
@@ -238,6 +240,8 @@ TASK: For each chunk, determine:
    - "low": Chunk mentions concept tangentially or has minimal relevant content
 3. SUMMARY: Concise description (max 80 chars) of chunk's key point
 4. KEY_CLAIMS: 1-3 specific claims or facts from the chunk
+5. QUESTIONS: 0-2 open questions the chunk raises but does not answer
+6. TOPIC: Short topic label (2-4 words) for the chunk
 
 EVALUATION CRITERIA:
 HIGH merge_potential:
@@ -272,7 +276,9 @@ Output: {{
     "Two-dimensional labeled data structure",
     "Supports filtering, grouping, merging operations",
     "Essential for Python data manipulation"
-  ]
+  ],
+  "questions": ["How does DataFrame performance scale with very large datasets?"],
+  "topic": "pandas DataFrame"
 }}
 
 Example 2:
@@ -284,7 +290,9 @@ Output: {{
   "primary_concept": "Data Processing",
   "merge_potential": "low",
   "summary": "Generic conclusion statement about data science",
-  "key_claims": ["Summary of data science exploration"]
+  "key_claims": ["Summary of data science exploration"],
+  "questions": [],
+  "topic": "Conclusion"
 }}
 
 Example 3:
@@ -300,7 +308,9 @@ Output: {{
     "Backpropagation adjusts weights through gradient computation",
     "Uses chain rule for gradient calculation",
     "Gradient descent minimizes loss function"
-  ]
+  ],
+  "questions": ["How is the learning rate chosen for gradient descent?"],
+  "topic": "Backpropagation"
 }}
 
 NOW ANALYZE THESE CHUNKS:
@@ -312,7 +322,9 @@ RESPONSE FORMAT (strict JSON array):
     "primary_concept": "Exact concept name from structure",
     "merge_potential": "high|medium|low",
     "summary": "Specific 80-char summary of chunk content",
-    "key_claims": ["Claim 1", "Claim 2", "Claim 3"]
+    "key_claims": ["Claim 1", "Claim 2", "Claim 3"],
+    "questions": ["Open question 1"],
+    "topic": "Short topic label"
   }}
 ]
 
@@ -333,10 +345,129 @@ VALIDATION:
 
 Return ONLY the JSON array, no additional text."""
 
+MERGE_CANDIDATES_PROMPT_TEMPLATE = """You are analyzing nodes from multiple documents to identify merge candidates.
+
+NODES TO COMPARE (Level {level}):
+{nodes_text}
+
+TASK: Identify groups of nodes that should be merged together.
+
+MERGE CRITERIA:
+1. **Semantic Similarity**: Nodes discuss the same core concept, even with different terminology
+   Example: "Data Processing" ≈ "Information Processing" ≈ "Data Manipulation"
+
+2. **Hierarchical Consistency**: Nodes at the same level with similar parent contexts
+   Example: Both are "subconcepts" under similar "concepts"
+
+3. **Synthesis Overlap**: Descriptions cover similar ground with >70% conceptual overlap
+   Example: "Methods for data cleaning" ≈ "Techniques for data preprocessing"
+
+4. **Generalization Potential**: Can be merged into a common general term
+   Example: "Python Lists", "Java ArrayList" → "Dynamic Arrays"
+
+SIMILARITY SCORING:
+- 0.95-1.0: Near-identical concepts, different phrasing (e.g., "ML" vs "Machine Learning")
+- 0.85-0.94: Same core concept, minor scope differences (e.g., "Data Cleaning" vs "Data Preprocessing")
+- 0.75-0.84: Related concepts that can be merged under general term (e.g., "REST API" vs "HTTP Services")
+- 0.60-0.74: Somewhat related but distinct subconcepts
+- Below 0.60: Too different to merge
+
+DO NOT MERGE:
+- Nodes with same name but completely different contexts
+- Generic terms that appear everywhere ("Introduction", "Conclusion", "Overview")
+- Nodes where merging would lose important distinctions
+
+OUTPUT FORMAT (JSON array of merge groups):
+[
+  {{
+    "merge_group_id": "unique_id_1",
+    "merged_name": "Suggested general name for merged node",
+    "similarity_score": 0.87,
+    "level": {level},
+    "nodes": [
+      {{
+        "node_index": 0,
+        "doc_name": "Document name",
+        "original_name": "Original node name",
+        "synthesis": "Original synthesis"
+      }},
+      {{
+        "node_index": 5,
+        "doc_name": "Another document",
+        "original_name": "Another node name",
+        "synthesis": "Another synthesis"
+      }}
+    ],
+    "merged_synthesis": "Combined synthesis that captures all nodes (150-200 chars)",
+    "merge_rationale": "Why these nodes should merge (80 chars)"
+  }}
+]
+
+EXAMPLES:
+
+Example 1 - High Similarity (0.92):
+{{
+  "merge_group_id": "mg_001",
+  "merged_name": "Data Processing Pipelines",
+  "similarity_score": 0.92,
+  "level": 3,
+  "nodes": [
+    {{"node_index": 0, "doc_name": "ETL Guide", "original_name": "Data Processing", "synthesis": "Methods for transforming raw data"}},
+    {{"node_index": 3, "doc_name": "Analytics Manual", "original_name": "Data Pipeline Operations", "synthesis": "Techniques for data transformation"}}
+  ],
+  "merged_synthesis": "Comprehensive methods and techniques for transforming, processing, and moving data through analytical pipelines including ETL operations",
+  "merge_rationale": "Both describe data transformation processes with similar scope"
+}}
+
+Example 2 - Medium Similarity (0.78):
+{{
+  "merge_group_id": "mg_002",
+  "merged_name": "API Communication Patterns",
+  "similarity_score": 0.78,
+  "level": 4,
+  "nodes": [
+    {{"node_index": 1, "doc_name": "REST Guide", "original_name": "REST API Design", "synthesis": "RESTful service patterns"}},
+    {{"node_index": 7, "doc_name": "Microservices", "original_name": "HTTP Service Communication", "synthesis": "HTTP-based inter-service calls"}}
+  ],
+  "merged_synthesis": "Patterns for HTTP-based service communication including RESTful design principles and inter-service API protocols",
+  "merge_rationale": "Both cover HTTP-based service communication, mergeable under general API term"
+}}
+
+VALIDATION:
+✓ Only include groups with similarity_score >= {similarity_threshold}
+✓ Each group must have at least 2 nodes
+✓ Merged_name should be general and inclusive
+✓ Merged_synthesis should combine key points from all nodes
+✓ No duplicate node_index values across groups
+
+Return ONLY the JSON array of merge groups."""
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Fallback patterns for wrapped responses, compiled once instead of per response
+JSON_EXTRACTION_PATTERNS = tuple(re.compile(pattern, re.DOTALL) for pattern in (
+    r'```json\s*(.*?)\s*```',  # Markdown JSON block
+    r'```\s*(.*?)\s*```',       # Generic code block
+    r'\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\})*)*\}))*\}',  # Nested JSON object
+    r'\[(?:[^\[\]]|(?:\[(?:[^\[\]]|(?:\[[^\[\]]*\])*)*\]))*\]'  # JSON array
+))
+
+# Page markers and whitespace runs left by PDF extraction carry no content but
+# still cost input tokens in every structure prompt
+PROMPT_NOISE_PATTERNS = (
+    (re.compile(r'=== PAGE \d+ ===\s*'), ''),
+    (re.compile(r'[ \t]+'), ' '),
+    (re.compile(r'\n\s*\n+'), '\n\n'),
+)
+
+def compact_prompt_text(text: str) -> str:
+    """Strip extraction artifacts so the prompt budget goes to document text"""
+    for pattern, replacement in PROMPT_NOISE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
 def extract_json_from_text(text: str) -> Dict[str, Any]:
     """
     Extract JSON from LLM response with multiple fallback strategies.
@@ -345,25 +476,17 @@ def extract_json_from_text(text: str) -> Dict[str, Any]:
     if not text or not isinstance(text, str):
         return {}
     
-    # Try direct JSON parse first
+    # Try direct JSON parse first (orjson: several times faster than json on large responses)
     try:
-        return json.loads(text.strip())
+        return orjson.loads(text.strip())
     except:
         pass
 
     # Try various regex patterns
-    patterns = [
-        r'```json\s*(.*?)\s*```',  # Markdown JSON block
-        r'```\s*(.*?)\s*```',       # Generic code block
-        r'\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\})*)*\}))*\}',  # Nested JSON object
-        r'\[(?:[^\[\]]|(?:\[(?:[^\[\]]|(?:\[[^\[\]]*\])*)*\]))*\]'  # JSON array
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.DOTALL)
-        for match in matches:
+    for pattern in JSON_EXTRACTION_PATTERNS:
+        for match in pattern.findall(text):
             try:
-                parsed = json.loads(match.strip())
+                parsed = orjson.loads(match.strip())
                 if parsed:  # Ensure non-empty result
                     return parsed
             except:
@@ -375,7 +498,7 @@ def extract_json_from_text(text: str) -> Dict[str, Any]:
         end_idx = text.rfind('}') + 1
         if start_idx != -1 and end_idx > start_idx:
             potential_json = text[start_idx:end_idx]
-            return json.loads(potential_json)
+            return orjson.loads(potential_json)
     except:
         pass
 
@@ -397,11 +520,12 @@ def validate_structure_depth(structure: Dict) -> Dict:
         "issues": []
     }
     
+    depth_distribution = stats["depth_distribution"]
+    
+    # One walk that only bumps the per-depth counter; totals and min/max
+    # depth are derived from the distribution afterwards
     def count_depth(node, current_depth):
-        stats["total_nodes"] += 1
-        stats["depth_distribution"][current_depth] = stats["depth_distribution"].get(current_depth, 0) + 1
-        stats["max_depth"] = max(stats["max_depth"], current_depth)
-        stats["min_depth"] = min(stats["min_depth"], current_depth)
+        depth_distribution[current_depth] = depth_distribution.get(current_depth, 0) + 1
         
         # Check children at each level
         if current_depth == 2 and "concepts" in node:
@@ -422,8 +546,13 @@ def validate_structure_depth(structure: Dict) -> Dict:
     for category in structure.get("categories", []):
         count_depth(category, 2)
     
+    present_depths = [depth for depth, count in depth_distribution.items() if count]
+    stats["total_nodes"] = sum(depth_distribution.values())
+    stats["min_depth"] = min(present_depths, default=stats["min_depth"])
+    stats["max_depth"] = max(present_depths, default=stats["max_depth"])
+    
     # Calculate average depth
-    total_depth = sum(depth * count for depth, count in stats["depth_distribution"].items())
+    total_depth = sum(depth * count for depth, count in depth_distribution.items())
     stats["avg_depth"] = total_depth / max(stats["total_nodes"], 1)
     
     # Validation checks
@@ -440,6 +569,7 @@ def validate_structure_depth(structure: Dict) -> Dict:
 # LLM API FUNCTIONS
 # ============================================================================
 
+@llm_cached
 def call_llm_sync(prompt: str, max_tokens: int = 3000, 
                   system_message: str = SYSTEM_MESSAGE,
                   clova_api_key: str = "", 
@@ -474,6 +604,7 @@ def call_llm_sync(prompt: str, max_tokens: int = 3000,
     max_retries = 3
     for attempt in range(max_retries):
         try:
+            clova_rate_limiter.acquire()
             r = requests.post(
                 clova_api_url, 
                 json=data, 
@@ -481,7 +612,7 @@ def call_llm_sync(prompt: str, max_tokens: int = 3000,
                 timeout=CLOVA_API_TIMEOUT
             )
             if r.status_code == 200:
-                content = r.json().get('result', {}).get('message', {}).get('content', '')
+                content = orjson.loads(r.content).get('result', {}).get('message', {}).get('content', '')
                 result = extract_json_from_text(content)
                 if result:  # Only return if we got valid JSON
                     return result
@@ -496,12 +627,17 @@ def call_llm_sync(prompt: str, max_tokens: int = 3000,
 
     return {}
 
+@llm_cached
 async def call_llm_async(prompt: str, max_tokens: int = 2000,
                          system_message: str = SYSTEM_MESSAGE,
                          clova_api_key: str = "",
-                         clova_api_url: str = "") -> Any:
+                         clova_api_url: str = "",
+                         http_client: Optional[httpx.AsyncClient] = None) -> Any:
     """
     Asynchronous LLM call for batch processing.
+    
+    Pass a shared http_client to reuse one connection pool across many calls;
+    otherwise a short-lived client is created for this call.
     """
     if not clova_api_key:
         clova_api_key = CLOVA_API_KEY
@@ -525,14 +661,33 @@ async def call_llm_async(prompt: str, max_tokens: int = 2000,
         "repeatPenalty": 1.1
     }
 
+    async def _post(client: httpx.AsyncClient) -> Any:
+        # Same retry/backoff policy as call_llm_sync, without blocking the loop
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                await clova_rate_limiter.acquire_async()
+                resp = await client.post(clova_api_url, json=data, headers=headers)
+                if resp.status_code == 200:
+                    content = orjson.loads(resp.content).get('result', {}).get('message', {}).get('content', '')
+                    result = extract_json_from_text(content)
+                    if result:
+                        return result
+                    print(f"⚠️ Async attempt {attempt + 1}: Empty or invalid JSON response")
+                else:
+                    print(f"⚠️ Async attempt {attempt + 1}: HTTP {resp.status_code}")
+            except Exception as e:
+                print(f"⚠️ Async LLM error (attempt {attempt + 1}): {e}")
+            
+            if attempt < max_retries - 1:
+                await asyncio.sleep(2 ** attempt)
+        return {}
+
+    if http_client is not None:
+        return await _post(http_client)
+
     async with httpx.AsyncClient(timeout=CLOVA_API_TIMEOUT) as client:
-        try:
-            resp = await client.post(clova_api_url, json=data, headers=headers)
-            content = resp.json().get('result', {}).get('message', {}).get('content', '')
-            return extract_json_from_text(content)
-        except Exception as e:
-            print(f"⚠️ Async LLM error: {e}")
-            return {}
+        return await _post(client)
 
 # ============================================================================
 # MAIN EXTRACTION FUNCTIONS
@@ -568,7 +723,9 @@ def extract_deep_merge_structure(
         Dict with hierarchical structure and optional validation stats
     """
     
-    # Truncate content smartly (try to end at sentence)
+    # Drop page markers/whitespace first so the 2500 chars are all content,
+    # then truncate smartly (try to end at sentence)
+    full_text = compact_prompt_text(full_text[:5000])
     content = full_text[:2500]
     if len(full_text) > 2500:
         last_period = content.rfind('.')
@@ -613,17 +770,25 @@ def analyze_chunks_for_merging(
     chunks: List[Dict], 
     structure: Dict,
     clova_api_key: str = "", 
-    clova_api_url: str = ""
+    clova_api_url: str = "",
+    batch_size: int = ANALYSIS_BATCH_SIZE,
+    max_concurrent_batches: int = LLM_MAX_CONCURRENCY
 ) -> Dict[str, Any]:
     """
     Analyze chunks for merging with deep structure awareness.
-    Uses hybrid async + ThreadPool for performance.
+    
+    Chunks are packed `batch_size` at a time into a single numbered prompt
+    (one LLM request per pack instead of per chunk) and all packs are sent
+    concurrently on one event loop over a shared HTTP connection pool.
     
     Args:
         chunks: List of text chunks with metadata
         structure: Hierarchical structure from extract_deep_merge_structure
         clova_api_key: API key
         clova_api_url: API URL
+        batch_size: Chunks per LLM request (keep below ~10, where response
+            quality and latency start to degrade)
+        max_concurrent_batches: Maximum in-flight LLM requests
     
     Returns:
         Dict with analysis_results containing chunk mappings
@@ -659,95 +824,97 @@ def analyze_chunks_for_merging(
         print("⚠️ No structure concepts found")
         return {"analysis_results": []}
     
-    print(f"📋 Analyzing {len(chunks)} chunks against {len(structure_concepts)} concepts")
+    batch_size = max(1, batch_size)
+    print(f"📋 Analyzing {len(chunks)} chunks against {len(structure_concepts)} concepts "
+          f"({batch_size} chunks/request)")
     
-    BATCH_SIZE = 10  # Define an appropriate default value for BATCH_SIZE
     MAX_CHUNK_TEXT = MAX_CHUNK_TEXT_LENGTH
-    MAX_CONCURRENT_BATCHES = 5
-
-    async def process_batch(batch_start: int, batch: List[Dict]) -> List[Dict]:
-        """Process a batch of chunks asynchronously"""
-        
-        # Prepare chunks text
-        chunks_text = ""
-        for i, chunk in enumerate(batch):
-            text = chunk.get('text', '')[:MAX_CHUNK_TEXT].replace('\n', ' ').strip()
-            chunks_text += f"[Chunk {i}]: {text}\n\n"
+    
+    # Same concept context for every pack (show top 10)
+    concepts_display = ", ".join(structure_concepts[:10])
+    if len(structure_concepts) > 10:
+        concepts_display += f" ... and {len(structure_concepts) - 10} more"
+
+    def parse_batch_result(llm_result: Any, batch_start: int, batch: List[Dict]) -> List[Dict]:
+        """Map the numbered JSON analyses back onto the chunks of one pack"""
+        if isinstance(llm_result, dict) and 'chunks' in llm_result:
+            # Handle alternative response format
+            analyses = llm_result['chunks']
+        elif isinstance(llm_result, list):
+            analyses = llm_result
+        else:
+            return []
         
-        # Format structure concepts (show top 10 for context)
-        concepts_display = ", ".join(structure_concepts[:10])
-        if len(structure_concepts) > 10:
-            concepts_display += f" ... and {len(structure_concepts) - 10} more"
+        batch_results = []
+        for analysis in analyses:
+            if not isinstance(analysis, dict):
+                continue
+            idx = analysis.get('chunk_index', 0)
+            if not isinstance(idx, int) or not 0 <= idx < len(batch):
+                continue
+            # Trim once here so downstream evidence/storage never carries the
+            # full overlapping chunk text
+            text = batch[idx].get('text', '')[:MAX_EVIDENCE_TEXT_LENGTH]
+            batch_results.append({
+                'chunk_index': batch_start + idx,
+                'text': text,
+                'primary_concept': analysis.get('primary_concept', ''),
+                'merge_potential': analysis.get('merge_potential', 'medium'),
+                'summary': analysis.get('summary', text[:80]),
+                'key_claims': analysis.get('key_claims', []),
+                # Enrichment fields come from the same call (no second pass per chunk)
+                'questions': analysis.get('questions', []),
+                'topic': analysis.get('topic', '')
+            })
+        return batch_results
+
+    async def process_batch(
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        batch_start: int,
+        batch: List[Dict]
+    ) -> List[Dict]:
+        """Send one pack of chunks as a single numbered prompt"""
+        chunks_text = "\n\n".join(
+            f"[Chunk {i}]: {chunk.get('text', '')[:MAX_CHUNK_TEXT].replace(chr(10), ' ').strip()}"
+            for i, chunk in enumerate(batch)
+        )
         
         prompt = CHUNK_ANALYSIS_PROMPT_TEMPLATE.format(
             structure_concepts=concepts_display,
             chunks_text=chunks_text
         )
         
-        llm_result = await call_llm_async(
-            prompt,
-            max_tokens=2000,
-            system_message=SYSTEM_MESSAGE,
-            clova_api_key=clova_api_key,
-            clova_api_url=clova_api_url
-        )
-        
-        # Process results
-        batch_results = []
-        if isinstance(llm_result, list):
-            for analysis in llm_result:
-                idx = analysis.get('chunk_index', 0)
-                if idx < len(batch):
-                    batch_results.append({
-                        'chunk_index': batch_start + idx,
-                        'text': batch[idx].get('text', ''),
-                        'primary_concept': analysis.get('primary_concept', ''),
-                        'merge_potential': analysis.get('merge_potential', 'medium'),
-                        'summary': analysis.get('summary', batch[idx].get('text', '')[:80]),
-                        'key_claims': analysis.get('key_claims', [])
-                    })
-        elif isinstance(llm_result, dict) and 'chunks' in llm_result:
-            # Handle alternative response format
-            for analysis in llm_result['chunks']:
-                idx = analysis.get('chunk_index', 0)
-                if idx < len(batch):
-                    batch_results.append({
-                        'chunk_index': batch_start + idx,
-                        'text': batch[idx].get('text', ''),
-                        'primary_concept': analysis.get('primary_concept', ''),
-                        'merge_potential': analysis.get('merge_potential', 'medium'),
-                        'summary': analysis.get('summary', batch[idx].get('text', '')[:80]),
-                        'key_claims': analysis.get('key_claims', [])
-                    })
-        
-        return batch_results
-
-    async def run_all_batches():
-        """Run all batches with concurrency control"""
-        nonlocal results
-        
-        loop = asyncio.get_running_loop()
-        executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES)
-        
-        tasks = []
-        for start in range(0, len(chunks), BATCH_SIZE):
-            batch = chunks[start:start + BATCH_SIZE]
-            # Run async function in thread pool
-            task = loop.run_in_executor(
-                executor, 
-                lambda s=start, b=batch: asyncio.run(process_batch(s, b))
+        async with semaphore:
+            llm_result = await call_llm_async(
+                prompt,
+                max_tokens=2500,  # room for questions/topic per chunk
+                system_message=SYSTEM_MESSAGE,
+                clova_api_key=clova_api_key,
+                clova_api_url=clova_api_url,
+                http_client=client
             )
-            tasks.append(task)
         
-        batch_results = await asyncio.gather(*tasks)
-        
-        for br in batch_results:
-            results.extend(br)
-        
-        executor.shutdown(wait=True)
-
-    # Run the async batch processing
-    asyncio.run(run_all_batches())
+        return parse_batch_result(llm_result, batch_start, batch)
+
+    async def run_all_batches() -> List[List[Dict]]:
+        """Run all packs concurrently with a bounded number of in-flight requests"""
+        semaphore = asyncio.Semaphore(max_concurrent_batches)
+        # Pool matches the semaphore so every in-flight pack reuses a kept-alive connection
+        async with httpx.AsyncClient(
+            timeout=CLOVA_API_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=max_concurrent_batches,
+                max_keepalive_connections=max_concurrent_batches
+            )
+        ) as client:
+            return await asyncio.gather(*(
+                process_batch(client, semaphore, start, chunks[start:start + batch_size])
+                for start in range(0, len(chunks), batch_size)
+            ))
+
+    for batch_results in asyncio.run(run_all_batches()):
+        results.extend(batch_results)
     
     print(f"✅ Analyzed {len(results)} chunks")
     
@@ -756,10 +923,11 @@ def analyze_chunks_for_merging(
     medium_potential = sum(1 for r in results if r.get('merge_potential') == 'medium')
     low_potential = sum(1 for r in results if r.get('merge_potential') == 'low')
     
-    print(f"📊 Merge Potential Distribution:")
-    print(f"   High: {high_potential} ({high_potential/len(results)*100:.1f}%)")
-    print(f"   Medium: {medium_potential} ({medium_potential/len(results)*100:.1f}%)")
-    print(f"   Low: {low_potential} ({low_potential/len(results)*100:.1f}%)")
+    if results:
+        print(f"📊 Merge Potential Distribution:")
+        print(f"   High: {high_potential} ({high_potential/len(results)*100:.1f}%)")
+        print(f"   Medium: {medium_potential} ({medium_potential/len(results)*100:.1f}%)")
+        print(f"   Low: {low_potential} ({low_potential/len(results)*100:.1f}%)")
     
     return {
         "analysis_results": results,
@@ -844,19 +1012,17 @@ def identify_merge_candidates(
             })
         
         # Extract categories and below
+        domain_synthesis = structure.get('domain', {}).get('synthesis', '')
         for category in structure.get('categories', []):
             cat_name = category.get('name', '')
-            extract_nodes(category, 2, f"{doc_name}/{cat_name}", structure.get('domain', {}).get('synthesis', ''))
+            extract_nodes(category, 2, f"{doc_name}/{cat_name}", domain_synthesis)
     
     print(f"📊 Extracted {len(all_nodes)} nodes from all structures")
     
     # Group nodes by level for fair comparison
-    nodes_by_level = {}
+    nodes_by_level = defaultdict(list)
     for node in all_nodes:
-        level = node['level']
-        if level not in nodes_by_level:
-            nodes_by_level[level] = []
-        nodes_by_level[level].append(node)
+        nodes_by_level[node['level']].append(node)
     
     merge_candidates = []
     
@@ -873,9 +1039,8 @@ def identify_merge_candidates(
             batch = nodes[batch_start:batch_start + BATCH_SIZE]
             
             # Prepare prompt
-            nodes_text = ""
-            for idx, node in enumerate(batch):
-                nodes_text += f"""[Node {idx}]
+            nodes_text = "".join(
+                f"""[Node {idx}]
 Document: {node['doc_name']}
 Level: {node['level']}
 Name: {node['name']}
@@ -884,103 +1049,14 @@ Path: {node['path']}
 Parent Context: {node['parent_synthesis'][:100]}
 
 """
+                for idx, node in enumerate(batch)
+            )
             
-            prompt = f"""You are analyzing nodes from multiple documents to identify merge candidates.
-
-NODES TO COMPARE (Level {level}):
-{nodes_text}
-
-TASK: Identify groups of nodes that should be merged together.
-
-MERGE CRITERIA:
-1. **Semantic Similarity**: Nodes discuss the same core concept, even with different terminology
-   Example: "Data Processing" ≈ "Information Processing" ≈ "Data Manipulation"
-
-2. **Hierarchical Consistency**: Nodes at the same level with similar parent contexts
-   Example: Both are "subconcepts" under similar "concepts"
-
-3. **Synthesis Overlap**: Descriptions cover similar ground with >70% conceptual overlap
-   Example: "Methods for data cleaning" ≈ "Techniques for data preprocessing"
-
-4. **Generalization Potential**: Can be merged into a common general term
-   Example: "Python Lists", "Java ArrayList" → "Dynamic Arrays"
-
-SIMILARITY SCORING:
-- 0.95-1.0: Near-identical concepts, different phrasing (e.g., "ML" vs "Machine Learning")
-- 0.85-0.94: Same core concept, minor scope differences (e.g., "Data Cleaning" vs "Data Preprocessing")
-- 0.75-0.84: Related concepts that can be merged under general term (e.g., "REST API" vs "HTTP Services")
-- 0.60-0.74: Somewhat related but distinct subconcepts
-- Below 0.60: Too different to merge
-
-DO NOT MERGE:
-- Nodes with same name but completely different contexts
-- Generic terms that appear everywhere ("Introduction", "Conclusion", "Overview")
-- Nodes where merging would lose important distinctions
-
-OUTPUT FORMAT (JSON array of merge groups):
-[
-  {{
-    "merge_group_id": "unique_id_1",
-    "merged_name": "Suggested general name for merged node",
-    "similarity_score": 0.87,
-    "level": {level},
-    "nodes": [
-      {{
-        "node_index": 0,
-        "doc_name": "Document name",
-        "original_name": "Original node name",
-        "synthesis": "Original synthesis"
-      }},
-      {{
-        "node_index": 5,
-        "doc_name": "Another document",
-        "original_name": "Another node name",
-        "synthesis": "Another synthesis"
-      }}
-    ],
-    "merged_synthesis": "Combined synthesis that captures all nodes (150-200 chars)",
-    "merge_rationale": "Why these nodes should merge (80 chars)"
-  }}
-]
-
-EXAMPLES:
-
-Example 1 - High Similarity (0.92):
-{{
-  "merge_group_id": "mg_001",
-  "merged_name": "Data Processing Pipelines",
-  "similarity_score": 0.92,
-  "level": 3,
-  "nodes": [
-    {{"node_index": 0, "doc_name": "ETL Guide", "original_name": "Data Processing", "synthesis": "Methods for transforming raw data"}},
-    {{"node_index": 3, "doc_name": "Analytics Manual", "original_name": "Data Pipeline Operations", "synthesis": "Techniques for data transformation"}}
-  ],
-  "merged_synthesis": "Comprehensive methods and techniques for transforming, processing, and moving data through analytical pipelines including ETL operations",
-  "merge_rationale": "Both describe data transformation processes with similar scope"
-}}
-
-Example 2 - Medium Similarity (0.78):
-{{
-  "merge_group_id": "mg_002",
-  "merged_name": "API Communication Patterns",
-  "similarity_score": 0.78,
-  "level": 4,
-  "nodes": [
-    {{"node_index": 1, "doc_name": "REST Guide", "original_name": "REST API Design", "synthesis": "RESTful service patterns"}},
-    {{"node_index": 7, "doc_name": "Microservices", "original_name": "HTTP Service Communication", "synthesis": "HTTP-based inter-service calls"}}
-  ],
-  "merged_synthesis": "Patterns for HTTP-based service communication including RESTful design principles and inter-service API protocols",
-  "merge_rationale": "Both cover HTTP-based service communication, mergeable under general API term"
-}}
-
-VALIDATION:
-✓ Only include groups with similarity_score >= {similarity_threshold}
-✓ Each group must have at least 2 nodes
-✓ Merged_name should be general and inclusive
-✓ Merged_synthesis should combine key points from all nodes
-✓ No duplicate node_index values across groups
-
-Return ONLY the JSON array of merge groups."""
+            prompt = MERGE_CANDIDATES_PROMPT_TEMPLATE.format(
+                level=level,
+                nodes_text=nodes_text,
+                similarity_threshold=similarity_threshold
+            )
 
             result = call_llm_sync(
                 prompt,
@@ -0,0 +1,224 @@
+"""LLM response cache keyed by content hash
+
+Structure extraction and chunk analysis are deterministic enough (temperature 0.1)
+that re-processing the same PDF, retries and duplicate uploads can reuse earlier
+responses instead of paying for another CLOVA round-trip.
+
+- Key: sha256 over length-prefixed (cache version, api_url, system_message,
+  max_tokens, prompt), with runs of whitespace collapsed so re-extractions of
+  the same PDF text (different line breaks/spacing) still hit
+- The api_url is the resolved endpoint (it encodes the model), and
+  LLM_CACHE_VERSION can be bumped to drop every entry after a prompt change
+- In-memory LRU shared by all worker threads
+- Optional on-disk JSON store (LLM_CACHE_DIR) so entries survive worker restarts
+- Entries expire after LLM_CACHE_TTL_SECONDS (prompt or model changes upstream
+  eventually refresh, and the disk store does not grow forever)
+"""
+import os
+import copy
+import json
+import time
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from ..config import (
+    CLOVA_API_URL,
+    FEATURE_LLM_CACHE,
+    LLM_CACHE_DIR,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_VERSION
+)
+
+
+def _normalize_for_key(text: str) -> str:
+    """Collapse whitespace runs; layout-only differences do not change the answer"""
+    return " ".join(text.split()) if text else ""
+
+
+def make_cache_key(prompt: str, system_message: str = "", max_tokens: int = 0, model: str = "") -> str:
+    """
+    Build a stable cache key for one LLM request
+
+    Prompt and system message are whitespace-normalized, so the same content
+    extracted with different spacing maps to the same entry. Every part is
+    length-prefixed, so no two different requests share key material.
+
+    Args:
+        prompt: User prompt
+        system_message: System prompt
+        max_tokens: Max tokens requested
+        model: Model identifier (the CLOVA endpoint URL encodes the model)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    parts = [
+        LLM_CACHE_VERSION,
+        model or "",
+        _normalize_for_key(system_message),
+        str(max_tokens),
+        _normalize_for_key(prompt)
+    ]
+    material = "".join(f"{len(part)}:{part}" for part in parts)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Thread-safe LRU cache for parsed LLM JSON responses"""
+
+    def __init__(self, max_size: int = 2000, cache_dir: str = "", ttl_seconds: int = 0):
+        # key -> (stored_at, value)
+        self.cache: OrderedDict = OrderedDict()
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"⚠️  LLM cache dir unavailable ({e}), using memory only")
+                self.cache_dir = ""
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get cached response, checking memory first and then disk
+
+        Returns a copy: callers (e.g. structure validation, translation)
+        mutate the parsed response in place.
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at):
+                    self.hits += 1
+                    self.cache.move_to_end(key)
+                    return copy.deepcopy(value)
+                del self.cache[key]
+
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                # The file's mtime is the entry's write time
+                stored_at = os.path.getmtime(path)
+                if self._expired(stored_at):
+                    os.remove(path)
+                else:
+                    with open(path, "r", encoding="utf-8") as f:
+                        value = json.load(f)
+                    with self._lock:
+                        self.hits += 1
+                        self._store(key, copy.deepcopy(value), stored_at)
+                    return value
+            except (OSError, ValueError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store a response in memory and (if configured) on disk"""
+        with self._lock:
+            self._store(key, copy.deepcopy(value))
+
+        if self.cache_dir:
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(value, f, ensure_ascii=False)
+                os.replace(tmp_path, self._path(key))
+            except (OSError, TypeError, ValueError) as e:
+                print(f"⚠️  Failed to persist LLM cache entry: {e}")
+
+    def _store(self, key: str, value: Any, stored_at: Optional[float] = None):
+        self.cache[key] = (stored_at if stored_at is not None else time.time(), value)
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total > 0 else 0
+        return {
+            "size": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{hit_rate:.1f}%"
+        }
+
+
+# Process-wide cache shared by every pipeline thread
+llm_response_cache = LLMResponseCache(
+    max_size=LLM_CACHE_MAX_ENTRIES,
+    cache_dir=LLM_CACHE_DIR,
+    ttl_seconds=LLM_CACHE_TTL_SECONDS
+)
+
+
+def llm_cached(func: Callable) -> Callable:
+    """
+    Cache decorator for call_llm_sync / call_llm_async
+
+    Keys on prompt, system_message, max_tokens and clova_api_url. Empty
+    responses (failed calls) are never cached, so they are retried next time.
+    """
+    signature = inspect.signature(func)
+
+    def cache_key(args, kwargs) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = bound.arguments
+        return make_cache_key(
+            params.get("prompt", ""),
+            params.get("system_message", ""),
+            params.get("max_tokens", 0),
+            # Callers usually leave the URL empty and get CLOVA_API_URL; key on
+            # the endpoint actually used so a model switch misses the cache
+            params.get("clova_api_url") or CLOVA_API_URL
+        )
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not FEATURE_LLM_CACHE:
+                return await func(*args, **kwargs)
+            key = cache_key(args, kwargs)
+            cached = llm_response_cache.get(key)
+            if cached is not None:
+                return cached
+            result = await func(*args, **kwargs)
+            if result:
+                llm_response_cache.set(key, result)
+            return result
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not FEATURE_LLM_CACHE:
+            return func(*args, **kwargs)
+        key = cache_key(args, kwargs)
+        cached = llm_response_cache.get(key)
+        if cached is not None:
+            return cached
+        result = func(*args, **kwargs)
+        if result:
+            llm_response_cache.set(key, result)
+        return result
+    return wrapper
@@ -1,11 +1,21 @@
 import os
+import re
 import gc
+import json
+import time
 import uuid
+import threading
 import traceback
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import asdict
 
+from neo4j import READ_ACCESS, WRITE_ACCESS, RoutingControl
+from pydantic import ValidationError
+
 # Import configuration
 from config import (
     # API Configuration
@@ -14,8 +24,8 @@ from config import (
     
     # Pipeline Configuration
     CHUNK_SIZE, OVERLAP, MAX_CHUNKS, MIN_CHUNK_SIZE,
-    BATCH_SIZE, EMBEDDING_BATCH_SIZE, QDRANT_BATCH_SIZE,
-    MAX_SYNTHESIS_LENGTH, MAX_PDF_TEXT_EXTRACT,
+    EMBEDDING_BATCH_SIZE, QDRANT_BATCH_SIZE, ANALYSIS_BATCH_SIZE,
+    MAX_SYNTHESIS_LENGTH, MAX_PDF_TEXT_EXTRACT, MAX_EVIDENCE_TEXT_LENGTH,
     
     # Performance Configuration
     PDF_DOWNLOAD_TIMEOUT,
@@ -29,13 +39,16 @@ from config import (
     # Validation
     CONFIG_VALID, CONFIG_SUMMARY,
     
+    # Database Configuration
+    NEO4J_DATABASE,
+    
     # Constants
     EMBEDDING_DIMENSION
 )
 
 # Import pipeline modules
 from .pdf_extraction import extract_pdf_enhanced
-from .chunking import create_smart_chunks, calculate_chunk_stats
+from .chunking import iter_smart_chunks, calculate_chunk_stats
 from .llm_analysis import (
     extract_merge_optimized_structure, 
     analyze_chunks_for_merging,
@@ -44,6 +57,10 @@ from .embedding_cache import batch_create_embeddings, extract_all_concept_names
 from .embedding import create_embedding_via_clova, calculate_similarity
 from .neo4j_graph import (
     create_hierarchical_knowledge_graph,
+    ensure_neo4j_schema,
+    language_tag,
+    get_file_completion_state,
+    mark_file_completed,
 )
 from .qdrant_storage import (
     store_chunks_in_qdrant,
@@ -61,6 +78,7 @@ from .resource_discovery import (
 )
 
 from ..model.QdrantChunk import QdrantChunk
+from ..model.MergeStructure import MergeStructurePayload
 
 
 class PipelineMetrics:
@@ -68,8 +86,13 @@ class PipelineMetrics:
     
     def __init__(self):
         self.start_time = datetime.now()
+        self._started = time.monotonic()  # elapsed times use the monotonic clock
+        # Phases run back to back, so each phase's duration is the time since
+        # the previous phase ended (or since the pipeline started)
+        self._phase_mark = time.perf_counter()
         self.metrics = {
             'phases_completed': [],
+            'phase_durations_ms': {},
             'embedding_calls': 0,
             'llm_calls': 0,
             'translation_requests': 0,
@@ -81,9 +104,18 @@ class PipelineMetrics:
             'warnings': []
         }
     
+    def _record_phase_duration(self, phase_name: str):
+        """Close the current phase's timer under phase_name (first record wins)"""
+        now = time.perf_counter()
+        self.metrics['phase_durations_ms'].setdefault(
+            phase_name, int((now - self._phase_mark) * 1000)
+        )
+        self._phase_mark = now
+    
     def add_phase(self, phase_name: str):
         """Add completed phase"""
         self.metrics['phases_completed'].append(phase_name)
+        self._record_phase_duration(phase_name)
     
     def increment_embedding_calls(self, count: int = 1):
         """Increment embedding call counter"""
@@ -99,6 +131,7 @@ class PipelineMetrics:
     
     def add_error(self, error: str, phase: str):
         """Add error with phase context"""
+        self._record_phase_duration(phase)
         self.metrics['errors_encountered'].append({
             'phase': phase,
             'error': error,
@@ -115,7 +148,7 @@ class PipelineMetrics:
     
     def get_processing_time(self) -> int:
         """Get total processing time in milliseconds"""
-        return int((datetime.now() - self.start_time).total_seconds() * 1000)
+        return int((time.monotonic() - self._started) * 1000)
     
     def get_summary(self) -> Dict[str, Any]:
         """Get metrics summary"""
@@ -128,6 +161,19 @@ class PipelineMetrics:
             'processing_time_ms': self.get_processing_time(),
             'success_rate': success_rate
         }
+    
+    def timing_log_line(self, file_id: str) -> str:
+        """One greppable JSON line with per-phase timings and volume counters"""
+        return "PIPELINE_TIMINGS " + json.dumps({
+            'file_id': file_id,
+            'total_ms': self.get_processing_time(),
+            'phases_ms': self.metrics['phase_durations_ms'],
+            'nodes_created': self.metrics['nodes_created'],
+            'nodes_merged': self.metrics['nodes_merged'],
+            'chunks': self.metrics['chunks_processed'],
+            'llm_calls': self.metrics['llm_calls'],
+            'embedding_calls': self.metrics['embedding_calls']
+        }, separators=(',', ':'))
 
 
 def validate_pipeline_inputs(workspace_id: str, pdf_url: str, file_name: str) -> Dict[str, Any]:
@@ -165,6 +211,10 @@ def validate_pipeline_inputs(workspace_id: str, pdf_url: str, file_name: str) ->
     return validation_results
 
 
+# Period-delimited sentence candidates for the fallback synthesis
+SENTENCE_PATTERN = re.compile(r'[^.]+')
+
+
 def create_enhanced_fallback_structure(file_name: str, full_text: str, language: str) -> Dict[str, Any]:
     """
     Create enhanced fallback structure when LLM extraction fails
@@ -178,7 +228,11 @@ def create_enhanced_fallback_structure(file_name: str, full_text: str, language:
         Fallback structure
     """
     # Extract meaningful content for fallback
-    sentences = [s.strip() for s in full_text.split('.') if len(s.strip()) > 30]
+    # Only the first three sentences are used: scan lazily instead of splitting
+    # the whole document, and stop once found
+    sentences = list(islice(
+        (s for s in (m.group().strip() for m in SENTENCE_PATTERN.finditer(full_text)) if len(s) > 30), 3
+    ))
     
     # Ensure we have a proper iterable of strings for join
     synthesis_text = '. '.join(sentences[:3]) + '.' if sentences else f"Content from {file_name}"
@@ -234,10 +288,12 @@ def cleanup_partial_data(workspace_id: str, file_id: str, neo4j_driver, qdrant_c
     try:
         print(f"🧹 Cleaning up partial data for file {file_id}...")
         
-        # Clean Neo4j data
-        with neo4j_driver.session() as session:
-            # Delete KnowledgeNodes associated with this file
-            session.run(
+        # Clean Neo4j data: all three deletes in one retried write transaction,
+        # so cleanup commits once and never leaves half-deleted file data
+        def delete_file_data(tx):
+            # Delete KnowledgeNodes associated with this file (created ids are
+            # prefixed with the file id, see short_id_factory)
+            tx.run(
                 """
                 MATCH (n:KnowledgeNode {workspace_id: $workspace_id})
                 WHERE n.id STARTS WITH $file_prefix
@@ -245,26 +301,29 @@ def cleanup_partial_data(workspace_id: str, file_id: str, neo4j_driver, qdrant_c
                 """,
                 workspace_id=workspace_id,
                 file_prefix=f"{file_id}-"
-            )
+            ).consume()
             
             # Delete Evidence nodes
-            session.run(
+            tx.run(
                 """
                 MATCH (e:Evidence {source_id: $file_id})
                 DETACH DELETE e
                 """,
                 file_id=file_id
-            )
+            ).consume()
             
             # Delete GapSuggestions
-            session.run(
+            tx.run(
                 """
                 MATCH (g:GapSuggestion)
                 WHERE g.target_file_id = $file_id
                 DETACH DELETE g
                 """,
                 file_id=file_id
-            )
+            ).consume()
+        
+        with neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=WRITE_ACCESS) as session:
+            session.execute_write(delete_file_data)
         
         # Note: Qdrant cleanup is more complex as we don't store file_id directly
         # We rely on workspace-based collections
@@ -282,7 +341,8 @@ def process_pdf_to_knowledge_graph(
     job_id: str,
     neo4j_driver,
     qdrant_client,
-    config: Optional[Dict[str, Any]] = None
+    config: Optional[Dict[str, Any]] = None,
+    session=None
 ) -> Dict[str, Any]:
     """
     Enhanced main pipeline for processing PDF documents into knowledge graphs
@@ -295,6 +355,8 @@ def process_pdf_to_knowledge_graph(
         neo4j_driver: Neo4j driver instance
         qdrant_client: Qdrant client instance
         config: Additional configuration overrides
+        session: Optional open Neo4j session to reuse (e.g. one per worker
+            thread); one session is opened for the whole run when omitted
     
     Returns:
         Processing results with detailed metrics
@@ -319,6 +381,30 @@ def process_pdf_to_knowledge_graph(
             "timestamp": datetime.now().isoformat()
         }
     
+    # Graph and discovery phases share one session, opened on first use, so
+    # discovery reads are chained to the graph commit by the session bookmark
+    owned_session = []
+    
+    def neo4j_session():
+        """Reuse the caller's session when given, otherwise the run's own session"""
+        if session is not None:
+            return nullcontext(session)
+        if not owned_session:
+            owned_session.append(neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=WRITE_ACCESS))
+        return nullcontext(owned_session[0])
+    
+    # Standalone callers get the id/workspace indexes too (no-op once ensured).
+    # The schema round trips overlap the PDF download; Phase 5 waits for them
+    schema_future = None
+    # Set once the run has failed or finished: a chunk analysis still waiting
+    # on chunking skips its LLM calls
+    analysis_cancelled = threading.Event()
+    analysis_future = None
+    if session is None:
+        schema_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="neo4j-schema")
+        schema_future = schema_executor.submit(ensure_neo4j_schema, neo4j_driver)
+        schema_executor.shutdown(wait=False)
+    
     # Merge configuration
     default_config = {
         'max_pages': MAX_PDF_PAGES,
@@ -334,7 +420,12 @@ def process_pdf_to_knowledge_graph(
     
     # Initialize metrics and state
     metrics = PipelineMetrics()
-    file_id = f"file_{uuid.uuid4().hex[:8]}"
+    # Deterministic per (workspace, job, file): a redelivered job message maps
+    # each file to the same key, so its completion marker can be found. The
+    # marker is keyed on the full hash; the 8-char file_id is only a display
+    # and data prefix and may collide across workspaces
+    file_key = uuid.uuid5(uuid.NAMESPACE_URL, f'{workspace_id}/{job_id}/{pdf_url}').hex
+    file_id = f"file_{file_key[:8]}"
     processing_state = {
         'file_id': file_id,
         'neo4j_processed': False,
@@ -345,6 +436,7 @@ def process_pdf_to_knowledge_graph(
     
     # Initialize variables to avoid unbound errors
     node_ids: List[str] = []
+    leaf_node_ids: List[str] = []
     all_chunks_with_embeddings: List[Tuple[QdrantChunk, List[float]]] = []
     chunks: List[Dict[str, Any]] = []
     chunk_analyses: List[Dict[str, Any]] = []
@@ -358,6 +450,24 @@ def process_pdf_to_knowledge_graph(
     print(f"{'='*80}\n")
     
     try:
+        # Checkpoint: skip files a previous delivery of this job completed, and
+        # clear what an interrupted attempt left before processing again
+        with neo4j_session() as checkpoint_session:
+            file_state = get_file_completion_state(checkpoint_session, file_key, file_id)
+        if file_state['completed']:
+            print(f"⏭️  {file_name} already completed in an earlier delivery, skipping")
+            return {
+                "status": "completed",
+                "skipped": True,
+                "jobId": job_id,
+                "fileId": file_id,
+                "workspaceId": workspace_id,
+                "processingTimeMs": metrics.get_processing_time(),
+                "timestamp": datetime.now().isoformat()
+            }
+        if file_state['partial']:
+            cleanup_partial_data(workspace_id, file_id, neo4j_driver, qdrant_client)
+        
         # PHASE 1: Enhanced PDF Extraction
         print(f"📄 Phase 1: Enhanced PDF Extraction")
         try:
@@ -371,6 +481,8 @@ def process_pdf_to_knowledge_graph(
                 raise ValueError("PDF extraction failed - insufficient text extracted")
                 
             processing_state['language'] = language
+            # Resolved once per PDF instead of per evidence
+            source_lang_tag = language_tag(language)
             print(f"✓ Extracted {len(full_text)} characters")
             print(f"✓ Detected language: {language} (confidence: {pdf_metadata.get('language_confidence', 0):.2f})")
             metrics.add_phase('pdf_extraction')
@@ -379,8 +491,35 @@ def process_pdf_to_knowledge_graph(
             metrics.add_error(str(e), 'pdf_extraction')
             raise
         
+        # Chunking only needs the text, not the structure: run it on a worker
+        # thread while the structure LLM call (Phase 2) is waiting on the network.
+        # Chunks are created lazily, stopping at max_chunks instead of chunking
+        # the whole document and slicing
+        chunk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunker")
+        chunks_future = chunk_executor.submit(
+            lambda text: list(islice(
+                iter_smart_chunks(
+                    text,
+                    chunk_size=final_config['chunk_size'],
+                    overlap=final_config['overlap'],
+                    min_chunk_size=MIN_CHUNK_SIZE
+                ),
+                final_config['max_chunks']
+            )),
+            full_text
+        )
+        # No further work is queued; the thread exits once chunking is done
+        chunk_executor.shutdown(wait=False)
+        
         # PHASE 2: Structure Extraction with Enhanced Fallback
         print(f"\n📊 Phase 2: Merge-Optimized Structure Extraction")
+        
+        def use_fallback_structure(reason: str) -> Dict[str, Any]:
+            """Shared by the invalid-structure and exception paths"""
+            processing_state['structure_extracted'] = False
+            metrics.add_warning(reason, 'structure_extraction')
+            return create_enhanced_fallback_structure(file_name, full_text, language)
+        
         try:
             structure = extract_merge_optimized_structure(
                 full_text[:MAX_PDF_TEXT_EXTRACT],  # Limit text for LLM
@@ -391,12 +530,17 @@ def process_pdf_to_knowledge_graph(
             )
             metrics.increment_llm_calls(1)
             
-            # Validate structure
-            if not structure or not structure.get('domain') or not structure.get('categories'):
+            # Validate the whole nested shape in one pass (named domain, at
+            # least one category, list-typed children at every level)
+            try:
+                MergeStructurePayload.model_validate(structure)
+                structure_valid = True
+            except ValidationError:
+                structure_valid = False
+            
+            if not structure_valid:
                 print("⚠️ Structure extraction failed, using enhanced fallback")
-                structure = create_enhanced_fallback_structure(file_name, full_text, language)
-                processing_state['structure_extracted'] = False
-                metrics.add_warning("Used fallback structure", 'structure_extraction')
+                structure = use_fallback_structure("Used fallback structure")
             else:
                 processing_state['structure_extracted'] = True
                 print(f"✓ Extracted structure: {structure['domain']['name']}")
@@ -407,9 +551,7 @@ def process_pdf_to_knowledge_graph(
         except Exception as e:
             metrics.add_error(str(e), 'structure_extraction')
             # Create fallback structure and continue
-            structure = create_enhanced_fallback_structure(file_name, full_text, language)
-            processing_state['structure_extracted'] = False
-            metrics.add_warning(f"Fallback due to: {str(e)}", 'structure_extraction')
+            structure = use_fallback_structure(f"Fallback due to: {str(e)}")
         
         # PHASE 3: Translation (if needed and enabled)
         if (language != "en" and 
@@ -430,6 +572,23 @@ def process_pdf_to_knowledge_graph(
                 metrics.add_error(str(e), 'translation')
                 metrics.add_warning("Translation failed, continuing with original", 'translation')
         
+        # Chunk analysis only needs the chunks and the final structure, not the
+        # graph: start its LLM round trips now so they overlap the embedding
+        # (Phase 4) and Neo4j write (Phase 5) phases; Phase 6 collects them
+        analysis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-analysis")
+        def run_chunk_analysis(final_structure):
+            chunks_ready = chunks_future.result()
+            if analysis_cancelled.is_set():
+                return {"analysis_results": []}
+            return analyze_chunks_for_merging(
+                chunks_ready, final_structure,
+                CLOVA_API_KEY, CLOVA_API_URL,
+                batch_size=ANALYSIS_BATCH_SIZE
+            )
+        
+        analysis_future = analysis_executor.submit(run_chunk_analysis, structure)
+        analysis_executor.shutdown(wait=False)
+        
         # PHASE 4: Embedding Cache Preparation
         print(f"\n⚡ Phase 4: Embedding Cache Preparation")
         try:
@@ -454,10 +613,19 @@ def process_pdf_to_knowledge_graph(
         
         # PHASE 5: Knowledge Graph Creation
         print(f"\n🔗 Phase 5: Knowledge Graph Creation")
+        if schema_future is not None:
+            try:
+                schema_future.result()
+            except Exception as e:
+                print(f"⚠️  Could not bootstrap Neo4j schema: {e}")
         try:
-            with neo4j_driver.session() as session:
-                graph_stats = create_hierarchical_knowledge_graph(
-                    session, workspace_id, structure, file_id, file_name, embeddings_cache
+            with neo4j_session() as graph_session:
+                # One write transaction per PDF: a single commit instead of
+                # an auto-commit (and fsync) per node/evidence/relationship
+                graph_stats = graph_session.execute_write(
+                    create_hierarchical_knowledge_graph,
+                    workspace_id, structure, file_id, file_name, embeddings_cache,
+                    source_lang_tag
                 )
                 
                 metrics.metrics['nodes_created'] = graph_stats.get('nodes_created', 0)
@@ -472,6 +640,7 @@ def process_pdf_to_knowledge_graph(
                 print(f"  └─ Final count: {graph_stats.get('final_count', 0)}")
                 
                 node_ids = graph_stats.get('node_ids', [])
+                leaf_node_ids = graph_stats.get('leaf_node_ids', node_ids)
             
             metrics.add_phase('knowledge_graph')
             
@@ -482,29 +651,23 @@ def process_pdf_to_knowledge_graph(
         # PHASE 6: Chunk Processing and Analysis
         print(f"\n⚡ Phase 6: Enhanced Chunk Processing")
         try:
-            # Create chunks
-            chunks = create_smart_chunks(
-                full_text,
-                chunk_size=final_config['chunk_size'],
-                overlap=final_config['overlap'],
-                min_chunk_size=MIN_CHUNK_SIZE
-            )[:final_config['max_chunks']]
+            # Chunked in the background since Phase 1
+            chunks = chunks_future.result()
+            # Full text is no longer needed; release it before the LLM/storage phases
+            del full_text
             
             chunk_stats = calculate_chunk_stats(chunks)
             print(f"📊 Created {len(chunks)} chunks")
             print(f"  └─ Stats: {chunk_stats}")
             
-            # Analyze chunks
-            raw_chunk_analyses = analyze_chunks_for_merging(
-                chunks, structure,
-                CLOVA_API_KEY, CLOVA_API_URL
+            # Analyzed in the background since Phase 3
+            raw_chunk_analyses = analysis_future.result()
+            # Packs complete out of order; restore document order
+            chunk_analyses = sorted(
+                raw_chunk_analyses.get("analysis_results", []),
+                key=lambda a: a.get('chunk_index', 0)
             )
-            # Convert raw_chunk_analyses to the expected type
-            chunk_analyses = [
-                {"chunk_index": idx, "data": data}
-                for idx, data in enumerate(raw_chunk_analyses.get("chunks", []))
-            ]
-            metrics.increment_llm_calls(max(1, len(chunks) // BATCH_SIZE))
+            metrics.increment_llm_calls(max(1, -(-len(chunks) // ANALYSIS_BATCH_SIZE)))
             metrics.metrics['chunks_processed'] = len(chunk_analyses)
             
             print(f"✓ Analyzed {len(chunk_analyses)} chunks")
@@ -549,22 +712,30 @@ def process_pdf_to_knowledge_graph(
             all_chunks_with_embeddings = []
             prev_embedding = None
             prev_chunk_id = ""
+            prev_qdrant_chunk: Optional[QdrantChunk] = None
+            created_at = datetime.now().isoformat()
             
             for i, chunk_data in enumerate(chunk_analyses):
                 # Skip if chunk_data is not a dictionary
                 if not isinstance(chunk_data, dict):
                     continue
                     
-                # Get the original chunk, ensuring we don't go out of bounds
-                if i < len(chunks):
-                    original_chunk = chunks[i]
+                # Look up the original chunk by its analysed index (analyses may
+                # skip chunks the LLM dropped, so enumerate position is not reliable)
+                chunk_idx = chunk_data.get('chunk_index', i)
+                if isinstance(chunk_idx, int) and 0 <= chunk_idx < len(chunks):
+                    original_chunk = chunks[chunk_idx]
                 else:
                     # Create a minimal fallback chunk
                     original_chunk = {"text": "", "overlap_previous": ""}
-                
-                chunk_idx = chunk_data.get('chunk_index', i)
                 chunk_id = f"{file_id}_chunk_{chunk_idx}"
                 
+                # Analysis results already carry the trimmed evidence text
+                chunk_text = chunk_data.get('text')
+                if not isinstance(chunk_text, str) or not chunk_text:
+                    raw_text = original_chunk.get("text")
+                    chunk_text = raw_text[:MAX_EVIDENCE_TEXT_LENGTH] if isinstance(raw_text, str) else ""
+                
                 # Normalize data with proper type checking
                 summary = ""
                 if isinstance(chunk_data.get('summary'), str):
@@ -577,7 +748,7 @@ def process_pdf_to_knowledge_graph(
                     concepts = [str(c).strip() for c in chunk_data['concepts'] if c and str(c).strip()]
                 
                 topic = "General"
-                if isinstance(chunk_data.get('topic'), str):
+                if isinstance(chunk_data.get('topic'), str) and chunk_data['topic'].strip():
                     topic = chunk_data['topic'].strip()
                 
                 claims = []
@@ -619,14 +790,14 @@ def process_pdf_to_knowledge_graph(
                     chunk_id=chunk_id,
                     paper_id=file_id,
                     page=chunk_idx + 1,
-                    text=original_chunk.get("text", "")[:1000] if isinstance(original_chunk.get("text"), str) else "",
+                    text=chunk_text,
                     summary=summary,
                     concepts=concepts,
                     topic=topic,
                     workspace_id=workspace_id,
                     language="en",
                     source_language=language,
-                    created_at=datetime.now().isoformat(),
+                    created_at=created_at,
                     hierarchy_path=f"{file_name} > Chunk {chunk_idx+1}",
                     chunk_index=chunk_idx,
                     prev_chunk_id=prev_chunk_id,
@@ -640,13 +811,11 @@ def process_pdf_to_knowledge_graph(
                 
                 all_chunks_with_embeddings.append((qdrant_chunk, embedding))
                 
-                # Update previous chunk linkage
-                if prev_chunk_id:
-                    for existing_chunk, _ in all_chunks_with_embeddings:
-                        if existing_chunk.chunk_id == prev_chunk_id:
-                            existing_chunk.next_chunk_id = chunk_id
-                            break
+                # Update previous chunk linkage (direct reference, no rescan of all chunks)
+                if prev_qdrant_chunk is not None:
+                    prev_qdrant_chunk.next_chunk_id = chunk_id
                 
+                prev_qdrant_chunk = qdrant_chunk
                 prev_chunk_id = chunk_id
                 prev_embedding = embedding
             
@@ -676,10 +845,13 @@ def process_pdf_to_knowledge_graph(
         if final_config['enable_resource_discovery']:
             print(f"\n🔍 Phase 8: Knowledge-Based Resource Discovery")
             try:
-                with neo4j_driver.session() as session:
+                with neo4j_session() as discovery_session:
+                    # Only this PDF's nodes that were never linked as a parent
+                    # can be new leaves without suggestions
                     resource_count = discover_resources_via_knowledge_analysis(
-                        session, workspace_id,
-                        CLOVA_API_KEY, CLOVA_API_URL
+                        discovery_session, workspace_id,
+                        CLOVA_API_KEY, CLOVA_API_URL,
+                        node_ids=leaf_node_ids
                     )
                     metrics.increment_llm_calls(1)
                     metrics.metrics['resources_discovered'] = resource_count
@@ -691,6 +863,16 @@ def process_pdf_to_knowledge_graph(
                 metrics.add_error(str(e), 'resource_discovery')
                 metrics.add_warning("Resource discovery failed", 'resource_discovery')
         
+        # Last step: mark the file complete once graph and vectors are stored,
+        # so a redelivered job skips it
+        if processing_state['neo4j_processed'] and (
+                processing_state['qdrant_processed'] or not all_chunks_with_embeddings):
+            try:
+                with neo4j_session() as marker_session:
+                    mark_file_completed(marker_session, file_key, file_id, workspace_id, job_id, pdf_url)
+            except Exception as e:
+                metrics.add_warning(f"Completion marker not written: {e}", 'completion_marker')
+        
         # Final cleanup and results compilation
         gc.collect()
         
@@ -710,6 +892,8 @@ def process_pdf_to_knowledge_graph(
         print(f"├─ Nodes merged: {metrics_summary['nodes_merged']}")
         print(f"├─ Chunks processed: {metrics_summary['chunks_processed']}")
         print(f"├─ Resources discovered: {metrics_summary['resources_discovered']}")
+        slowest = sorted(metrics_summary['phase_durations_ms'].items(), key=lambda kv: kv[1], reverse=True)
+        print(f"├─ Slowest phases: {', '.join(f'{name} {ms}ms' for name, ms in slowest[:3])}")
         print(f"├─ Source language: {processing_state['language']}")
         print(f"├─ Structure quality: {'Good' if processing_state['structure_extracted'] else 'Fallback'}")
         print(f"└─ Success rate: {metrics_summary['success_rate']:.1%}")
@@ -725,6 +909,7 @@ def process_pdf_to_knowledge_graph(
                 print(f"   • {error['phase']}: {error['error']}")
         
         print(f"{'='*80}\n")
+        print(metrics.timing_log_line(file_id))
         
         return {
             "status": "completed",
@@ -749,6 +934,7 @@ def process_pdf_to_knowledge_graph(
     except Exception as e:
         error_msg = str(e)
         print(f"\n❌ PROCESSING FAILED: {error_msg}")
+        print(metrics.timing_log_line(file_id))
         
         if DEBUG_MODE:
             traceback.print_exc()
@@ -768,6 +954,14 @@ def process_pdf_to_knowledge_graph(
             "timestamp": datetime.now().isoformat(),
             "traceback": traceback.format_exc() if DEBUG_MODE else "Hidden in production"
         }
+    
+    finally:
+        # Phase 4/5 failures leave the background analysis unclaimed
+        analysis_cancelled.set()
+        if analysis_future is not None:
+            analysis_future.cancel()
+        for own in owned_session:
+            own.close()
 
 
 def get_pipeline_status(workspace_id: str, file_id: str, neo4j_driver, qdrant_client) -> Dict[str, Any]:
@@ -784,31 +978,32 @@ def get_pipeline_status(workspace_id: str, file_id: str, neo4j_driver, qdrant_cl
         Pipeline status information
     """
     try:
-        # Get Neo4j stats
-        with neo4j_driver.session() as session:
-            # Count KnowledgeNodes for this file
-            node_result = session.run(
-                """
+        # Get Neo4j stats: both counts in one read-routed round trip; nodes
+        # this file created carry its id as prefix
+        records, _, _ = neo4j_driver.execute_query(
+            """
+            CALL {
                 MATCH (n:KnowledgeNode {workspace_id: $workspace_id})
                 WHERE n.id STARTS WITH $file_prefix
                 RETURN count(n) as node_count
-                """,
-                workspace_id=workspace_id,
-                file_prefix=f"{file_id}-"
-            )
-            node_count = node_result.single()['node_count'] if node_result else 0
-            
-            # Count Evidence nodes
-            evidence_result = session.run(
-                """
+            }
+            CALL {
                 MATCH (e:Evidence {source_id: $file_id})
                 RETURN count(e) as evidence_count
-                """,
-                file_id=file_id
-            )
-            evidence_count = evidence_result.single()['evidence_count'] if evidence_result else 0
-            
-            # Get resource discovery stats
+            }
+            RETURN node_count, evidence_count
+            """,
+            workspace_id=workspace_id,
+            file_prefix=f"{file_id}-",
+            file_id=file_id,
+            routing_=RoutingControl.READ,
+            database_=NEO4J_DATABASE
+        )
+        node_count = records[0]['node_count'] if records else 0
+        evidence_count = records[0]['evidence_count'] if records else 0
+        
+        # Get resource discovery stats
+        with neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=READ_ACCESS) as session:
             resource_stats = get_resource_discovery_stats(session, workspace_id)
         
         # Get Qdrant stats
@@ -1,60 +1,518 @@
 """Optimized Neo4j knowledge graph operations with proper entity structure"""
 import json
 import uuid
-from typing import Dict, List, Any, Optional, Tuple
+import itertools
+from functools import lru_cache
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime, timezone
 from dataclasses import asdict
 
 from ..model.KnowledgeNode import KnowledgeNode
 from ..model.Evidence import Evidence
 from ..model.GapSuggestion import GapSuggestion
+from ..config import (
+    NEO4J_DATABASE,
+    NEO4J_WRITE_BATCH_SIZE,
+    MAX_STORED_EVIDENCE_TEXT_LENGTH,
+    SEMANTIC_MERGE_THRESHOLD_VERY_HIGH,
+    SEMANTIC_MERGE_THRESHOLD_HIGH,
+    SEMANTIC_MERGE_THRESHOLD_MEDIUM,
+    EMBEDDING_DIMENSION,
+    RELATIONSHIP_TYPES
+)
+
+
+# ISO 639-1 code -> Evidence.Language tag
+LANGUAGE_TAGS = {'en': 'ENG', 'ko': 'KOR'}
+
+
+def language_tag(language: str) -> str:
+    """Map a detected language code to the Evidence language tag (resolve once per PDF)"""
+    return LANGUAGE_TAGS.get((language or 'en').lower(), 'KOR')
+
+
+def short_id_factory(file_id: Optional[str] = None) -> Callable[[str], str]:
+    """
+    Build a per-PDF id generator: one uuid4 for the scope, then a counter
+    
+    Ids look like "concept-3fa9c1d2-0007": unique across PDFs through the
+    scope, ordered and cheap within one PDF. With a file_id they are prefixed
+    by it ("file_1a2b3c4d-concept-3fa9c1d2-0007"), so everything one file
+    created can be found with `n.id STARTS WITH "<file_id>-"`.
+    
+    Args:
+        file_id: File the ids belong to (optional prefix)
+    
+    Returns:
+        Function mapping a kind ("concept", "evidence", ...) to a new id
+    """
+    scope = uuid.uuid4().hex[:8]
+    prefix = f"{file_id}-" if file_id else ""
+    counter = itertools.count()
+    
+    def short_id(kind: str) -> str:
+        return f"{prefix}{kind}-{scope}-{next(counter):04x}"
+    
+    return short_id
+
+
+# Schema statements run once at worker startup. Every MERGE/MATCH on
+# {id: ...} relies on these to get an index seek instead of a label scan.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT kn_id IF NOT EXISTS FOR (n:KnowledgeNode) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT evidence_id IF NOT EXISTS FOR (e:Evidence) REQUIRE e.id IS UNIQUE",
+    "CREATE CONSTRAINT gap_id IF NOT EXISTS FOR (g:GapSuggestion) REQUIRE g.id IS UNIQUE",
+    "CREATE INDEX kn_workspace_id IF NOT EXISTS FOR (n:KnowledgeNode) ON (n.workspace_id)",
+    # Level-filtered workspace scans (structure rebuilds, leaf discovery)
+    "CREATE INDEX kn_workspace_level IF NOT EXISTS FOR (n:KnowledgeNode) ON (n.workspace_id, n.level)",
+    # Exact-name matching seeks on the precomputed lowercase name
+    "CREATE INDEX kn_workspace_name_lower IF NOT EXISTS FOR (n:KnowledgeNode) ON (n.workspace_id, n.name_lower)",
+    # Per-file cleanup and status counts look evidence/suggestions up by file
+    "CREATE INDEX evidence_source_id IF NOT EXISTS FOR (e:Evidence) ON (e.source_id)",
+    "CREATE INDEX gap_target_file_id IF NOT EXISTS FOR (g:GapSuggestion) ON (g.target_file_id)",
+    # Completion markers checked when a job message is redelivered
+    "CREATE CONSTRAINT processed_file_id IF NOT EXISTS FOR (p:ProcessedFile) REQUIRE p.id IS UNIQUE",
+]
+
+# One-off backfill for nodes written before name_lower existed
+BACKFILL_NAME_LOWER = """
+MATCH (n:KnowledgeNode)
+WHERE n.name_lower IS NULL AND n.name IS NOT NULL
+CALL { WITH n SET n.name_lower = toLower(trim(n.name)) } IN TRANSACTIONS OF 10000 ROWS
+"""
+
+# HNSW vector index for similarity matching (Neo4j 5.11+). Optional: on
+# servers without vector indexes matching falls back to a workspace scan.
+VECTOR_INDEX_STATEMENT = f"""
+CREATE VECTOR INDEX kn_embedding IF NOT EXISTS
+FOR (n:KnowledgeNode) ON (n.embedding)
+OPTIONS {{indexConfig: {{
+    `vector.dimensions`: {EMBEDDING_DIMENSION},
+    `vector.similarity_function`: 'cosine'
+}}}}
+"""
+
+# Nearest neighbours fetched from the vector index before the workspace
+# filter; the index is shared by all workspaces. Names whose candidates hold
+# no node of the workspace at all are re-resolved with the scan query.
+VECTOR_MATCH_CANDIDATES = 200
+
+# Drivers whose schema has already been ensured in this process
+_schema_ready_drivers = set()
+_vector_index_ready = False
+
+# Cypher statements are module constants so each call sends identical query
+# text (stable plan-cache key) and no string is rebuilt per call.
+
+CREATE_EVIDENCE_NODE = """
+CREATE (e:Evidence {
+    id: $id,
+    source_id: $source_id,
+    source_name: $source_name,
+    chunk_id: $chunk_id,
+    text: $text,
+    text_len: $text_len,
+    page: $page,
+    confidence: $confidence,
+    created_at: $created_at,
+    language: $language,
+    source_language: $source_language,
+    hierarchy_path: $hierarchy_path,
+    concepts: $concepts,
+    key_claims: $key_claims,
+    questions_raised: $questions_raised,
+    evidence_strength: $evidence_strength
+})
+"""
+
+CREATE_GAP_SUGGESTION_NODE = """
+MATCH (n:KnowledgeNode {id: $knowledge_node_id})
+CREATE (g:GapSuggestion {
+    id: $id,
+    suggestion_text: $suggestion_text,
+    target_node_id: $target_node_id,
+    target_file_id: $target_file_id,
+    similarity_score: $similarity_score
+})
+CREATE (n)-[:HAS_SUGGESTION]->(g)
+"""
+
+UPDATE_NODE_AFTER_MERGE = """
+MATCH (n:KnowledgeNode {id: $id})
+SET n.synthesis = CASE 
+        WHEN size(n.synthesis) > 0 
+        THEN n.synthesis + '\\n\\n[' + $source_name + '] ' + $new_synthesis
+        ELSE '[' + $source_name + '] ' + $new_synthesis
+    END,
+    n.source_count = n.source_count + 1,
+    n.updated_at = datetime()
+"""
+
+# Single-node writes with their Evidence in one statement: the node and the
+# evidence travel as two property maps, so their keys (id, created_at, ...)
+# do not collide as flat parameters.
+CREATE_KNOWLEDGE_NODE_WITH_EVIDENCE = """
+CREATE (n:KnowledgeNode $node)
+CREATE (e:Evidence $evidence)
+CREATE (n)-[:HAS_EVIDENCE]->(e)
+"""
+
+MERGE_INTO_NODE_WITH_EVIDENCE = UPDATE_NODE_AFTER_MERGE.strip() + """
+CREATE (e:Evidence $evidence)
+CREATE (n)-[:HAS_EVIDENCE]->(e)
+"""
+
+COUNT_WORKSPACE_NODES = """
+MATCH (n:KnowledgeNode {workspace_id: $ws})
+RETURN count(n) as total
+"""
+
+# Match lookups project only what the caller needs (id, name, score) so no
+# synthesis text or embedding vectors travel back over Bolt.
+FIND_EXACT_MATCH = """
+MATCH (n:KnowledgeNode {workspace_id: $ws, name_lower: $name_lower})
+RETURN n.id AS id, n.name AS name, 1.0 AS sim, 'exact' AS match_type
+LIMIT 1
+"""
+
+# Neo4j cosine scores are normalised to [0, 1] as (1 + cos) / 2, so they are
+# mapped back to raw cosine before comparing against the merge thresholds.
+FIND_SIMILAR_MATCH = """
+MATCH (n:KnowledgeNode {workspace_id: $ws})
+WHERE n.embedding IS NOT NULL AND size(n.embedding) = size($embedding)
+WITH n, 2 * vector.similarity.cosine(n.embedding, $embedding) - 1 AS sim
+WHERE sim >= $medium
+RETURN n.id AS id, n.name AS name, sim,
+       CASE
+           WHEN sim >= $very_high THEN 'very_high'
+           WHEN sim >= $high THEN 'high'
+           ELSE 'medium'
+       END AS match_type
+ORDER BY sim DESC
+LIMIT 1
+"""
+
+# Indexed lookups return the nearest workspace node even below the threshold
+# (match_type null): no row at all means the workspace filter emptied the
+# candidates and the scan query has to decide
+FIND_SIMILAR_MATCH_INDEXED = """
+CALL db.index.vector.queryNodes('kn_embedding', $candidates, $embedding)
+YIELD node AS n, score
+WHERE n.workspace_id = $ws
+WITH n, 2 * score - 1 AS sim
+RETURN n.id AS id, n.name AS name, sim,
+       CASE
+           WHEN sim >= $very_high THEN 'very_high'
+           WHEN sim >= $high THEN 'high'
+           WHEN sim >= $medium THEN 'medium'
+       END AS match_type
+ORDER BY sim DESC
+LIMIT 1
+"""
+
+# Batched forms of the match lookups: one round trip resolves every name of a
+# structure (the graph does not change until the build flushes). Rows are
+# {key, embedding}; each query returns one collected list of best matches.
+FIND_EXACT_MATCHES_BATCH = """
+UNWIND $rows AS row
+MATCH (n:KnowledgeNode {workspace_id: $ws, name_lower: row.key})
+WITH row, head(collect(n)) AS n
+RETURN collect({key: row.key, id: n.id, name: n.name, sim: 1.0, match_type: 'exact'}) AS matches
+"""
+
+FIND_SIMILAR_MATCHES_BATCH = """
+UNWIND $rows AS row
+CALL {
+    WITH row
+    MATCH (n:KnowledgeNode {workspace_id: $ws})
+    WHERE n.embedding IS NOT NULL AND size(n.embedding) = size(row.embedding)
+    WITH n, 2 * vector.similarity.cosine(n.embedding, row.embedding) - 1 AS sim
+    WHERE sim >= $medium
+    RETURN n, sim
+    ORDER BY sim DESC
+    LIMIT 1
+}
+RETURN collect({
+    key: row.key, id: n.id, name: n.name, sim: sim,
+    match_type: CASE
+        WHEN sim >= $very_high THEN 'very_high'
+        WHEN sim >= $high THEN 'high'
+        ELSE 'medium'
+    END
+}) AS matches
+"""
+
+FIND_SIMILAR_MATCHES_BATCH_INDEXED = """
+UNWIND $rows AS row
+CALL {
+    WITH row
+    CALL db.index.vector.queryNodes('kn_embedding', $candidates, row.embedding)
+    YIELD node AS n, score
+    WITH n, 2 * score - 1 AS sim
+    WHERE n.workspace_id = $ws
+    RETURN n, sim
+    ORDER BY sim DESC
+    LIMIT 1
+}
+RETURN collect({
+    key: row.key, id: n.id, name: n.name, sim: sim,
+    match_type: CASE
+        WHEN sim >= $very_high THEN 'very_high'
+        WHEN sim >= $high THEN 'high'
+        WHEN sim >= $medium THEN 'medium'
+    END
+}) AS matches
+"""
+
+GET_NODE_WITH_EVIDENCE = """
+MATCH (n:KnowledgeNode {id: $node_id})
+OPTIONAL MATCH (n)-[:HAS_EVIDENCE]->(e:Evidence)
+RETURN n, collect(e) as evidences
+"""
+
+
+# Completion marker written as the pipeline's last step. A redelivered job
+# skips files that have one and clears partial data of files that do not.
+# Markers are keyed on the full (workspace, job, url) hash, not the short file id
+FILE_COMPLETION_STATE = """
+OPTIONAL MATCH (p:ProcessedFile {id: $file_key})
+RETURN p IS NOT NULL AS completed,
+       EXISTS { MATCH (:Evidence {source_id: $file_id}) } AS partial
+"""
+
+MARK_FILE_COMPLETED = """
+MERGE (p:ProcessedFile {id: $file_key})
+SET p.file_id = $file_id,
+    p.workspace_id = $ws,
+    p.job_id = $job_id,
+    p.source_url = $source_url,
+    p.completed_at = $completed_at
+"""
 
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
 
 
+def get_file_completion_state(session, file_key: str, file_id: str) -> Dict[str, bool]:
+    """
+    Whether a file finished in an earlier run, and whether it left data behind
+    
+    Args:
+        session: Neo4j session
+        file_key: Full hash of (workspace_id, job_id, source_url); marker id
+        file_id: Short file id used as the source_id of the file's Evidence
+    
+    Returns:
+        {'completed': marker exists, 'partial': evidence exists for the file}
+    """
+    def read_state(tx) -> Dict[str, bool]:
+        record = tx.run(FILE_COMPLETION_STATE, file_key=file_key, file_id=file_id).single()
+        return {
+            'completed': bool(record and record['completed']),
+            'partial': bool(record and record['partial'])
+        }
+    
+    return session.execute_read(read_state)
+
+
+def mark_file_completed(session, file_key: str, file_id: str, workspace_id: str, job_id: str, source_url: str):
+    """Write the completion marker for a file, keyed on file_key (idempotent)"""
+    def write_marker(tx):
+        tx.run(
+            MARK_FILE_COMPLETED,
+            file_key=file_key, file_id=file_id, ws=workspace_id, job_id=job_id,
+            source_url=source_url, completed_at=now_iso()
+        ).consume()
+    
+    session.execute_write(write_marker)
+
+
+def find_best_match(
+    session,
+    workspace_id: str,
+    concept_name: str,
+    embedding: List[float]
+) -> Optional[Dict[str, Any]]:
+    """
+    Cascading search: Exact → Very High (>0.90) → High (>0.80) → Medium (>0.70)
+    
+    The similarity tiers are resolved server-side in one query that returns
+    only the best candidate, instead of pulling workspace nodes into Python.
+    With the kn_embedding vector index available this is an approximate
+    nearest-neighbour lookup instead of a scan over the workspace.
+    
+    Args:
+        session: Neo4j session or transaction
+        workspace_id: Workspace ID
+        concept_name: Name of the node being resolved
+        embedding: Embedding of the node being resolved
+    
+    Returns:
+        Dict with id, name, sim, match_type or None
+    """
+    record = session.run(
+        FIND_EXACT_MATCH, ws=workspace_id, name_lower=normalize_name(concept_name)
+    ).single()
+    if record:
+        return dict(record)
+    
+    if not embedding:
+        return None
+    
+    thresholds = {
+        'very_high': SEMANTIC_MERGE_THRESHOLD_VERY_HIGH,
+        'high': SEMANTIC_MERGE_THRESHOLD_HIGH,
+        'medium': SEMANTIC_MERGE_THRESHOLD_MEDIUM
+    }
+    if _vector_index_ready and len(embedding) == EMBEDDING_DIMENSION:
+        record = session.run(
+            FIND_SIMILAR_MATCH_INDEXED,
+            candidates=VECTOR_MATCH_CANDIDATES,
+            ws=workspace_id,
+            embedding=embedding,
+            **thresholds
+        ).single()
+        if record:
+            return dict(record) if record['match_type'] else None
+    
+    record = session.run(
+        FIND_SIMILAR_MATCH,
+        ws=workspace_id,
+        embedding=embedding,
+        **thresholds
+    ).single()
+    return dict(record) if record else None
+
+
+def find_best_matches(
+    session,
+    workspace_id: str,
+    embeddings_by_key: Dict[str, List[float]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Batched find_best_match: resolve many names in two round trips
+    
+    Exact name matches are looked up for every key first; only the keys left
+    over go through the similarity query. Results follow the same cascade and
+    thresholds as find_best_match.
+    
+    Args:
+        session: Neo4j session or transaction
+        workspace_id: Workspace ID
+        embeddings_by_key: normalize_name(name) -> embedding
+    
+    Returns:
+        Dict of key -> {id, name, sim, match_type} for keys that matched
+    """
+    def collected(query: str, rows: List[Dict[str, Any]], **params) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        record = session.run(query, rows=rows, ws=workspace_id, **params).single()
+        return (record.get('matches') if record else None) or []
+    
+    matches: Dict[str, Dict[str, Any]] = {}
+    exact_rows = [{'key': key} for key in embeddings_by_key]
+    for match in collected(FIND_EXACT_MATCHES_BATCH, exact_rows):
+        matches[match.pop('key')] = match
+    
+    similar_rows = [
+        {'key': key, 'embedding': embedding}
+        for key, embedding in embeddings_by_key.items()
+        if key not in matches and embedding
+    ]
+    thresholds = {
+        'very_high': SEMANTIC_MERGE_THRESHOLD_VERY_HIGH,
+        'high': SEMANTIC_MERGE_THRESHOLD_HIGH,
+        'medium': SEMANTIC_MERGE_THRESHOLD_MEDIUM
+    }
+    indexed = _vector_index_ready and all(
+        len(row['embedding']) == EMBEDDING_DIMENSION for row in similar_rows
+    )
+    if indexed:
+        # Keys the index answered for (nearest workspace node found, matched
+        # or not); only the rest still need the scan
+        answered = set()
+        for match in collected(
+            FIND_SIMILAR_MATCHES_BATCH_INDEXED, similar_rows,
+            candidates=VECTOR_MATCH_CANDIDATES, **thresholds
+        ):
+            key = match.pop('key')
+            answered.add(key)
+            if match['match_type']:
+                matches[key] = match
+        similar_rows = [row for row in similar_rows if row['key'] not in answered]
+    
+    for match in collected(FIND_SIMILAR_MATCHES_BATCH, similar_rows, **thresholds):
+        matches[match.pop('key')] = match
+    
+    return matches
+
+
+def normalize_name(name: str) -> str:
+    """Key used for exact-name matching (stored as name_lower on KnowledgeNode)"""
+    return (name or '').strip().lower()
+
+
+def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
+    """Cosine similarity (same scale as the sim of the match queries)"""
+    if len(vec1) != len(vec2):
+        return 0.0
+    dot = sum(a * b for a, b in zip(vec1, vec2))
+    norm1 = sum(a * a for a in vec1) ** 0.5
+    norm2 = sum(b * b for b in vec2) ** 0.5
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+    return dot / (norm1 * norm2)
+
+
+def ensure_neo4j_schema(driver) -> int:
+    """
+    Create uniqueness constraints and indexes used by the graph writers.
+
+    Idempotent (IF NOT EXISTS), so it is safe to call on every worker boot;
+    repeated calls for the same driver in one process are skipped.
+
+    Args:
+        driver: Neo4j driver
+
+    Returns:
+        Number of schema statements applied successfully
+    """
+    if id(driver) in _schema_ready_drivers:
+        return len(SCHEMA_STATEMENTS)
+    
+    global _vector_index_ready
+    applied = 0
+    with driver.session(database=NEO4J_DATABASE) as session:
+        for statement in SCHEMA_STATEMENTS:
+            try:
+                session.run(statement).consume()
+                applied += 1
+            except Exception as e:
+                print(f"  ⚠️  Schema statement failed: {statement[:60]}... ({e})")
+        try:
+            session.run(VECTOR_INDEX_STATEMENT).consume()
+            _vector_index_ready = True
+        except Exception as e:
+            print(f"  ⚠️  Vector index unavailable, similarity matching will scan: {e}")
+        try:
+            session.run(BACKFILL_NAME_LOWER).consume()
+        except Exception as e:
+            print(f"  ⚠️  name_lower backfill failed: {e}")
+
+    if applied == len(SCHEMA_STATEMENTS):
+        _schema_ready_drivers.add(id(driver))
+    print(f"✓ Neo4j schema ready ({applied}/{len(SCHEMA_STATEMENTS)} constraints/indexes)")
+    return applied
+
+
 def create_evidence_node(session, evidence: Evidence) -> str:
     """Create a separate Evidence node with all fields"""
-    # Convert PascalCase to snake_case for Neo4j
-    evidence_dict = {
-        'id': evidence.Id,
-        'source_id': evidence.SourceId,
-        'source_name': evidence.SourceName,
-        'chunk_id': evidence.ChunkId,
-        'text': evidence.Text,
-        'page': evidence.Page,
-        'confidence': evidence.Confidence,
-        'created_at': evidence.CreatedAt.isoformat() if isinstance(evidence.CreatedAt, datetime) else evidence.CreatedAt,
-        'language': evidence.Language,
-        'source_language': evidence.SourceLanguage,
-        'hierarchy_path': evidence.HierarchyPath,
-        'concepts': evidence.Concepts,
-        'key_claims': evidence.KeyClaims,
-        'questions_raised': evidence.QuestionsRaised,
-        'evidence_strength': evidence.EvidenceStrength
-    }
+    evidence_dict = _evidence_props(evidence)
 
     session.run(
-        """
-        CREATE (e:Evidence {
-            id: $id,
-            source_id: $source_id,
-            source_name: $source_name,
-            chunk_id: $chunk_id,
-            text: $text,
-            page: $page,
-            confidence: $confidence,
-            created_at: $created_at,
-            language: $language,
-            source_language: $source_language,
-            hierarchy_path: $hierarchy_path,
-            concepts: $concepts,
-            key_claims: $key_claims,
-            questions_raised: $questions_raised,
-            evidence_strength: $evidence_strength
-        })
-        """,
+        CREATE_EVIDENCE_NODE,
         **evidence_dict
     )
     return evidence.Id
@@ -72,18 +530,7 @@ def create_gap_suggestion_node(session, gap_suggestion: GapSuggestion, knowledge
     }
 
     session.run(
-        """
-        CREATE (g:GapSuggestion {
-            id: $id,
-            suggestion_text: $suggestion_text,
-            target_node_id: $target_node_id,
-            target_file_id: $target_file_id,
-            similarity_score: $similarity_score
-        })
-        WITH g
-        MATCH (n:KnowledgeNode {id: $knowledge_node_id})
-        CREATE (n)-[:HAS_SUGGESTION]->(g)
-        """,
+        CREATE_GAP_SUGGESTION_NODE,
         **gap_dict,
         knowledge_node_id=knowledge_node_id
     )
@@ -95,51 +542,12 @@ def create_knowledge_node(
     evidence: Evidence,
     embedding: List[float]
 ) -> str:
-    """Create KnowledgeNode with linked Evidence node"""
-    
-    # Create KnowledgeNode with proper fields
-    session.run(
-        """
-        CREATE (n:KnowledgeNode {
-            id: $id,
-            type: $type,
-            name: $name,
-            synthesis: $synthesis,
-            workspace_id: $workspace_id,
-            level: $level,
-            source_count: $source_count,
-            total_confidence: $total_confidence,
-            created_at: $created_at,
-            updated_at: $updated_at,
-            embedding: $embedding
-        })
-        """,
-        id=knowledge_node.Id,
-        type=knowledge_node.Type,
-        name=knowledge_node.Name,
-        synthesis=knowledge_node.Synthesis,
-        workspace_id=knowledge_node.WorkspaceId,
-        level=knowledge_node.Level,
-        source_count=knowledge_node.SourceCount,
-        total_confidence=knowledge_node.TotalConfidence,
-        created_at=knowledge_node.CreatedAt,
-        updated_at=knowledge_node.UpdatedAt,
-        embedding=embedding
-    )
-    
-    # Create Evidence node and establish relationship
-    evidence_id = create_evidence_node(session, evidence)
-    
+    """Create KnowledgeNode with linked Evidence node (one round trip)"""
     session.run(
-        """
-        MATCH (n:KnowledgeNode {id: $node_id})
-        MATCH (e:Evidence {id: $evidence_id})
-        CREATE (n)-[:HAS_EVIDENCE]->(e)
-        """,
-        node_id=knowledge_node.Id,
-        evidence_id=evidence_id
+        CREATE_KNOWLEDGE_NODE_WITH_EVIDENCE,
+        node=_knowledge_node_row(knowledge_node, embedding),
+        evidence=_evidence_props(evidence)
     )
-    
     return knowledge_node.Id
 
 
@@ -151,16 +559,7 @@ def update_knowledge_node_after_merge(
 ):
     """Update KnowledgeNode after merging with new evidence"""
     session.run(
-        """
-        MATCH (n:KnowledgeNode {id: $id})
-        SET n.synthesis = CASE 
-                WHEN size(n.synthesis) > 0 
-                THEN n.synthesis + '\\n\\n[' + $source_name + '] ' + $new_synthesis
-                ELSE '[' + $source_name + '] ' + $new_synthesis
-            END,
-            n.source_count = n.source_count + 1,
-            n.updated_at = datetime()
-        """,
+        UPDATE_NODE_AFTER_MERGE,
         id=node_id,
         new_synthesis=new_synthesis,
         source_name=source_name
@@ -204,21 +603,13 @@ def create_or_merge_knowledge_node(
         match_type = match['match_type']
         similarity = match['sim']
         
-        # Update the existing KnowledgeNode
-        update_knowledge_node_after_merge(
-            session, node_id, knowledge_node.Synthesis, evidence.SourceName
-        )
-        
-        # Create new Evidence node and link to existing KnowledgeNode
-        evidence_id = create_evidence_node(session, evidence)
+        # Update the existing KnowledgeNode and link the new Evidence in one query
         session.run(
-            """
-            MATCH (n:KnowledgeNode {id: $node_id})
-            MATCH (e:Evidence {id: $evidence_id})
-            CREATE (n)-[:HAS_EVIDENCE]->(e)
-            """,
-            node_id=node_id,
-            evidence_id=evidence_id
+            MERGE_INTO_NODE_WITH_EVIDENCE,
+            id=node_id,
+            new_synthesis=knowledge_node.Synthesis,
+            source_name=evidence.SourceName,
+            evidence=_evidence_props(evidence)
         )
         
         print(f"    ♻️  MERGE ({match_type}, sim={similarity:.2f}): '{knowledge_node.Name}' → '{match['name']}'")
@@ -236,6 +627,33 @@ def create_or_merge_knowledge_node(
         return node_id
 
 
+# Relationship types cannot be Cypher parameters, so one constant query per
+# type is built once at import. Each string is stable, so Neo4j reuses a cached
+# plan instead of re-planning a freshly formatted query on every call.
+PARENT_CHILD_RELATIONSHIPS = dict(RELATIONSHIP_TYPES)
+
+# (parent_level, child_level) -> relationship key, for callers that only know levels
+RELATIONSHIP_BY_LEVELS = {
+    (0, 1): 'domain_to_category',
+    (1, 2): 'category_to_concept',
+    (2, 3): 'concept_to_subconcept'
+}
+
+
+def relationship_type_for_levels(parent_level: int, child_level: int) -> str:
+    """Relationship key for a parent/child level pair (deeper levels use HAS_DETAIL)"""
+    return RELATIONSHIP_BY_LEVELS.get((parent_level, child_level), 'concept_to_subconcept')
+
+PARENT_CHILD_QUERIES = {
+    relationship_type: f"""
+        MATCH (parent:KnowledgeNode {{id: $parent_id}})
+        MATCH (child:KnowledgeNode {{id: $child_id}})
+        MERGE (parent)-[:{cypher_relationship}]->(child)
+        """
+    for relationship_type, cypher_relationship in PARENT_CHILD_RELATIONSHIPS.items()
+}
+
+
 def create_parent_child_relationship(
     session,
     parent_id: str,
@@ -243,24 +661,202 @@ def create_parent_child_relationship(
     relationship_type: str
 ):
     """Create hierarchical relationship between KnowledgeNodes"""
-    
-    relationship_map = {
-        'domain_to_category': 'HAS_SUBCATEGORY',
-        'category_to_concept': 'CONTAINS_CONCEPT', 
-        'concept_to_subconcept': 'HAS_DETAIL'
+    query = PARENT_CHILD_QUERIES.get(
+        relationship_type, PARENT_CHILD_QUERIES['domain_to_category']
+    )
+    session.run(query, parent_id=parent_id, child_id=child_id)
+
+
+def _kn_params(
+    node_id: str,
+    node_type: str,
+    name: str,
+    synthesis: str,
+    workspace_id: str,
+    level: int,
+    created_at: str,
+    embedding: List[float]
+) -> Dict[str, Any]:
+    """Row for CREATE_KNOWLEDGE_NODES_BATCH (snake_case keys as stored in Neo4j)"""
+    return {
+        'id': node_id,
+        'type': node_type,
+        'name': name,
+        'name_lower': normalize_name(name),
+        'synthesis': synthesis,
+        'workspace_id': workspace_id,
+        'level': level,
+        'source_count': 1,
+        'total_confidence': 0.0,
+        'created_at': created_at,
+        'updated_at': created_at,
+        'embedding': embedding
+    }
+
+
+def _evidence_params(
+    node_id: str,
+    source_id: str,
+    source_name: str,
+    text: str,
+    created_at: str,
+    evidence_id: Optional[str] = None,
+    source_language: str = 'ENG'
+) -> Dict[str, Any]:
+    """Row for CREATE_EVIDENCE_BATCH; node_id is the KnowledgeNode to link"""
+    return {
+        'node_id': node_id,
+        'id': evidence_id or str(uuid.uuid4()),
+        'source_id': source_id,
+        'source_name': source_name,
+        'chunk_id': '',
+        'text': text[:MAX_STORED_EVIDENCE_TEXT_LENGTH],
+        'text_len': len(text),
+        'page': 0,
+        'confidence': 0.0,
+        'created_at': created_at,
+        'language': 'ENG',
+        'source_language': source_language,
+        'hierarchy_path': '',
+        'concepts': [],
+        'key_claims': [],
+        'questions_raised': [],
+        'evidence_strength': 0.0
+    }
+
+
+CREATE_KNOWLEDGE_NODES_BATCH = """
+UNWIND $rows AS row
+CREATE (n:KnowledgeNode {id: row.id})
+SET n += row
+"""
+
+UPDATE_MERGED_NODES_BATCH = """
+UNWIND $rows AS row
+MATCH (n:KnowledgeNode {id: row.id})
+SET n.synthesis = CASE
+        WHEN size(n.synthesis) > 0
+        THEN n.synthesis + '\\n\\n[' + row.source_name + '] ' + row.new_synthesis
+        ELSE '[' + row.source_name + '] ' + row.new_synthesis
+    END,
+    n.source_count = n.source_count + 1,
+    n.updated_at = datetime()
+"""
+
+CREATE_EVIDENCE_BATCH = """
+UNWIND $rows AS row
+MATCH (n:KnowledgeNode {id: row.node_id})
+CREATE (e:Evidence {id: row.id})
+SET e += row
+REMOVE e.node_id
+CREATE (n)-[:HAS_EVIDENCE]->(e)
+"""
+
+CREATE_GAP_SUGGESTIONS_BATCH = """
+MATCH (n:KnowledgeNode {id: $knowledge_node_id})
+UNWIND $rows AS row
+CREATE (g:GapSuggestion {id: row.id})
+SET g += row
+CREATE (n)-[:HAS_SUGGESTION]->(g)
+"""
+
+PARENT_CHILD_BATCH_QUERIES = {
+    relationship_type: f"""
+UNWIND $rows AS row
+MATCH (parent:KnowledgeNode {{id: row.parent_id}})
+MATCH (child:KnowledgeNode {{id: row.child_id}})
+MERGE (parent)-[:{cypher_relationship}]->(child)
+"""
+    for relationship_type, cypher_relationship in PARENT_CHILD_RELATIONSHIPS.items()
+}
+
+
+@lru_cache(maxsize=1024)
+def _iso_datetime(value: datetime) -> str:
+    return value.isoformat()
+
+
+def _iso(value: Any) -> Any:
+    """datetime -> ISO string; nodes of one build share timestamps, so conversions are memoized"""
+    return _iso_datetime(value) if isinstance(value, datetime) else value
+
+
+def _evidence_props(evidence: Evidence) -> Dict[str, Any]:
+    """
+    Evidence dataclass -> snake_case properties as stored in Neo4j.
+
+    Text is capped at MAX_STORED_EVIDENCE_TEXT_LENGTH to keep the store (and page
+    cache) small; text_len keeps the original length, the full chunk is in Qdrant.
+    """
+    text = evidence.Text or ''
+    return {
+        'id': evidence.Id,
+        'source_id': evidence.SourceId,
+        'source_name': evidence.SourceName,
+        'chunk_id': evidence.ChunkId,
+        'text': text[:MAX_STORED_EVIDENCE_TEXT_LENGTH],
+        'text_len': len(text),
+        'page': evidence.Page,
+        'confidence': evidence.Confidence,
+        'created_at': _iso(evidence.CreatedAt),
+        'language': evidence.Language,
+        'source_language': evidence.SourceLanguage,
+        'hierarchy_path': evidence.HierarchyPath,
+        'concepts': evidence.Concepts,
+        'key_claims': evidence.KeyClaims,
+        'questions_raised': evidence.QuestionsRaised,
+        'evidence_strength': evidence.EvidenceStrength
+    }
+
+
+def _knowledge_node_row(node: KnowledgeNode, embedding: List[float]) -> Dict[str, Any]:
+    """KnowledgeNode dataclass -> snake_case properties as stored in Neo4j"""
+    return {
+        'id': node.Id,
+        'type': node.Type,
+        'name': node.Name,
+        'name_lower': normalize_name(node.Name),
+        'synthesis': node.Synthesis,
+        'workspace_id': node.WorkspaceId,
+        'level': node.Level,
+        'source_count': node.SourceCount,
+        'total_confidence': node.TotalConfidence,
+        'created_at': _iso(node.CreatedAt),
+        'updated_at': _iso(node.UpdatedAt),
+        'embedding': embedding
     }
+
+
+def run_in_batches(
+    session,
+    query: str,
+    rows: List[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    **params
+) -> int:
+    """
+    Run an `UNWIND $rows` query over rows, batch_size rows per call
     
-    cypher_relationship = relationship_map.get(relationship_type, 'HAS_SUBCATEGORY')
+    Keeps each transaction's memory bounded on very large graphs while still
+    collapsing N round trips into ceil(N / batch_size).
     
-    session.run(
-        f"""
-        MATCH (parent:KnowledgeNode {{id: $parent_id}})
-        MATCH (child:KnowledgeNode {{id: $child_id}})
-        MERGE (parent)-[:{cypher_relationship}]->(child)
-        """,
-        parent_id=parent_id,
-        child_id=child_id
-    )
+    Returns:
+        Number of rows sent
+    """
+    batch_size = batch_size or NEO4J_WRITE_BATCH_SIZE
+    for start in range(0, len(rows), batch_size):
+        session.run(query, rows=rows[start:start + batch_size], **params)
+    return len(rows)
+
+
+def _iter_structure_items(structure: Dict):
+    """Yield domain, category, concept and subconcept dicts of an LLM structure"""
+    yield structure.get('domain', {})
+    for cat in structure.get('categories', []):
+        yield cat
+        for concept in cat.get('concepts', []):
+            yield concept
+            yield from concept.get('subconcepts', [])
 
 
 def create_hierarchical_knowledge_graph(
@@ -269,7 +865,8 @@ def create_hierarchical_knowledge_graph(
     structure: Dict,
     file_id: str,
     file_name: str,
-    embeddings_cache: Dict[str, List[float]]
+    embeddings_cache: Dict[str, List[float]],
+    source_language: str = 'ENG'
 ) -> Dict[str, Any]:
     """
     Create hierarchical knowledge graph with proper entity structure
@@ -278,14 +875,23 @@ def create_hierarchical_knowledge_graph(
     - Create separate Evidence nodes for each KnowledgeNode
     - Maintain proper relationships between entities
     - Support cascading deduplication
+    - Resolve matches for every structure name up front (find_best_matches,
+      two round trips), collect plain parameter dicts while walking the
+      structure, then flush nodes, evidence and relationships with a few
+      UNWIND queries instead of several round trips per node
+    
+    Designed to run as a single unit of work via
+    `session.execute_write(create_hierarchical_knowledge_graph, ...)`, so every
+    write for one PDF commits once. A plain session also works (auto-commit).
     
     Args:
-        session: Neo4j session
+        session: Neo4j transaction (or session)
         workspace_id: Workspace ID
         structure: Hierarchical structure from LLM
         file_id: Source file ID
         file_name: Source file name
         embeddings_cache: Pre-computed embeddings {name: vector}
+        source_language: Evidence language tag of the original PDF (see language_tag)
     
     Returns:
         Dict with statistics about node creation/merging
@@ -298,191 +904,151 @@ def create_hierarchical_knowledge_graph(
         'high_similarity_merges': 0,
         'medium_similarity_merges': 0,
         'final_count': 0,
-        'node_ids': []
+        'node_ids': [],
+        'leaf_node_ids': []
     }
     
+    # One timestamp and one id scope for the whole build instead of one per
+    # node/evidence; ids carry the file id so cleanup can find this file's nodes
+    now = datetime.now(timezone.utc).isoformat()
+    short_id = short_id_factory(file_id)
+    
     # Track initial count
     result = session.run(
-        """
-        MATCH (n:KnowledgeNode {workspace_id: $ws})
-        RETURN count(n) as initial_count
-        """,
+        COUNT_WORKSPACE_NODES,
         ws=workspace_id
     )
     record = result.single()
-    initial_count = record['initial_count'] if record else 0
+    initial_count = record['total'] if record else 0
     
-    # Level 0: Domain (root)
-    domain = structure.get('domain', {})
-    domain_id = None
-    
-    if domain.get('name'):
-        # Create KnowledgeNode for domain
-        domain_node = KnowledgeNode(
-            Name=domain['name'],
-            Synthesis=domain.get('synthesis', ''),
-            Type='domain',
-            Level=0,
-            WorkspaceId=workspace_id
-        )
+    node_rows: List[Dict[str, Any]] = []
+    merge_rows: List[Dict[str, Any]] = []
+    evidence_rows: List[Dict[str, Any]] = []
+    relationship_rows: Dict[str, List[Dict[str, str]]] = {
+        relationship_type: [] for relationship_type in PARENT_CHILD_RELATIONSHIPS
+    }
+    # Nodes created in this build are not in the graph until the flush, so
+    # repeated names inside one structure are resolved locally: exact names
+    # by key, near-duplicates by embedding against the nodes created so far
+    resolved_ids: Dict[str, str] = {}
+    created_nodes: List[Tuple[str, str, List[float]]] = []
+    # Ids linked as a parent in this build; the rest are leaf candidates
+    parent_ids: Set[str] = set()
+    
+    # The graph does not change before the flush, so matches for every name
+    # can be resolved in one batch instead of per node. An empty workspace
+    # (the first PDF) has nothing to merge into, so the lookup is skipped.
+    existing_matches: Dict[str, Dict[str, Any]] = {}
+    if initial_count:
+        embeddings_by_key: Dict[str, List[float]] = {}
+        for item in _iter_structure_items(structure):
+            name = item.get('name')
+            embedding = embeddings_cache.get(name) if name and name.strip() else None
+            if embedding is not None:
+                embeddings_by_key.setdefault(normalize_name(name), embedding)
+        existing_matches = find_best_matches(session, workspace_id, embeddings_by_key)
+    
+    def resolve_node(item: Dict, node_type: str, level: int) -> Optional[str]:
+        """Match or queue one structure node; returns its id or None if skipped"""
+        name = item.get('name')
+        if not name or not name.strip():
+            return None
         
-        # Create Evidence for domain
-        domain_evidence = Evidence(
-            SourceId=file_id,
-            SourceName=file_name,
-            Text=domain.get('synthesis', '')
-        )
+        embedding = embeddings_cache.get(name)
+        if embedding is None:
+            print(f"    ⚠️  No embedding for {node_type} '{name}', skipping")
+            return None
+        
+        synthesis = item.get('synthesis', '')
+        key = normalize_name(name)
         
-        domain_embedding = embeddings_cache.get(domain['name'])
-        if domain_embedding is not None:
-            domain_id = create_or_merge_knowledge_node(
-                session, workspace_id, domain_node, domain_evidence, domain_embedding
-            )
+        if key in resolved_ids:
+            node_id = resolved_ids[key]
+            merge_rows.append({'id': node_id, 'new_synthesis': synthesis, 'source_name': file_name})
         else:
-            print(f"    ⚠️  No embedding for domain '{domain_node.Name}', skipping")
-            domain_id = None
+            match = existing_matches.get(key)
+            if match:
+                node_id = match['id']
+                merge_rows.append({'id': node_id, 'new_synthesis': synthesis, 'source_name': file_name})
+                print(f"    ♻️  MERGE ({match['match_type']}, sim={match['sim']:.2f}): '{name}' → '{match['name']}'")
+            else:
+                duplicate = max(
+                    ((cosine_similarity(embedding, other), other_id, other_name)
+                     for other_id, other_name, other in created_nodes),
+                    default=None
+                )
+                if duplicate and duplicate[0] >= SEMANTIC_MERGE_THRESHOLD_VERY_HIGH:
+                    sim, node_id, other_name = duplicate
+                    merge_rows.append({'id': node_id, 'new_synthesis': synthesis, 'source_name': file_name})
+                    print(f"    ♻️  MERGE (in build, sim={sim:.2f}): '{name}' → '{other_name}'")
+                else:
+                    node_id = short_id(node_type)
+                    node_rows.append(_kn_params(
+                        node_id, node_type, name, synthesis, workspace_id, level, now, embedding
+                    ))
+                    created_nodes.append((node_id, name, embedding))
+                    print(f"    ✨ CREATE: '{name}'")
+            resolved_ids[key] = node_id
         
-        if domain_id:
-            stats['node_ids'].append(domain_id)
-            stats['evidence_created'] += 1
+        evidence_rows.append(_evidence_params(
+            node_id, file_id, file_name, synthesis, now,
+            evidence_id=short_id('evidence'), source_language=source_language
+        ))
+        stats['node_ids'].append(node_id)
+        stats['evidence_created'] += 1
+        return node_id
+    
+    def link(parent_id: Optional[str], child_id: Optional[str], relationship_type: str):
+        # A child merged into its own parent must not become a self-loop
+        if parent_id and child_id and parent_id != child_id:
+            relationship_rows[relationship_type].append({'parent_id': parent_id, 'child_id': child_id})
+            parent_ids.add(parent_id)
+    
+    # Level 0: Domain (root)
+    domain_id = resolve_node(structure.get('domain', {}), 'domain', 0)
     
     # Level 1: Categories
     for cat in structure.get('categories', []):
-        if not cat.get('name'):
-            continue
-        
-        # Create KnowledgeNode for category
-        category_node = KnowledgeNode(
-            Name=cat['name'],
-            Synthesis=cat.get('synthesis', ''),
-            Type='category',
-            Level=1,
-            WorkspaceId=workspace_id
-        )
-        
-        # Create Evidence for category
-        category_evidence = Evidence(
-            SourceId=file_id,
-            SourceName=file_name,
-            Text=cat.get('synthesis', '')
-        )
-        
-        category_embedding = embeddings_cache.get(cat['name'])
-        if category_embedding is not None:
-            cat_id = create_or_merge_knowledge_node(
-                session, workspace_id, category_node, category_evidence, category_embedding
-            )
-        else:
-            print(f"    ⚠️  No embedding for category '{category_node.Name}', skipping")
+        cat_id = resolve_node(cat, 'category', 1)
+        if not cat_id:
             continue
-        
-        if cat_id:
-            stats['node_ids'].append(cat_id)
-            stats['evidence_created'] += 1
-            
-            # Link to domain
-            if domain_id:
-                create_parent_child_relationship(
-                    session, domain_id, cat_id, 'domain_to_category'
-                )
+        link(domain_id, cat_id, 'domain_to_category')
         
         # Level 2: Concepts
         for concept in cat.get('concepts', []):
-            if not concept.get('name'):
+            concept_id = resolve_node(concept, 'concept', 2)
+            if not concept_id:
                 continue
-            
-            # Create KnowledgeNode for concept
-            concept_node = KnowledgeNode(
-                Name=concept['name'],
-                Synthesis=concept.get('synthesis', ''),
-                Type='concept',
-                Level=2,
-                WorkspaceId=workspace_id
-            )
-            
-            # Create Evidence for concept
-            concept_evidence = Evidence(
-                SourceId=file_id,
-                SourceName=file_name,
-                Text=concept.get('synthesis', '')
-            )
-            
-            concept_embedding = embeddings_cache.get(concept['name'])
-            if concept_embedding is not None:
-                concept_id = create_or_merge_knowledge_node(
-                    session, workspace_id, concept_node, concept_evidence, concept_embedding
-                )
-            else:
-                print(f"    ⚠️  No embedding for concept '{concept_node.Name}', skipping")
-                continue
-            
-            if concept_id:
-                stats['node_ids'].append(concept_id)
-                stats['evidence_created'] += 1
-                
-                # Link to category
-                if cat_id:
-                    create_parent_child_relationship(
-                        session, cat_id, concept_id, 'category_to_concept'
-                    )
+            link(cat_id, concept_id, 'category_to_concept')
             
             # Level 3: Subconcepts
             for sub in concept.get('subconcepts', []):
-                if not sub.get('name'):
-                    continue
-                
-                # Create KnowledgeNode for subconcept
-                subconcept_node = KnowledgeNode(
-                    Name=sub['name'],
-                    Synthesis=sub.get('synthesis', ''),
-                    Type='subconcept',
-                    Level=3,
-                    WorkspaceId=workspace_id
-                )
-                
-                # Create Evidence for subconcept
-                subconcept_evidence = Evidence(
-                    SourceId=file_id,
-                    SourceName=file_name,
-                    Text=sub.get('synthesis', '')
-                )
-                
-                subconcept_embedding = embeddings_cache.get(sub['name'])
-                if subconcept_embedding is not None:
-                    sub_id = create_or_merge_knowledge_node(
-                        session, workspace_id, subconcept_node, subconcept_evidence, subconcept_embedding
-                    )
-                else:
-                    print(f"    ⚠️  No embedding for subconcept '{subconcept_node.Name}', skipping")
-                    continue
-                
-                
-                if sub_id:
-                    stats['node_ids'].append(sub_id)
-                    stats['evidence_created'] += 1
-                    
-                    # Link to concept
-                    if concept_id:
-                        create_parent_child_relationship(
-                            session, concept_id, sub_id, 'concept_to_subconcept'
-                        )
-    
-    # Calculate final statistics
-    result = session.run(
-        """
-        MATCH (n:KnowledgeNode {workspace_id: $ws})
-        RETURN count(n) as total
-        """,
-        ws=workspace_id
-    )
-    stats['final_count'] = result.single()['total']
-    stats['nodes_created'] = stats['final_count'] - initial_count
+                sub_id = resolve_node(sub, 'subconcept', 3)
+                link(concept_id, sub_id, 'concept_to_subconcept')
+    
+    # Flush: nodes first so evidence links and relationships can MATCH them
+    run_in_batches(session, CREATE_KNOWLEDGE_NODES_BATCH, node_rows)
+    run_in_batches(session, UPDATE_MERGED_NODES_BATCH, merge_rows)
+    run_in_batches(session, CREATE_EVIDENCE_BATCH, evidence_rows)
+    for relationship_type, rows in relationship_rows.items():
+        run_in_batches(session, PARENT_CHILD_BATCH_QUERIES[relationship_type], rows)
+    
+    # Calculate final statistics: every node this build creates is one of
+    # node_rows, so no second count round trip is needed
+    stats['nodes_created'] = len(node_rows)
+    stats['final_count'] = initial_count + stats['nodes_created']
     
     # Calculate merge statistics
     unique_nodes = set(stats['node_ids'])
     total_processed = len(stats['node_ids'])
     stats['exact_matches'] = total_processed - len(unique_nodes)
     
+    # Known while building, so resource discovery only has to check these
+    # (merged nodes may still have children from earlier files)
+    stats['leaf_node_ids'] = [
+        node_id for node_id in dict.fromkeys(stats['node_ids']) if node_id not in parent_ids
+    ]
+    
     return stats
 
 
@@ -491,9 +1057,21 @@ def add_gap_suggestions_to_node(
     knowledge_node_id: str,
     gap_suggestions: List[GapSuggestion]
 ):
-    """Add GapSuggestion nodes to a KnowledgeNode"""
-    for gap_suggestion in gap_suggestions:
-        create_gap_suggestion_node(session, gap_suggestion, knowledge_node_id)
+    """Add GapSuggestion nodes to a KnowledgeNode in one UNWIND query"""
+    if not gap_suggestions:
+        return
+    
+    rows = [
+        {
+            'id': gap_suggestion.Id,
+            'suggestion_text': gap_suggestion.SuggestionText,
+            'target_node_id': gap_suggestion.TargetNodeId,
+            'target_file_id': gap_suggestion.TargetFileId,
+            'similarity_score': gap_suggestion.SimilarityScore
+        }
+        for gap_suggestion in gap_suggestions
+    ]
+    run_in_batches(session, CREATE_GAP_SUGGESTIONS_BATCH, rows, knowledge_node_id=knowledge_node_id)
 
 
 def get_knowledge_node_with_evidence(
@@ -503,11 +1081,7 @@ def get_knowledge_node_with_evidence(
     """Retrieve KnowledgeNode with all its Evidence nodes"""
     
     result = session.run(
-        """
-        MATCH (n:KnowledgeNode {id: $node_id})
-        OPTIONAL MATCH (n)-[:HAS_EVIDENCE]->(e:Evidence)
-        RETURN n, collect(e) as evidences
-        """,
+        GET_NODE_WITH_EVIDENCE,
         node_id=node_id
     )
     
@@ -517,6 +1091,8 @@ def get_knowledge_node_with_evidence(
     
     node_data = record['n']
     evidence_nodes = record['evidences']
+    # Fallback timestamp for records without one (evaluated once, not per field)
+    now = datetime.now(timezone.utc)
     
     # Convert to KnowledgeNode object
     knowledge_node = KnowledgeNode(
@@ -528,8 +1104,8 @@ def get_knowledge_node_with_evidence(
         Level=node_data.get('level', 0),
         SourceCount=node_data.get('source_count', 0),
         TotalConfidence=node_data.get('total_confidence', 0.0),
-        CreatedAt=node_data.get('created_at', datetime.now(timezone.utc)),
-        UpdatedAt=node_data.get('updated_at', datetime.now(timezone.utc))
+        CreatedAt=node_data.get('created_at', now),
+        UpdatedAt=node_data.get('updated_at', now)
     )
     
     # Convert to Evidence objects
@@ -543,7 +1119,7 @@ def get_knowledge_node_with_evidence(
             Text=evidence_data.get('text', ''),
             Page=evidence_data.get('page', 0),
             Confidence=evidence_data.get('confidence', 0.0),
-            CreatedAt=evidence_data.get('created_at', datetime.now(timezone.utc)),
+            CreatedAt=evidence_data.get('created_at', now),
             Language=evidence_data.get('language', 'ENG'),
             SourceLanguage=evidence_data.get('source_language', 'ENG'),
             HierarchyPath=evidence_data.get('hierarchy_path', ''),
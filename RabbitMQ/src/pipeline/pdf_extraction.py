@@ -3,7 +3,7 @@ import requests
 import fitz  # PyMuPDF
 import io
 import re
-from typing import Tuple, Dict, Optional, List
+from typing import Tuple, Dict, Optional, List, Iterator
 from collections import Counter
 
 
@@ -50,7 +50,7 @@ def extract_pdf_enhanced(
             "extracted_pages": extraction_result["extracted_pages"],
             "avg_text_per_page": extraction_result["avg_text_per_page"],
             "language_confidence": lang["confidence"],
-            "file_size": len(pdf_bytes.getvalue()) if pdf_bytes else 0
+            "file_size": pdf_bytes.getbuffer().nbytes if pdf_bytes else 0
         }
         
         print(f"✓ Extracted {extraction_result['extracted_pages']}/{extraction_result['total_pages']} pages | "
@@ -96,48 +96,50 @@ def download_pdf_with_progress(pdf_url: str, timeout: int, chunk_size: int) -> O
         return None
 
 
-def extract_text_from_pdf(pdf_bytes: io.BytesIO, max_pages: int) -> Dict:
-    """Extract text from PDF using multiple strategies"""
-    try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        full_text = ""
-        text_per_page = []
-        total_pages = min(doc.page_count, max_pages)  # LẤY PAGE COUNT TRƯỚC KHI CLOSE
-
-        for i in range(total_pages):
-            page = doc[i]
+def iter_pdf_pages(doc: "fitz.Document", max_pages: int) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_num, cleaned_text) for the first max_pages pages, one at a time
+    
+    Pages are extracted lazily, so only the current page's raw text is alive
+    while it is cleaned; blank pages are skipped.
+    """
+    for i in range(min(doc.page_count, max_pages)):
+        page = doc[i]
 
-            # Strategy 1: Default
-            text = page.get_text()
+        # Strategy 1: Default
+        text = page.get_text()
 
-            # Strategy 2: Sorted
-            if len(str(text).strip()) < 50:
-                text = page.get_text("text", sort=True)
+        # Strategy 2: Sorted
+        if len(str(text).strip()) < 50:
+            text = page.get_text("text", sort=True)
 
-            # Strategy 3: Blocks
-            if len(str(text).strip()) < 50:
-                blocks = page.get_text("blocks")
-                text = "\n".join([block[4] for block in blocks if block[4].strip()])
+        # Strategy 3: Blocks
+        if len(str(text).strip()) < 50:
+            blocks = page.get_text("blocks")
+            text = "\n".join([block[4] for block in blocks if block[4].strip()])
 
-            cleaned_text = clean_page_text(str(text), i + 1)
+        cleaned_text = clean_page_text(str(text), i + 1)
+        if cleaned_text:
+            yield i + 1, cleaned_text
 
-            # FIXED: check cleaned_text, not function name
-            if cleaned_text:
-                full_text += cleaned_text + "\n\n"
-                text_per_page.append(len(cleaned_text))
 
-        # Store page count before closing the document
-        total_doc_pages = doc.page_count
-        doc.close()
+def extract_text_from_pdf(pdf_bytes: io.BytesIO, max_pages: int) -> Dict:
+    """Extract text from PDF using multiple strategies"""
+    try:
+        # The context manager closes the document even if a page fails
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            total_doc_pages = doc.page_count
+            page_texts = [text for _, text in iter_pdf_pages(doc, max_pages)]
+        text_per_page = [len(text) for text in page_texts]
 
         avg_text_per_page = (
             sum(text_per_page) / len(text_per_page) if text_per_page else 0
         )
 
         return {
-            "text": full_text.strip(),
+            "text": "\n\n".join(page_texts).strip(),
             "total_pages": total_doc_pages,
-            "extracted_pages": total_pages,
+            "extracted_pages": min(total_doc_pages, max_pages),
             "avg_text_per_page": avg_text_per_page,
             "text_per_page": text_per_page
         }
@@ -327,7 +329,7 @@ def extract_pdf_as_paragraphs(
             "extracted_pages": extraction_result["extracted_pages"],
             "avg_text_per_page": extraction_result["avg_text_per_page"],
             "language_confidence": lang["confidence"],
-            "file_size": len(pdf_bytes.getvalue()) if pdf_bytes else 0,
+            "file_size": pdf_bytes.getbuffer().nbytes if pdf_bytes else 0,
             "paragraph_count": len(paragraphs),
             "avg_paragraph_length": sum(len(p) for p in paragraphs) / len(paragraphs) if paragraphs else 0
         }
@@ -8,6 +8,7 @@ rather than arbitrary text chunks. This ensures:
 - Efficient recursive expansion
 """
 
+from itertools import accumulate
 from typing import List, Dict, Any, Optional, Tuple, Union
 
 
@@ -384,3 +385,84 @@ def get_position_coverage(
     covered = sum(end - start + 1 for start, end in merged)
     
     return min(1.0, covered / paragraph_count)
+
+
+def estimate_paragraph_pages(
+    paragraphs: List[str],
+    avg_text_per_page: float
+) -> List[int]:
+    """
+    Estimate the 1-based page of every paragraph in one pass
+    
+    Pages are derived from the cumulative character offset of each paragraph
+    divided by the document's average text per page, so evidence rows can look
+    up their page by index instead of recomputing it per item.
+    
+    Args:
+        paragraphs: Full paragraph array from PDF
+        avg_text_per_page: Average extracted characters per page
+    
+    Returns:
+        Page number for each paragraph index
+        
+    Example:
+        >>> estimate_paragraph_pages(["a" * 600, "b" * 600, "c" * 600], 1000)
+        [1, 1, 2]
+    """
+    per_page = max(float(avg_text_per_page), 1.0)
+    # Character offset where each paragraph begins
+    starts = accumulate((len(p) for p in paragraphs[:-1]), initial=0)
+    return [int(start // per_page) + 1 for start in starts] if paragraphs else []
+
+
+def representative_sample(
+    paragraphs: List[str],
+    budget: int = 4000,
+    window: int = 10
+) -> str:
+    """
+    Build a compact, position-labeled sample of a document for LLM context
+    
+    Takes windows of paragraphs from the start, middle and end of the document
+    (rather than only its opening), prefixes each with its absolute index so the
+    LLM can cite positions anywhere in the document, and caps the result at
+    `budget` characters split evenly across the windows.
+    
+    Args:
+        paragraphs: Full paragraph array from PDF
+        budget: Maximum characters of sample text
+        window: Paragraphs per window
+    
+    Returns:
+        Sample text, paragraphs separated by blank lines
+        
+    Example:
+        >>> representative_sample([f"P{i}" for i in range(20)], window=1)
+        '[0] P0\\n\\n[10] P10\\n\\n[19] P19'
+    """
+    if not paragraphs:
+        return ""
+    
+    count = len(paragraphs)
+    mid = count // 2
+    starts = [0, max(0, mid - window // 2), max(0, count - window)]
+    
+    # Windows overlap on short documents; keep each index once, in order
+    indices = sorted({
+        idx for start in starts for idx in range(start, min(start + window, count))
+    })
+    
+    # Separators count against the budget too
+    per_window = (budget - 2 * (len(indices) - 1)) // 3
+    used = {start: 0 for start in starts}
+    parts = []
+    for idx in indices:
+        owner = max(start for start in starts if start <= idx)
+        remaining = per_window - used[owner]
+        if remaining <= 0:
+            continue
+        text = f"[{idx}] {paragraphs[idx]}"[:remaining]
+        used[owner] += len(text)
+        parts.append(text)
+    
+    return "\n\n".join(parts)
@@ -2,6 +2,7 @@
 from urllib.parse import quote
 from typing import List, Tuple, Dict, Any, Optional
 from dataclasses import asdict
+from weakref import WeakKeyDictionary
 import time
 
 from qdrant_client import QdrantClient
@@ -13,6 +14,12 @@ from qdrant_client.http.exceptions import UnexpectedResponse
 
 from ..model.QdrantChunk import QdrantChunk
 
+# Collections already verified per client, with when they were checked:
+# consecutive PDFs of one workspace skip the exists/get_collection round trips.
+# Entries expire so a collection dropped elsewhere is noticed again.
+COLLECTION_CHECK_TTL_SECONDS = 300
+_ready_collections: "WeakKeyDictionary[QdrantClient, Dict[Tuple[str, int], float]]" = WeakKeyDictionary()
+
 
 def ensure_collection_exists(
     qdrant_client: QdrantClient, 
@@ -31,7 +38,11 @@ def ensure_collection_exists(
         Collection name
     """
     collection_name = f"workspace_{quote(workspace_id)}"
-    
+    ready = _ready_collections.setdefault(qdrant_client, {})
+    checked_at = ready.get((collection_name, vector_size))
+    if checked_at is not None and time.monotonic() - checked_at < COLLECTION_CHECK_TTL_SECONDS:
+        return collection_name
+
     try:
         # Check if collection exists and has correct configuration
         collection_exists = qdrant_client.collection_exists(collection_name)
@@ -76,7 +87,8 @@ def ensure_collection_exists(
                 print(f"⚠️  Collection {collection_name} has wrong vector size: {current_size} != {vector_size}")
                 # In production, you might want to recreate the collection
                 # For now, we'll proceed with a warning
-        
+
+        ready[(collection_name, vector_size)] = time.monotonic()
         return collection_name
         
     except Exception as e:
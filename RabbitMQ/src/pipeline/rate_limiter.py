@@ -0,0 +1,52 @@
+"""Proactive request pacing for CLOVA chat completions
+
+Every worker thread and every event loop (each PDF runs its own) draws from
+one process-wide budget, so parallel PDFs together stay under the account's
+requests-per-minute limit instead of discovering it through 429s and backoff.
+
+- Generic cell rate algorithm: each request reserves the next free slot under
+  a lock, then sleeps (thread) or awaits (event loop) until its slot
+- `burst` requests may start back to back before pacing kicks in
+- CLOVA_REQUESTS_PER_MINUTE = 0 disables pacing (reserve() returns 0)
+"""
+import time
+import asyncio
+import threading
+
+from ..config import CLOVA_REQUESTS_PER_MINUTE, CLOVA_RATE_BURST
+
+
+class RequestRateLimiter:
+    """Thread-safe request pacer usable from sync code and any event loop"""
+
+    def __init__(self, requests_per_minute: int, burst: int = 1):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.tolerance = self.interval * max(burst - 1, 0)
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim the next request slot; returns seconds to wait before sending"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+            return max(slot - self.tolerance - now, 0.0)
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Wait (without blocking the loop) until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# Process-wide budget shared by every CLOVA chat call site
+clova_rate_limiter = RequestRateLimiter(CLOVA_REQUESTS_PER_MINUTE, burst=CLOVA_RATE_BURST)
@@ -1,14 +1,36 @@
 """Practical resource discovery using knowledge graph analysis"""
 import json
 import uuid
+import asyncio
+import httpx
 import requests
 import re
-import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse
 from datetime import datetime
 
 from ..model.GapSuggestion import GapSuggestion
+from .neo4j_graph import short_id_factory
+from .rate_limiter import clova_rate_limiter
+from ..config import LLM_MAX_CONCURRENCY, MAX_RETRY_ATTEMPTS, RETRY_INITIAL_DELAY, RETRY_BACKOFF_FACTOR
+
+
+# Resource recommendations, one row per target node (row.node_id). Not the
+# neo4j_graph batch of the same kind, which links all rows to a single node
+CREATE_RESOURCE_SUGGESTIONS_BATCH = """
+UNWIND $rows AS row
+MATCH (n:KnowledgeNode {id: row.node_id})
+CREATE (g:GapSuggestion {
+    id: row.id,
+    suggestion_text: row.text,
+    target_node_id: row.target_node_id,
+    target_file_id: row.target_file_id,
+    similarity_score: row.similarity,
+    created_at: datetime(),
+    suggestion_type: "resource_recommendation"
+})
+MERGE (n)-[:HAS_SUGGESTION {type: "resource"}]->(g)
+"""
 
 
 def create_gap_suggestion_node(session, gap: GapSuggestion, target_node_id: str) -> str:
@@ -17,39 +39,15 @@ def create_gap_suggestion_node(session, gap: GapSuggestion, target_node_id: str)
     gap_id = f"gap_{uuid.uuid4().hex[:8]}"
     
     try:
-        # Use transaction for atomic operations
-        with session.begin_transaction() as tx:
-            # Create GapSuggestion node
-            tx.run(
-                """
-                CREATE (g:GapSuggestion {
-                    id: $id,
-                    suggestion_text: $text,
-                    target_node_id: $target_node_id,
-                    target_file_id: $target_file_id,
-                    similarity_score: $similarity,
-                    created_at: datetime(),
-                    suggestion_type: "resource_recommendation"
-                })
-                """,
-                id=gap_id,
-                text=gap.SuggestionText,
-                target_node_id=gap.TargetNodeId,
-                target_file_id=gap.TargetFileId,
-                similarity=gap.SimilarityScore
-            )
-            
-            # Link to target KnowledgeNode
-            tx.run(
-                """
-                MATCH (n:KnowledgeNode {id: $node_id})
-                MATCH (g:GapSuggestion {id: $gap_id})
-                MERGE (n)-[:HAS_SUGGESTION {type: "resource"}]->(g)
-                """,
-                node_id=target_node_id,
-                gap_id=gap_id
-            )
-        
+        # Same statement as the batch path (one row), so the cached plan is shared
+        create_gap_suggestion_nodes(session, [{
+            'id': gap_id,
+            'text': gap.SuggestionText,
+            'node_id': target_node_id,
+            'target_node_id': gap.TargetNodeId,
+            'target_file_id': gap.TargetFileId,
+            'similarity': gap.SimilarityScore
+        }])
         return gap_id
         
     except Exception as e:
@@ -57,6 +55,105 @@ def create_gap_suggestion_node(session, gap: GapSuggestion, target_node_id: str)
         raise
 
 
+# Leaf filter and projection shared by the workspace-wide and the scoped scan
+_LEAF_NODES_TAIL = """
+AND NOT (n)-[:HAS_SUBCATEGORY|CONTAINS_CONCEPT|HAS_DETAIL]->(:KnowledgeNode)
+AND NOT (n)-[:HAS_SUGGESTION]->(:GapSuggestion)
+AND (n)-[:HAS_EVIDENCE]->(:Evidence)
+AND size(n.synthesis) > 30
+RETURN n.id as id,
+       n.name as name,
+       n.synthesis as synthesis,
+       n.type as type,
+       n.level as level,
+       n.source_count as source_count,
+       n.created_at as created_at
+ORDER BY n.level DESC, n.source_count DESC
+LIMIT $limit
+"""
+
+IDENTIFY_LEAF_NODES = """
+MATCH (n:KnowledgeNode)
+WHERE n.workspace_id = $ws""" + _LEAF_NODES_TAIL
+
+# Scoped to the nodes one run touched: ids are seeked through the kn_id
+# constraint index instead of walking every node of the workspace
+IDENTIFY_LEAF_NODES_AMONG = """
+MATCH (n:KnowledgeNode)
+WHERE n.id IN $node_ids AND n.workspace_id = $ws""" + _LEAF_NODES_TAIL
+
+
+CROSS_DOMAIN_PAIRS = """
+MATCH (n1:KnowledgeNode {workspace_id: $ws})
+MATCH (n2:KnowledgeNode {workspace_id: $ws})
+WHERE n1.id < n2.id
+AND n1.level <= 2 AND n2.level <= 2  // Higher level concepts
+AND NOT (n1)-[:RELATED_TO]-(n2)
+WITH n1, n2,
+     reduce(score = 0.0, word IN split(toLower(n1.name), ' ') | 
+         score + CASE WHEN word IN split(toLower(n2.name), ' ') THEN 1.0 ELSE 0.0 END
+     ) as name_similarity
+WHERE name_similarity = 0  // Different domains
+RETURN n1.id as id1, n1.name as name1, 
+       n2.id as id2, n2.name as name2,
+       name_similarity
+ORDER BY n1.evidence_count + n2.evidence_count DESC
+LIMIT 5
+"""
+
+RESOURCE_DISCOVERY_STATS = """
+MATCH (n:KnowledgeNode {workspace_id: $ws})-[:HAS_SUGGESTION]->(g:GapSuggestion)
+WHERE g.suggestion_type = "resource_recommendation"
+RETURN count(g) as total_suggestions,
+       count(DISTINCT n) as nodes_with_suggestions,
+       avg(g.similarity_score) as avg_relevance
+"""
+
+
+def identify_leaf_nodes(
+    session,
+    workspace_id: str,
+    limit: int = 15,
+    node_ids: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Leaf nodes without suggestions, read in a retryable transaction function
+    
+    Transient errors (leader switch, timeouts) are retried by the driver;
+    anything else propagates to the caller instead of returning an empty list.
+    With node_ids, only those nodes are considered (one run's nodes) instead
+    of the whole workspace.
+    """
+    if node_ids is not None:
+        query, extra = IDENTIFY_LEAF_NODES_AMONG, {'node_ids': list(dict.fromkeys(node_ids))}
+    else:
+        query, extra = IDENTIFY_LEAF_NODES, {}
+    
+    def read_leaf_nodes(tx) -> List[Dict[str, Any]]:
+        return [dict(r) for r in tx.run(query, **extra, ws=workspace_id, limit=limit)]
+    
+    return session.execute_read(read_leaf_nodes)
+
+
+def create_gap_suggestion_nodes(session, gap_rows: List[Dict[str, Any]]) -> int:
+    """
+    Create many GapSuggestion nodes and their links in one UNWIND query
+    
+    Args:
+        session: Neo4j session
+        gap_rows: Dicts with id, text, node_id, target_node_id, target_file_id, similarity
+    
+    Returns:
+        Number of suggestions written
+    """
+    if not gap_rows:
+        return 0
+    session.execute_write(
+        lambda tx: tx.run(CREATE_RESOURCE_SUGGESTIONS_BATCH, rows=gap_rows).consume()
+    )
+    return len(gap_rows)
+
+
 def validate_academic_url(url: str) -> bool:
     """Validate if URL looks like a legitimate academic source"""
     if not url.startswith(('http://', 'https://')):
@@ -138,36 +235,16 @@ def generate_research_queries(node_name: str, synthesis: str) -> List[str]:
     return queries[:5]  # Return top 5 queries
 
 
-def call_hyperclova_for_resource_suggestions(
-    node_name: str,
-    synthesis: str,
-    max_tokens: int,
-    api_key: str,
-    api_url: str
-) -> List[Dict[str, str]]:
-    """
-    Use HyperCLOVA to suggest relevant academic resources based on knowledge
-    
-    STRATEGY: Ask LLM to recommend specific paper types/topics based on the node content
-    rather than hallucinating fake URLs.
-    """
-    
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'X-NCP-CLOVASTUDIO-REQUEST-ID': str(uuid.uuid4()),
-        'Content-Type': 'application/json; charset=utf-8'
-    }
-    
-    # Generate search queries for better context
-    search_queries = generate_research_queries(node_name, synthesis)
-    
-    prompt = f"""Based on this knowledge node, recommend specific academic resources:
+# Prompt text is built once at import; each request only fills the node fields
+RESOURCE_SYSTEM_MESSAGE = 'You are an academic research assistant. Recommend specific, actionable resources. Return valid JSON only.'
+
+RESOURCE_PROMPT_TEMPLATE = """Based on this knowledge node, recommend specific academic resources:
 
 NODE: {node_name}
-DESCRIPTION: {synthesis[:500]}
+DESCRIPTION: {description}
 
 SEARCH QUERIES to find relevant papers:
-{chr(10).join(f"- {q}" for q in search_queries)}
+{search_queries}
 
 Recommend 2-3 SPECIFIC types of academic resources that would be most relevant.
 For each, provide:
@@ -187,11 +264,35 @@ Return JSON:
   ]
 }}"""
 
+
+def _build_resource_request(
+    node_name: str,
+    synthesis: str,
+    max_tokens: int,
+    api_key: str
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Headers and payload for one resource-suggestion request"""
+    
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'X-NCP-CLOVASTUDIO-REQUEST-ID': str(uuid.uuid4()),
+        'Content-Type': 'application/json; charset=utf-8'
+    }
+    
+    # Generate search queries for better context
+    search_queries = generate_research_queries(node_name, synthesis)
+    
+    prompt = RESOURCE_PROMPT_TEMPLATE.format(
+        node_name=node_name,
+        description=synthesis[:500],
+        search_queries="\n".join(f"- {q}" for q in search_queries)
+    )
+
     payload = {
         'messages': [
             {
                 'role': 'system',
-                'content': 'You are an academic research assistant. Recommend specific, actionable resources. Return valid JSON only.'
+                'content': RESOURCE_SYSTEM_MESSAGE
             },
             {
                 'role': 'user',
@@ -202,19 +303,77 @@ Return JSON:
         'temperature': 0.3,
         'topP': 0.8
     }
+    return headers, payload
+
+
+def _parse_resource_response(data: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Extract the resources list from a CLOVA chat completion body"""
+    content = data.get('result', {}).get('message', {}).get('content', '')
+    
+    # Extract JSON from response
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if json_match:
+        result = json.loads(json_match.group())
+        return result.get('resources', [])
+    
+    return []
+
+
+def call_hyperclova_for_resource_suggestions(
+    node_name: str,
+    synthesis: str,
+    max_tokens: int,
+    api_key: str,
+    api_url: str
+) -> List[Dict[str, str]]:
+    """
+    Use HyperCLOVA to suggest relevant academic resources based on knowledge
+    
+    STRATEGY: Ask LLM to recommend specific paper types/topics based on the node content
+    rather than hallucinating fake URLs.
+    """
+    headers, payload = _build_resource_request(node_name, synthesis, max_tokens, api_key)
     
     try:
+        clova_rate_limiter.acquire()
         response = requests.post(api_url, headers=headers, json=payload, timeout=60)
         response.raise_for_status()
+        return _parse_resource_response(response.json())
         
-        data = response.json()
-        content = data.get('result', {}).get('message', {}).get('content', '')
-        
-        # Extract JSON from response
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group())
-            return result.get('resources', [])
+    except Exception as e:
+        print(f"  ⚠️  HyperCLOVA API error: {e}")
+        return []
+
+
+async def call_hyperclova_for_resource_suggestions_async(
+    client: httpx.AsyncClient,
+    node_name: str,
+    synthesis: str,
+    max_tokens: int,
+    api_key: str,
+    api_url: str
+) -> List[Dict[str, str]]:
+    """
+    Async variant of call_hyperclova_for_resource_suggestions on a shared client
+    
+    Rate-limited (429) responses are retried with exponential backoff, so
+    concurrent calls back off even when CLOVA_REQUESTS_PER_MINUTE is unset.
+    """
+    headers, payload = _build_resource_request(node_name, synthesis, max_tokens, api_key)
+    
+    try:
+        for attempt in range(MAX_RETRY_ATTEMPTS):
+            await clova_rate_limiter.acquire_async()
+            response = await client.post(api_url, headers=headers, json=payload)
+            
+            if response.status_code == 429 and attempt < MAX_RETRY_ATTEMPTS - 1:
+                wait_time = RETRY_INITIAL_DELAY * (RETRY_BACKOFF_FACTOR ** attempt)
+                print(f"  ⚠️  Rate limited, waiting {wait_time}s (attempt {attempt + 1})")
+                await asyncio.sleep(wait_time)
+                continue
+            
+            response.raise_for_status()
+            return _parse_resource_response(response.json())
         
         return []
         
@@ -223,11 +382,42 @@ Return JSON:
         return []
 
 
+async def suggest_resources_for_nodes(
+    nodes: List[Dict[str, Any]],
+    api_key: str,
+    api_url: str,
+    max_tokens: int = 1200,
+    max_concurrency: int = LLM_MAX_CONCURRENCY
+) -> List[List[Dict[str, str]]]:
+    """
+    Fetch resource suggestions for many nodes concurrently
+    
+    The semaphore replaces the fixed per-call sleep: at most max_concurrency
+    requests are in flight at once. Requests are paced by clova_rate_limiter
+    when CLOVA_REQUESTS_PER_MINUTE is set, and 429s back off and retry while
+    still holding their slot, which slows the whole batch down.
+    
+    Returns:
+        One resources list per node, in input order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async with httpx.AsyncClient(timeout=60) as client:
+        async def one(node: Dict[str, Any]) -> List[Dict[str, str]]:
+            async with semaphore:
+                return await call_hyperclova_for_resource_suggestions_async(
+                    client, node['name'], node['synthesis'], max_tokens, api_key, api_url
+                )
+        
+        return await asyncio.gather(*(one(node) for node in nodes))
+
+
 def discover_resources_via_knowledge_analysis(
     session,
     workspace_id: str,
     clova_api_key: str,
-    clova_api_url: str
+    clova_api_url: str,
+    node_ids: Optional[List[str]] = None
 ) -> int:
     """
     Practical resource discovery using knowledge graph analysis
@@ -237,13 +427,17 @@ def discover_resources_via_knowledge_analysis(
     - Find leaf nodes (no outgoing HAS_SUBCATEGORY, CONTAINS_CONCEPT, HAS_DETAIL relationships)
     - Ensure nodes don't have existing GapSuggestions
     - Generate specific search recommendations for each leaf node
-    - Create one GapSuggestion per leaf node
+    - Only consider leaf nodes grounded by at least one Evidence from the PDFs;
+      unsupported nodes would only get an unlinked, low-value suggestion
+    - Create one GapSuggestion per leaf node, written in a single UNWIND flush
     
     Args:
         session: Neo4j session
         workspace_id: Workspace ID
         clova_api_key: CLOVA API key
         clova_api_url: CLOVA API URL
+        node_ids: Restrict the leaf scan to these nodes (e.g. the ones this
+            PDF created or merged into); None scans the whole workspace
     
     Returns:
         Number of suggestions created
@@ -252,26 +446,7 @@ def discover_resources_via_knowledge_analysis(
     print(f"\n🔍 Phase 7: Analyzing leaf nodes for resource discovery...")
     
     # Find leaf nodes (nodes without children relationships) that don't have existing GapSuggestions
-    result = session.run(
-        """
-        MATCH (n:KnowledgeNode {workspace_id: $ws})
-        WHERE NOT (n)-[:HAS_SUBCATEGORY|CONTAINS_CONCEPT|HAS_DETAIL]->(:KnowledgeNode)
-        AND NOT (n)-[:HAS_SUGGESTION]->(:GapSuggestion)
-        AND size(n.synthesis) > 30
-        RETURN n.id as id, 
-               n.name as name, 
-               n.synthesis as synthesis,
-               n.type as type,
-               n.level as level,
-               n.source_count as source_count,
-               n.created_at as created_at
-        ORDER BY n.level DESC, n.source_count DESC
-        LIMIT 15
-        """,
-        ws=workspace_id
-    )
-    
-    leaf_nodes = [dict(r) for r in result]
+    leaf_nodes = identify_leaf_nodes(session, workspace_id, node_ids=node_ids)
     
     if not leaf_nodes:
         print("  ℹ️  No suitable leaf nodes found for resource analysis")
@@ -279,27 +454,27 @@ def discover_resources_via_knowledge_analysis(
     
     print(f"  📊 Found {len(leaf_nodes)} leaf nodes without suggestions")
     
-    suggestion_count = 0
+    gap_rows: List[Dict[str, Any]] = []
+    short_id = short_id_factory()
+    
+    # Get resource recommendations for all leaf nodes concurrently
+    try:
+        all_resources = asyncio.run(
+            suggest_resources_for_nodes(leaf_nodes, clova_api_key, clova_api_url)
+        )
+    except Exception as e:
+        print(f"❌ Resource suggestion requests failed: {e}")
+        return 0
     
-    for node in leaf_nodes:
+    for node, resources in zip(leaf_nodes, all_resources):
         node_id = node['id']
         node_name = node['name']
-        synthesis = node['synthesis']
         node_type = node['type']
         level = node['level']
         
-        print(f"  🔍 Analyzing {node_type} leaf node (level {level}): {node_name}")
+        print(f"  🔍 Analyzed {node_type} leaf node (level {level}): {node_name}")
         
         try:
-            # Get resource recommendations from LLM
-            resources = call_hyperclova_for_resource_suggestions(
-                node_name=node_name,
-                synthesis=synthesis,
-                max_tokens=1200,
-                api_key=clova_api_key,
-                api_url=clova_api_url
-            )
-            
             # Take only the first (most relevant) resource for this leaf node
             if resources:
                 resource = resources[0]
@@ -312,32 +487,32 @@ def discover_resources_via_knowledge_analysis(
                     suggested_queries = resource.get('suggested_queries', [])
                     search_context = f"Queries: {', '.join(suggested_queries[:2])}" if suggested_queries else "Check recent publications"
                     
-                    # Create GapSuggestion object
-                    gap_suggestion = GapSuggestion(
-                        Id=f"gap_{uuid.uuid4().hex[:8]}",
-                        SuggestionText=f"[{resource_type.upper()}] {description[:120]}",
-                        TargetNodeId=node_id,
-                        TargetFileId=f"search://{search_context}",
-                        SimilarityScore=float(relevance)
-                    )
-                    
-                    # Use the existing create_gap_suggestion_node function
-                    create_gap_suggestion_node(session, gap_suggestion, node_id)
-                    suggestion_count += 1
+                    # Queue the suggestion; all of them are written in one query below
+                    gap_rows.append({
+                        'id': short_id('gap'),
+                        'text': f"[{resource_type.upper()}] {description[:120]}",
+                        'node_id': node_id,
+                        'target_node_id': node_id,
+                        'target_file_id': f"search://{search_context}",
+                        'similarity': float(relevance)
+                    })
                     
-                    print(f"    ✓ Created suggestion for {node_type} leaf node: {node_name}")
+                    print(f"    ✓ Prepared suggestion for {node_type} leaf node: {node_name}")
                 else:
                     print(f"    ⚠️  No valid description for node {node_name}")
             else:
                 print(f"    ⚠️  No resources returned for node {node_name}")
             
-            # Rate limiting between API calls
-            time.sleep(1.5)
-            
         except Exception as e:
             print(f"    ❌ Failed to analyze leaf node {node_name}: {e}")
             continue
     
+    try:
+        suggestion_count = create_gap_suggestion_nodes(session, gap_rows)
+    except Exception as e:
+        print(f"❌ Failed to create gap suggestions: {e}")
+        suggestion_count = 0
+    
     print(f"✓ Created {suggestion_count} resource suggestions for leaf nodes")
     
     return suggestion_count
@@ -347,45 +522,31 @@ def suggest_cross_domain_resources(session, workspace_id: str) -> int:
     Identify potential interdisciplinary research opportunities
     """
     
-    result = session.run(
-        """
-        MATCH (n1:KnowledgeNode {workspace_id: $ws})
-        MATCH (n2:KnowledgeNode {workspace_id: $ws})
-        WHERE n1.id < n2.id
-        AND n1.level <= 2 AND n2.level <= 2  // Higher level concepts
-        AND NOT (n1)-[:RELATED_TO]-(n2)
-        WITH n1, n2,
-             reduce(score = 0.0, word IN split(toLower(n1.name), ' ') | 
-                 score + CASE WHEN word IN split(toLower(n2.name), ' ') THEN 1.0 ELSE 0.0 END
-             ) as name_similarity
-        WHERE name_similarity = 0  // Different domains
-        RETURN n1.id as id1, n1.name as name1, 
-               n2.id as id2, n2.name as name2,
-               name_similarity
-        ORDER BY n1.evidence_count + n2.evidence_count DESC
-        LIMIT 5
-        """,
-        ws=workspace_id
-    )
+    result = session.run(CROSS_DOMAIN_PAIRS, ws=workspace_id)
     
     cross_domain_pairs = [dict(r) for r in result]
-    suggestions_created = 0
-    
-    for pair in cross_domain_pairs:
-        # Create suggestion for interdisciplinary research
-        gap = GapSuggestion(
-            SuggestionText=f"Interdisciplinary research: {pair['name1']} + {pair['name2']}",
-            TargetNodeId=pair['id1'],
-            TargetFileId="search://interdisciplinary applications",
-            SimilarityScore=0.6
-        )
-        
-        try:
-            create_gap_suggestion_node(session, gap, pair['id1'])
-            suggestions_created += 1
+    
+    # Interdisciplinary suggestions for all pairs, written in one UNWIND query
+    short_id = short_id_factory()
+    gap_rows = [
+        {
+            'id': short_id('gap'),
+            'text': f"Interdisciplinary research: {pair['name1']} + {pair['name2']}",
+            'node_id': pair['id1'],
+            'target_node_id': pair['id1'],
+            'target_file_id': "search://interdisciplinary applications",
+            'similarity': 0.6
+        }
+        for pair in cross_domain_pairs
+    ]
+    
+    try:
+        suggestions_created = create_gap_suggestion_nodes(session, gap_rows)
+        for pair in cross_domain_pairs:
             print(f"    🌉 Suggested interdisciplinary: {pair['name1']} + {pair['name2']}")
-        except Exception as e:
-            print(f"    ⚠️  Failed to create cross-domain suggestion: {e}")
+    except Exception as e:
+        print(f"    ⚠️  Failed to create cross-domain suggestions: {e}")
+        suggestions_created = 0
     
     return suggestions_created
 
@@ -393,16 +554,7 @@ def suggest_cross_domain_resources(session, workspace_id: str) -> int:
 def get_resource_discovery_stats(session, workspace_id: str) -> Dict[str, Any]:
     """Get statistics about resource discovery suggestions"""
     
-    result = session.run(
-        """
-        MATCH (n:KnowledgeNode {workspace_id: $ws})-[:HAS_SUGGESTION]->(g:GapSuggestion)
-        WHERE g.suggestion_type = "resource_recommendation"
-        RETURN count(g) as total_suggestions,
-               count(DISTINCT n) as nodes_with_suggestions,
-               avg(g.similarity_score) as avg_relevance
-        """,
-        ws=workspace_id
-    )
+    result = session.run(RESOURCE_DISCOVERY_STATS, ws=workspace_id)
     
     record = result.single()
     if record:
@@ -7,12 +7,19 @@ It integrates with the existing worker.py infrastructure.
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
-import uuid
 
 logger = logging.getLogger(__name__)
 
+# Scores given to every position-based node and evidence row
+NODE_CONFIDENCE = 0.90
+EVIDENCE_CONFIDENCE = 0.92
+EVIDENCE_STRENGTH = 0.90
+
+# Evidence text kept per position-based evidence row
+EVIDENCE_TEXT_LIMIT = 1500
+
 
 async def process_pdf_position_based(
     workspace_id: str,
@@ -46,12 +53,32 @@ async def process_pdf_position_based(
         Dict with processing results and statistics
     """
     from .pipeline.pdf_extraction import extract_pdf_as_paragraphs
-    from .pipeline.position_extraction import extract_content_from_positions
-    from .pipeline.llm_analysis import call_llm_sync, call_llm_async
+    from .pipeline.position_extraction import (
+        extract_content_from_positions,
+        estimate_paragraph_pages,
+        representative_sample
+    )
+    import httpx
+    from .config import CLOVA_API_TIMEOUT, LLM_MAX_CONCURRENCY
+    from .pipeline.llm_analysis import call_llm_async
     from .prompts.shallow_structure_extraction import create_shallow_structure_prompt
-    from .recursive_expander import RecursiveExpander, NodeData
+    from .recursive_expander import RecursiveExpander, NodeData, filter_valid_nodes
+    from .pipeline.neo4j_graph import short_id_factory
+    from .model.ShallowStructure import ShallowStructurePayload
+    from pydantic import ValidationError
     
     logger.info(f"📄 Processing PDF (position-based): {file_name}")
+    short_id = short_id_factory()
+    
+    # One pooled client for every LLM call of this PDF (shallow structure and
+    # all recursive expansions); the expander caps requests in flight
+    http_client = httpx.AsyncClient(
+        timeout=CLOVA_API_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONCURRENCY,
+            max_keepalive_connections=LLM_MAX_CONCURRENCY
+        )
+    )
     
     try:
         # ========================================
@@ -59,7 +86,10 @@ async def process_pdf_position_based(
         # ========================================
         logger.info("  [1/4] Extracting PDF as paragraphs...")
         
-        paragraphs, language, metadata = extract_pdf_as_paragraphs(
+        # Download + parse are blocking; run them off the event loop so other
+        # PDFs' LLM calls keep progressing meanwhile
+        paragraphs, language, metadata = await asyncio.to_thread(
+            extract_pdf_as_paragraphs,
             pdf_url=pdf_url,
             max_pages=25,
             timeout=30
@@ -68,6 +98,11 @@ async def process_pdf_position_based(
         if not paragraphs or len(paragraphs) < 10:
             raise ValueError(f"Insufficient paragraphs extracted: {len(paragraphs)}")
         
+        # Paragraph index -> page, computed once for every evidence row
+        paragraph_pages = estimate_paragraph_pages(
+            paragraphs, metadata.get('avg_text_per_page', 0)
+        )
+        
         logger.info(f"  ✓ Extracted {len(paragraphs)} paragraphs")
         logger.info(f"  ✓ Language: {language}, Total pages: {metadata.get('total_pages', 0)}")
         
@@ -76,8 +111,9 @@ async def process_pdf_position_based(
         # ========================================
         logger.info("  [2/4] Extracting shallow structure (Level 0 + Level 1)...")
         
-        # Prepare content context (first 6000 chars)
-        content_context = "\n\n".join(paragraphs[:50])  # First ~50 paragraphs
+        # Prepare content context: labeled start/middle/end windows instead of
+        # the first ~50 paragraphs (fewer prompt tokens, whole-document coverage)
+        content_context = representative_sample(paragraphs)
         
         # Create prompt
         prompt_data = create_shallow_structure_prompt(
@@ -87,23 +123,28 @@ async def process_pdf_position_based(
             lang=language
         )
         
-        # Call LLM
-        shallow_result = call_llm_sync(
+        # Call LLM (awaited on the loop rather than blocking it with a sync request)
+        shallow_result = await call_llm_async(
             prompt=prompt_data['prompt'],
             system_message=prompt_data['system_message'],
             max_tokens=2500,
             clova_api_key=clova_api_key,
-            clova_api_url=clova_api_url
+            clova_api_url=clova_api_url,
+            http_client=http_client
         )
         
         if not shallow_result or 'hierarchy' not in shallow_result:
             raise ValueError("LLM failed to return valid shallow structure")
         
-        hierarchy = shallow_result['hierarchy']
-        level_0_data = hierarchy.get('level_0', {})
-        level_1_nodes = hierarchy.get('level_1_nodes', [])
+        # Validate the whole payload once instead of per-field dict lookups
+        try:
+            hierarchy = ShallowStructurePayload.model_validate(shallow_result).hierarchy
+        except ValidationError as e:
+            raise ValueError(f"LLM returned malformed shallow structure: {e}") from e
+        level_0_data = hierarchy.level_0
+        level_1_nodes = hierarchy.level_1_nodes
         
-        logger.info(f"  ✓ Extracted domain: {level_0_data.get('name', 'Unknown')}")
+        logger.info(f"  ✓ Extracted domain: {level_0_data.name or 'Unknown'}")
         logger.info(f"  ✓ Extracted {len(level_1_nodes)} Level 1 categories")
         
         # ========================================
@@ -113,12 +154,12 @@ async def process_pdf_position_based(
         
         # Create root domain node
         root_node = NodeData(
-            id=f"domain-{uuid.uuid4().hex[:8]}",
-            name=level_0_data.get('name', f"Knowledge from {file_name}"),
-            synthesis=level_0_data.get('synthesis', ''),
+            id=short_id('domain'),
+            name=level_0_data.name or f"Knowledge from {file_name}",
+            synthesis=level_0_data.synthesis,
             level=0,
             type='domain',
-            evidence_positions=level_0_data.get('evidence_positions', [[0, min(50, len(paragraphs) - 1)]]),
+            evidence_positions=level_0_data.evidence_positions or [[0, min(50, len(paragraphs) - 1)]],
             parent_range=None
         )
         
@@ -134,14 +175,14 @@ async def process_pdf_position_based(
         # Create Level 1 category nodes
         for idx, cat_data in enumerate(level_1_nodes):
             cat_node = NodeData(
-                id=f"category-{uuid.uuid4().hex[:8]}",
-                name=cat_data.get('name', f"Category {idx + 1}"),
-                synthesis=cat_data.get('synthesis', ''),
+                id=short_id('category'),
+                name=cat_data.name or f"Category {idx + 1}",
+                synthesis=cat_data.synthesis,
                 level=1,
                 type='category',
-                evidence_positions=cat_data.get('evidence_positions', []),
-                key_claims_positions=cat_data.get('key_claims_positions', []),
-                questions_positions=cat_data.get('questions_positions', []),
+                evidence_positions=cat_data.evidence_positions,
+                key_claims_positions=cat_data.key_claims_positions,
+                questions_positions=cat_data.questions_positions,
                 parent_id=root_node.id,
                 parent_range=None
             )
@@ -181,15 +222,15 @@ async def process_pdf_position_based(
             
             # Create async LLM caller wrapper
             async def llm_caller_wrapper(prompt: str, system_message: str, max_tokens: int):
-                """Wrapper for async LLM calls"""
-                result = await call_llm_async(
+                """Wrapper for async LLM calls on the shared client"""
+                return await call_llm_async(
                     prompt=prompt,
                     system_message=system_message,
                     max_tokens=max_tokens,
                     clova_api_key=clova_api_key,
-                    clova_api_url=clova_api_url
+                    clova_api_url=clova_api_url,
+                    http_client=http_client
                 )
-                return result
             
             # Create expander
             expander = RecursiveExpander(
@@ -197,7 +238,9 @@ async def process_pdf_position_based(
                 llm_caller=llm_caller_wrapper,
                 max_depth=max_depth,
                 children_per_level=3,
-                min_content_length=500
+                min_content_length=500,
+                max_concurrency=LLM_MAX_CONCURRENCY,
+                subtree_levels=2
             )
             
             # Expand each Level 1 category in parallel
@@ -232,6 +275,12 @@ async def process_pdf_position_based(
         else:
             all_nodes = [root_node] + root_node.children
         
+        # Quality gate before anything reaches Neo4j
+        extracted_count = len(all_nodes)
+        all_nodes = filter_valid_nodes(all_nodes)
+        if len(all_nodes) < extracted_count:
+            logger.info(f"  ✓ Filtered {extracted_count - len(all_nodes)} low-quality nodes")
+        
         logger.info(f"  ✅ Processing complete: {len(all_nodes)} total nodes")
         
         return {
@@ -240,6 +289,7 @@ async def process_pdf_position_based(
             "pdf_url": pdf_url,
             "language": language,
             "paragraphs_extracted": len(paragraphs),
+            "paragraph_pages": paragraph_pages,
             "nodes_created": len(all_nodes),
             "root_node": root_node,
             "all_nodes": all_nodes,
@@ -256,6 +306,8 @@ async def process_pdf_position_based(
             "pdf_url": pdf_url,
             "error": str(e)
         }
+    finally:
+        await http_client.aclose()
 
 
 def integrate_position_based_nodes_to_neo4j(
@@ -263,12 +315,17 @@ def integrate_position_based_nodes_to_neo4j(
     workspace_id: str,
     neo4j_session,
     file_name: str,
-    pdf_url: str
+    pdf_url: str,
+    paragraph_pages: Optional[List[int]] = None,
+    language: str = "en"
 ):
     """
     Insert position-based nodes into Neo4j
     
     This function creates nodes with position metadata for traceability.
+    Nodes, hierarchy relationships and evidence are collected first and then
+    written with UNWIND batches inside one write transaction, so the whole tree
+    costs a handful of round trips and a single commit.
     
     Args:
         nodes: List of NodeData objects
@@ -276,72 +333,169 @@ def integrate_position_based_nodes_to_neo4j(
         neo4j_session: Neo4j session
         file_name: Source file name
         pdf_url: Source PDF URL
+        paragraph_pages: Page per paragraph index (from process_pdf_position_based);
+            evidence pages fall back to the paragraph index when omitted
+        language: Detected document language (from process_pdf_position_based)
     
     Returns:
         Statistics about nodes created
     """
-    from .model.KnowledgeNode import KnowledgeNode
-    from .model.Evidence import Evidence
+    from .pipeline.neo4j_graph import (
+        short_id_factory,
+        normalize_name,
+        relationship_type_for_levels,
+        run_in_batches,
+        CREATE_KNOWLEDGE_NODES_BATCH,
+        CREATE_EVIDENCE_BATCH,
+        PARENT_CHILD_BATCH_QUERIES
+    )
     
     logger.info(f"  Inserting {len(nodes)} nodes into Neo4j...")
     
-    nodes_created = 0
-    evidences_created = 0
+    now = datetime.now(timezone.utc).isoformat()
+    short_id = short_id_factory()
+    levels = {node.id: node.level for node in nodes}
     
-    # Import the Neo4j creation functions from worker.py
-    # For now, this is a placeholder showing the integration points
+    # Node and evidence counts are known up front, so both row lists are
+    # allocated once and filled by index instead of grown by append. Rows use
+    # the snake_case properties the main pipeline's batch queries store.
+    node_rows = [None] * len(nodes)
+    relationship_rows: Dict[str, List[Dict[str, str]]] = {
+        relationship_type: [] for relationship_type in PARENT_CHILD_BATCH_QUERIES
+    }
+    evidence_rows = [None] * sum(len(node.evidence_content) for node in nodes)
+    evidence_idx = 0
     
-    for node in nodes:
-        # Create KnowledgeNode
-        knowledge_node = KnowledgeNode(
-            Id=node.id,
-            Type=node.type,
-            Name=node.name,
-            Synthesis=node.synthesis,
-            WorkspaceId=workspace_id,
-            Level=node.level,
-            SourceCount=1,
-            TotalConfidence=0.90,
-            CreatedAt=datetime.now(timezone.utc),
-            UpdatedAt=datetime.now(timezone.utc)
-        )
+    # Same for every evidence row, so resolved once
+    lang_code = "KOR" if language == "ko" else "ENG"
+    # Parents and children often cite the same paragraph range; each range's
+    # text is truncated once and shared by every evidence row that cites it
+    evidence_texts: Dict[Tuple[int, int], str] = {}
+    
+    for node_idx, node in enumerate(nodes):
+        node_rows[node_idx] = {
+            'id': node.id,
+            'type': node.type,
+            'name': node.name,
+            'name_lower': normalize_name(node.name),
+            'synthesis': node.synthesis,
+            'workspace_id': workspace_id,
+            'level': node.level,
+            'source_count': 1,
+            'total_confidence': NODE_CONFIDENCE,
+            'created_at': now,
+            'updated_at': now,
+            'embedding': []
+        }
         
-        # Insert node (would use create_knowledge_node from worker.py)
-        # create_knowledge_node(neo4j_session, knowledge_node)
-        nodes_created += 1
+        if node.parent_id:
+            parent_level = levels.get(node.parent_id, node.level - 1)
+            relationship_rows[relationship_type_for_levels(parent_level, node.level)].append(
+                {'parent_id': node.parent_id, 'child_id': node.id}
+            )
         
-        # Create evidence with position metadata
+        # Evidence with position metadata
+        # NodeData always carries lists here, so no presence/type guards
+        key_claims = [c['text'] for c in node.key_claims_content]
+        questions = [q['text'] for q in node.questions_content]
         for evidence_item in node.evidence_content:
-            evidence = Evidence(
-                Id=f"evidence-{uuid.uuid4().hex[:8]}",
-                SourceId=pdf_url,
-                SourceName=file_name,
-                ChunkId=f"para-{evidence_item['position_range'][0]}-{evidence_item['position_range'][1]}",
-                Text=evidence_item['text'][:1500],
-                Page=evidence_item['position_range'][0] + 1,  # Approximate page
-                Confidence=0.92,
-                CreatedAt=datetime.now(timezone.utc),
-                Language="ENG",
-                SourceLanguage="ENG",
-                HierarchyPath=node.name,
-                Concepts=[node.name],
-                KeyClaims=[c['text'] for c in node.key_claims_content] if node.key_claims_content else [],
-                QuestionsRaised=[q['text'] for q in node.questions_content] if node.questions_content else [],
-                EvidenceStrength=0.90,
+            start_pos, end_pos = evidence_item['position_range'][0], evidence_item['position_range'][1]
+            text = evidence_texts.get((start_pos, end_pos))
+            if text is None:
+                text = evidence_texts[(start_pos, end_pos)] = evidence_item['text'][:EVIDENCE_TEXT_LIMIT]
+            if paragraph_pages and 0 <= start_pos < len(paragraph_pages):
+                page = paragraph_pages[start_pos]
+            else:
+                page = start_pos + 1  # Approximate page
+            evidence_rows[evidence_idx] = {
+                'node_id': node.id,
+                'id': short_id('evidence'),
+                'source_id': pdf_url,
+                'source_name': file_name,
+                'chunk_id': f"para-{start_pos}-{end_pos}",
+                'text': text,
+                'text_len': len(text),
+                'page': page,
+                'confidence': EVIDENCE_CONFIDENCE,
+                'created_at': now,
+                'language': lang_code,
+                'source_language': lang_code,
+                'hierarchy_path': node.name,
+                'concepts': [node.name],
+                'key_claims': key_claims,
+                'questions_raised': questions,
+                'evidence_strength': EVIDENCE_STRENGTH,
                 # POSITION METADATA (NEW)
-                StartPos=evidence_item['position_range'][0],
-                EndPos=evidence_item['position_range'][1],
-                ChunkIndex=evidence_item['position_range'][0],
-                HasMore=True
-            )
-            
-            # Insert evidence (would use create_evidence_node from worker.py)
-            # create_evidence_node(neo4j_session, evidence, node.id)
-            evidences_created += 1
+                'start_pos': start_pos,
+                'end_pos': end_pos
+            }
+            evidence_idx += 1
     
-    logger.info(f"  ✓ Created {nodes_created} nodes and {evidences_created} evidence items")
+    def write_tree(tx):
+        # Nodes first so the relationship and evidence MATCHes find them
+        run_in_batches(tx, CREATE_KNOWLEDGE_NODES_BATCH, node_rows)
+        for relationship_type, rows in relationship_rows.items():
+            run_in_batches(tx, PARENT_CHILD_BATCH_QUERIES[relationship_type], rows)
+        return run_in_batches(tx, CREATE_EVIDENCE_BATCH, evidence_rows)
+    
+    evidences_created = neo4j_session.execute_write(write_tree)
+    nodes_created = len(node_rows)
+    relationships_created = sum(len(rows) for rows in relationship_rows.values())
+    
+    logger.info(
+        f"  ✓ Created {nodes_created} nodes, {relationships_created} relationships "
+        f"and {evidences_created} evidence items"
+    )
     
     return {
         "nodes_created": nodes_created,
+        "relationships_created": relationships_created,
         "evidences_created": evidences_created
     }
+
+
+async def integrate_position_based_nodes_to_neo4j_async(
+    nodes: List,
+    workspace_id: str,
+    neo4j_driver,
+    file_name: str,
+    pdf_url: str,
+    paragraph_pages: Optional[List[int]] = None,
+    language: str = "en"
+):
+    """
+    Async wrapper around integrate_position_based_nodes_to_neo4j
+    
+    The sync driver's session.run/execute_write block, so the whole write
+    transaction runs in a worker thread with its own session from the shared
+    driver pool. The event loop stays free for other PDFs' LLM calls while
+    the tree is being committed.
+    
+    Args:
+        nodes: List of NodeData objects
+        workspace_id: Workspace ID
+        neo4j_driver: Shared (sync) Neo4j driver
+        file_name: Source file name
+        pdf_url: Source PDF URL
+        paragraph_pages: Page per paragraph index (from process_pdf_position_based)
+        language: Detected document language (from process_pdf_position_based)
+    
+    Returns:
+        Statistics about nodes created
+    """
+    from neo4j import WRITE_ACCESS
+    from .config import NEO4J_DATABASE
+    
+    def write():
+        with neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=WRITE_ACCESS) as session:
+            return integrate_position_based_nodes_to_neo4j(
+                nodes,
+                workspace_id,
+                session,
+                file_name,
+                pdf_url,
+                paragraph_pages=paragraph_pages,
+                language=language
+            )
+    
+    return await asyncio.to_thread(write)
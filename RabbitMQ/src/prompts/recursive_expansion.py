@@ -224,13 +224,29 @@ VALIDATION CHECKLIST:
 Return ONLY the JSON object. NO explanations, NO markdown, JUST JSON."""
 
 
+# Appended when one call should return two levels (children + grandchildren)
+SUBTREE_EXPANSION_ADDENDUM = """
+
+SUBTREE MODE (two levels in this response):
+For EACH child, also include a "children" array with {grandchildren_count} grandchildren (Level {grandchild_level}).
+- Grandchildren use the SAME fields as children: name, synthesis, evidence_positions,
+  key_claims, key_claims_positions, questions_raised, questions_positions
+- Grandchild positions are RELATIVE TO THIS SAME PARENT CONTENT [0, {parent_paragraph_count_minus_1}]
+  and must fall inside the evidence ranges of their own child
+- Synthesis lengths follow the Level {grandchild_level} guideline
+- If a child's content is too thin to split, return "children": [] for that child
+
+Return ONLY the JSON object. NO explanations, NO markdown, JUST JSON."""
+
+
 def create_recursive_expansion_prompt(
     parent_name: str,
     parent_synthesis: str,
     parent_content: str,
     current_level: int,
     target_level: int,
-    children_count: int = 3
+    children_count: int = 3,
+    grandchildren_count: int = 0
 ) -> dict:
     """
     Create prompt for recursive node expansion (LLM Call N)
@@ -242,6 +258,8 @@ def create_recursive_expansion_prompt(
         current_level: Current level (0, 1, 2, ...)
         target_level: Target level for children (current_level + 1)
         children_count: Number of children to create (default 3)
+        grandchildren_count: Grandchildren per child to return in the same
+            response (0 = children only)
     
     Returns:
         Dict with 'system_message' and 'prompt'
@@ -253,16 +271,25 @@ def create_recursive_expansion_prompt(
     parent_paragraphs = split_text_to_paragraphs(parent_content)
     parent_paragraph_count = len(parent_paragraphs)
     
-    return {
-        "system_message": RECURSIVE_EXPANSION_SYSTEM_MESSAGE,
-        "prompt": RECURSIVE_EXPANSION_PROMPT_TEMPLATE.format(
-            parent_name=parent_name,
-            parent_synthesis=parent_synthesis[:200],
-            parent_content=parent_content[:4000],
-            current_level=current_level,
-            target_level=target_level,
-            children_count=children_count,
-            parent_paragraph_count=parent_paragraph_count,
+    prompt = RECURSIVE_EXPANSION_PROMPT_TEMPLATE.format(
+        parent_name=parent_name,
+        parent_synthesis=parent_synthesis[:200],
+        parent_content=parent_content[:4000],
+        current_level=current_level,
+        target_level=target_level,
+        children_count=children_count,
+        parent_paragraph_count=parent_paragraph_count,
+        parent_paragraph_count_minus_1=parent_paragraph_count - 1
+    )
+    
+    if grandchildren_count > 0:
+        prompt += SUBTREE_EXPANSION_ADDENDUM.format(
+            grandchildren_count=grandchildren_count,
+            grandchild_level=target_level + 1,
             parent_paragraph_count_minus_1=parent_paragraph_count - 1
         )
+    
+    return {
+        "system_message": RECURSIVE_EXPANSION_SYSTEM_MESSAGE,
+        "prompt": prompt
     }
@@ -23,7 +23,7 @@ DOCUMENT: {file_name}
 LANGUAGE: {lang}
 PARAGRAPH COUNT: {paragraph_count}
 
-CONTENT (first 6000 chars for context):
+CONTENT (sample from start, middle and end; each paragraph is prefixed with its [index]):
 ---
 {content}
 ---
@@ -177,7 +177,7 @@ def create_shallow_structure_prompt(
     
     Args:
         file_name: Name of the PDF file
-        content: First ~6000 characters of content for context
+        content: Position-labeled content sample for context (capped at 6000 chars)
         paragraph_count: Total number of paragraphs in the document
         lang: Language code
     
@@ -2,6 +2,8 @@
 import pika
 import json
 import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Any, Optional, Union
 import pika
 from typing import Optional
@@ -69,24 +71,52 @@ class RabbitMQClient:
         )
         logger.info(f"Message published to {queue_name}: {message}")
 
-    def consume_messages(self, queue_name: str, callback: Callable[[dict], Any]):
-        """Lắng nghe queue và xử lý message"""
+    def consume_messages(self, queue_name: str, callback: Callable[[dict], Any], prefetch_count: int = 1):
+        """
+        Lắng nghe queue và xử lý message
+
+        Message được xử lý trên thread pool (prefetch_count thread), nên thread
+        I/O của pika vẫn gửi heartbeat trong lúc một job chạy nhiều phút, và tối
+        đa prefetch_count message chạy song song. Ack/nack được đẩy về thread
+        của connection bằng add_callback_threadsafe (channel không thread-safe).
+        """
         if not self.channel:
             raise RuntimeError("Channel not initialized. Call connect() first.")
 
-        def _callback(ch, method, properties, body):
+        prefetch_count = max(1, prefetch_count)
+        executor = ThreadPoolExecutor(max_workers=prefetch_count, thread_name_prefix="rabbitmq-job")
+
+        def _settle(delivery_tag: int, ok: bool):
+            if ok:
+                self.channel.basic_ack(delivery_tag=delivery_tag)
+            else:
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+
+        def _process(delivery_tag: int, body: bytes):
+            ok = True
             try:
                 message = json.loads(body)
                 callback(message)
-                ch.basic_ack(delivery_tag=method.delivery_tag)
             except Exception as e:
                 logger.exception(f"Failed to process message: {e}")
-                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+                ok = False
+            try:
+                self.connection.add_callback_threadsafe(functools.partial(_settle, delivery_tag, ok))
+            except Exception as e:
+                # Connection đã đóng: broker sẽ tự giao lại message chưa ack
+                logger.warning(f"Could not settle message {delivery_tag}: {e}")
 
-        self.channel.basic_qos(prefetch_count=1)
+        def _callback(ch, method, properties, body):
+            executor.submit(_process, method.delivery_tag, body)
+
+        self.channel.basic_qos(prefetch_count=prefetch_count)
         self.channel.basic_consume(queue=queue_name, on_message_callback=_callback)
-        logger.info(f"Start consuming messages from {queue_name}")
-        self.channel.start_consuming()
+        logger.info(f"Start consuming messages from {queue_name} (prefetch={prefetch_count})")
+        try:
+            self.channel.start_consuming()
+        finally:
+            # Message chưa bắt đầu xử lý sẽ được broker giao lại
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def close(self):
         """Đóng channel và connection"""
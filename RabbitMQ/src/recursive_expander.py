@@ -7,7 +7,10 @@ deep hierarchical knowledge graphs using position-based extraction.
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Callable, cast
+import re
+import uuid
+from itertools import compress
+from typing import Dict, List, Any, Optional, Callable, Tuple, cast
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
@@ -75,6 +78,99 @@ class NodeData:
         }
 
 
+# Minimum synthesis length per level (deeper levels default to 20 chars)
+MIN_SYNTHESIS_LENGTH = {
+    0: 50,   # domain
+    1: 40,   # category
+    2: 30,   # concept
+    3: 20,   # subconcept
+}
+
+# Generic/templated names the LLM emits when it runs out of real concepts;
+# one case-insensitive scan instead of lower() + a substring test per keyword.
+# Whole words only, so names like "Childhood Obesity" are not caught
+GENERIC_NAME_RE = re.compile(
+    r"\b(child|node|item|unknown|untitled)\b|concept 1|category 1",
+    re.IGNORECASE
+)
+
+
+def is_generic_name(name: str) -> bool:
+    """
+    True when the name is only a placeholder ("Child 1", "Untitled", "Node 3")
+    
+    A generic word inside a real multi-word name ("Graph Node Embeddings",
+    "Item Response Theory") does not count: after removing the matches, only
+    numbering and punctuation may remain.
+    """
+    if not GENERIC_NAME_RE.search(name):
+        return False
+    return not GENERIC_NAME_RE.sub('', name).strip(' \t0123456789#.:()_-')
+
+
+def is_valid_node(node: NodeData) -> bool:
+    """
+    Validate node quality before inserting to Neo4j
+    
+    Returns:
+        True if node meets quality standards, False otherwise
+    """
+    # Rule 1: Name must be meaningful (not generic)
+    if not node.name or len(node.name) < 3:
+        logger.info(f"  Filtered '{node.name}': name too short")
+        return False
+    
+    # Rule 2: Synthesis must have substance
+    required_length = MIN_SYNTHESIS_LENGTH.get(node.level, 20)
+    if not node.synthesis or len(node.synthesis) < required_length:
+        logger.info(f"  Filtered '{node.name}': synthesis too short ({len(node.synthesis or '')} < {required_length})")
+        return False
+    
+    # Rules 3-4: Must have evidence positions and extracted content (except root domain)
+    if node.level > 0 and not node.evidence_positions:
+        logger.info(f"  Filtered '{node.name}': no evidence positions")
+        return False
+    if node.level > 0 and not node.evidence_content:
+        logger.info(f"  Filtered '{node.name}': no evidence content extracted")
+        return False
+    
+    # Rule 5: Avoid generic/templated names
+    if is_generic_name(node.name):
+        logger.info(f"  Filtered '{node.name}': generic name")
+        return False
+    
+    return True
+
+
+def filter_valid_nodes(nodes: List[NodeData]) -> List[NodeData]:
+    """
+    Drop low-quality nodes together with their descendants
+    
+    Expects a pre-order list (as from get_all_nodes_flat) so a parent is
+    always decided before its children; the root (level 0) is always kept so
+    the tree keeps its anchor. Dropped nodes are also removed from their
+    parents' `children`, so walking the tree sees the same nodes as the list.
+    
+    Args:
+        nodes: Flattened tree, parents before children
+    
+    Returns:
+        Nodes that passed is_valid_node and whose ancestors all passed
+    """
+    dropped = set()
+    mask = []
+    for node in nodes:
+        keep = node.level == 0 or (node.parent_id not in dropped and is_valid_node(node))
+        if not keep:
+            dropped.add(node.id)
+        mask.append(keep)
+    kept = list(compress(nodes, mask))
+    if dropped:
+        for node in kept:
+            node.children = [child for child in node.children if child.id not in dropped]
+    return kept
+
+
 class RecursiveExpander:
     """
     Recursive expansion engine for building deep knowledge hierarchies
@@ -86,7 +182,9 @@ class RecursiveExpander:
         llm_caller: Callable,
         max_depth: int = 3,
         children_per_level: int = 3,
-        min_content_length: int = 500
+        min_content_length: int = 500,
+        max_concurrency: Optional[int] = None,
+        subtree_levels: int = 1
     ):
         """
         Initialize recursive expander
@@ -97,17 +195,28 @@ class RecursiveExpander:
             max_depth: Maximum depth to expand (0 = domain, 1 = category, 2 = concept, ...)
             children_per_level: Number of children per node (default 3)
             min_content_length: Minimum content length to continue expansion
+            max_concurrency: Max LLM calls in flight across all parallel branches
+                (None = unbounded, the caller throttles)
+            subtree_levels: Levels returned per LLM call (1 = children only,
+                2 = children and grandchildren in one structured response)
         """
         self.paragraphs = paragraphs
         self.llm_caller = llm_caller
         self.max_depth = max_depth
         self.children_per_level = children_per_level
         self.min_content_length = min_content_length
+        self._llm_semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.subtree_levels = max(1, min(subtree_levels, 2))
+        # Expansion calls of this run keyed by everything the prompt carries
+        # (parent name, synthesis, content, depth, levels): duplicate nodes
+        # share one LLM call instead of each paying for an identical expansion
+        self._expansion_calls: Dict[Tuple[str, str, str, int, bool], asyncio.Future] = {}
         
         # Statistics
         self.stats = {
             'total_nodes': 0,
             'llm_calls': 0,
+            'shared_expansions': 0,
             'expansions_stopped': 0,
             'errors': 0
         }
@@ -175,25 +284,28 @@ class RecursiveExpander:
             normalized_content = clean_for_llm(parent_content, max_length=4000)
             
             # Step 2: LLM Call - Extract children with relative positions
+            # Ask for two levels at once when the target depth allows it: one
+            # round trip instead of 1 + children_per_level dependent calls
+            two_levels = self.subtree_levels > 1 and current_depth + 2 <= target_depth
             prompt_data = create_recursive_expansion_prompt(
                 parent_name=node.name,
                 parent_synthesis=node.synthesis,
                 parent_content=normalized_content,
                 current_level=current_depth,
                 target_level=current_depth + 1,
-                children_count=self.children_per_level
+                children_count=self.children_per_level,
+                grandchildren_count=self.children_per_level if two_levels else 0
             )
             
             logger.debug(f"  Calling LLM to expand '{node.name}'...")
             
-            llm_result = await self.llm_caller(
+            llm_result = await self._call_llm_shared(
+                (node.name, node.synthesis, normalized_content, current_depth, two_levels),
                 prompt=prompt_data['prompt'],
                 system_message=prompt_data['system_message'],
-                max_tokens=2000
+                max_tokens=4000 if two_levels else 2000
             )
             
-            self.stats['llm_calls'] += 1
-            
             if not llm_result or not isinstance(llm_result, dict):
                 logger.warning(f"  Invalid LLM response for '{node.name}'")
                 self.stats['errors'] += 1
@@ -216,7 +328,6 @@ class RecursiveExpander:
             
             # Step 3: Create child nodes and convert positions
             parent_paragraphs = split_text_to_paragraphs(normalized_content)
-            parent_paragraph_count = len(parent_paragraphs)
             
             # Determine parent_range for children
             # If node has a parent_range, use the first evidence position's start
@@ -227,121 +338,56 @@ class RecursiveExpander:
                 child_parent_range = node.evidence_positions[0] if node.evidence_positions else [0, 0]
             
             for idx, child_data in enumerate(children_data):
-                # Extract actual text content from LLM (NEW)
-                child_key_claims_text = child_data.get('key_claims', [])  # List of actual claim texts
-                child_questions_text = child_data.get('questions_raised', [])  # List of actual question texts
-
-                # Validate and clamp positions
-                child_evidence_positions = child_data.get('evidence_positions', [])
-                child_claims_positions = child_data.get('key_claims_positions', [])
-                child_questions_positions = child_data.get('questions_positions', [])
-                
-                # Validate positions
-                is_valid, errors = validate_positions(
-                    child_evidence_positions + [[p, p] for p in child_claims_positions] + [[q, q] for q in child_questions_positions],
-                    parent_paragraph_count
-                )
-                
-                if not is_valid:
-                    logger.warning(f"  Invalid positions in child '{child_data.get('name', 'Unknown')}': {errors}")
-                    # Clamp to valid range
-                    child_evidence_positions = clamp_positions_to_range(child_evidence_positions, parent_paragraph_count)
-                    child_claims_positions = [max(0, min(p, parent_paragraph_count - 1)) for p in child_claims_positions]
-                    child_questions_positions = [max(0, min(q, parent_paragraph_count - 1)) for q in child_questions_positions]
-                
-                # Convert relative positions to absolute
-                abs_evidence_positions = convert_relative_to_absolute(
-                    child_evidence_positions,
-                    child_parent_range
-                )
-                
-                abs_claims_positions = convert_relative_to_absolute(
-                    [[pos] for pos in child_claims_positions],
-                    child_parent_range
-                )
-                
-                abs_questions_positions = convert_relative_to_absolute(
-                    [[q] for q in child_questions_positions],
-                    child_parent_range
+                child_node = self._build_child_node(
+                    child_data, idx, node, current_depth + 1,
+                    parent_paragraphs, child_parent_range
                 )
                 
-                # Determine child type based on level
-                child_type_map = {
-                    0: 'domain',
-                    1: 'category',
-                    2: 'concept',
-                    3: 'subconcept',
-                    4: 'detail'
-                }
-                child_type = child_type_map.get(current_depth + 1, 'detail')
-                
-                # Create deterministic ID using uuid
-                import uuid
-                node_name_hash = f"{child_data.get('name', f'child-{idx}')}-{node.id}-{idx}"
-                child_id = f"{child_type}-{uuid.uuid5(uuid.NAMESPACE_DNS, node_name_hash).hex[:8]}"
-                
-                # Create child node
-                child_node = NodeData(
-                    id=child_id,
-                    name=child_data.get('name', f'Child {idx + 1}'),
-                    synthesis=child_data.get('synthesis', ''),
-                    level=current_depth + 1,
-                    type=child_type,
-                    evidence_positions=[pos if isinstance(pos, list) else [pos] for pos in abs_evidence_positions],
-                    key_claims_positions=[pos[0] for pos in abs_claims_positions if isinstance(pos, list)],
-                    questions_positions=[pos[0] if isinstance(pos, list) else pos for pos in abs_questions_positions],
-                    parent_id=node.id,
-                    parent_range=child_parent_range,
-                    # ✅ NEW: Store actual text from LLM (higher quality)
-                    key_claims_text=child_key_claims_text if isinstance(child_key_claims_text, list) else [],
-                    questions_raised_text=child_questions_text if isinstance(child_questions_text, list) else []
-                )
-
-                # Extract child content immediately
-                child_evidence_content = extract_content_from_positions(
-                    child_evidence_positions,
-                    parent_paragraphs,
-                    parent_range=None  # Already relative
-                )
-                child_node.evidence_content = child_evidence_content
-
-                # Extract key claims (for backup/positions only - prefer key_claims_text)
-                if child_claims_positions:
-                    child_claims_content = extract_content_from_positions(
-                        [[p, p] for p in child_claims_positions],
-                        parent_paragraphs,
-                        parent_range=None
-                    )
-                    child_node.key_claims_content = child_claims_content
-
-                # Extract questions (for backup/positions only - prefer questions_raised_text)
-                if child_questions_positions:
-                    child_questions_content = extract_content_from_positions(
-                        [[q, q] for q in child_questions_positions],
-                        parent_paragraphs,
-                        parent_range=None
-                    )
-                    child_node.questions_content = child_questions_content
+                # Subtree mode: grandchildren came back in the same response,
+                # with positions relative to the same parent content
+                if self.subtree_levels > 1 and current_depth + 2 <= target_depth:
+                    for g_idx, grandchild_data in enumerate(child_data.get('children') or []):
+                        if isinstance(grandchild_data, dict):
+                            child_node.children.append(self._build_child_node(
+                                grandchild_data, g_idx, child_node, current_depth + 2,
+                                parent_paragraphs, child_parent_range
+                            ))
+                            self.stats['total_nodes'] += 1
                 
                 node.children.append(child_node)
                 self.stats['total_nodes'] += 1
                 
                 logger.debug(f"    ✓ Created child '{child_node.name}' (Level {child_node.level})")
             
-            # Step 4: Recursively expand all children in parallel
-            if current_depth + 1 < target_depth and node.children:
-                logger.info(f"  Expanding {len(node.children)} children of '{node.name}' in parallel...")
+            # Step 4: Recursively expand the open frontier in parallel: children,
+            # or their grandchildren when the subtree call already produced them
+            frontier = []
+            for child in node.children:
+                if child.children:
+                    frontier.extend((grandchild, current_depth + 2) for grandchild in child.children)
+                else:
+                    frontier.append((child, current_depth + 1))
+            frontier = [(n, depth) for n, depth in frontier if depth < target_depth]
+            
+            if frontier:
+                logger.info(f"  Expanding {len(frontier)} descendants of '{node.name}' in parallel...")
                 
                 expansion_tasks = [
                     self.expand_node_recursively(
-                        child,
-                        current_depth + 1,
+                        descendant,
+                        depth,
                         target_depth
                     )
-                    for child in node.children
+                    for descendant, depth in frontier
                 ]
                 
-                await asyncio.gather(*expansion_tasks)
+                # Siblings expand concurrently; one failing branch must not
+                # cancel the others
+                results = await asyncio.gather(*expansion_tasks, return_exceptions=True)
+                for (child, _), result in zip(frontier, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"  Error expanding '{child.name}': {result}")
+                        self.stats['errors'] += 1
                 
                 logger.info(f"  ✓ Completed expansion of children for '{node.name}'")
         
@@ -349,6 +395,164 @@ class RecursiveExpander:
             logger.error(f"  Error expanding '{node.name}': {e}", exc_info=True)
             self.stats['errors'] += 1
     
+    def _build_child_node(
+        self,
+        child_data: Dict[str, Any],
+        idx: int,
+        parent: NodeData,
+        level: int,
+        parent_paragraphs: List[str],
+        child_parent_range: List[int]
+    ) -> NodeData:
+        """
+        Create one child NodeData from an LLM child entry
+        
+        Positions in child_data are relative to parent_paragraphs (the content
+        sent in the expansion prompt); they are validated, clamped and converted
+        to absolute positions, and the child's content is extracted.
+        
+        Args:
+            child_data: Child entry from the LLM response
+            idx: Index of the child among its siblings
+            parent: Node the child hangs under
+            level: Level of the child
+            parent_paragraphs: Paragraphs of the content the positions refer to
+            child_parent_range: Absolute range the relative positions start from
+        
+        Returns:
+            The new child node (not yet attached to parent)
+        """
+        parent_paragraph_count = len(parent_paragraphs)
+        
+        # Extract actual text content from LLM (NEW)
+        child_key_claims_text = child_data.get('key_claims', [])  # List of actual claim texts
+        child_questions_text = child_data.get('questions_raised', [])  # List of actual question texts
+
+        # Validate and clamp positions
+        child_evidence_positions = child_data.get('evidence_positions', [])
+        child_claims_positions = child_data.get('key_claims_positions', [])
+        child_questions_positions = child_data.get('questions_positions', [])
+
+        # Validate positions
+        is_valid, errors = validate_positions(
+            child_evidence_positions + [[p, p] for p in child_claims_positions] + [[q, q] for q in child_questions_positions],
+            parent_paragraph_count
+        )
+
+        if not is_valid:
+            logger.warning(f"  Invalid positions in child '{child_data.get('name', 'Unknown')}': {errors}")
+            # Clamp to valid range
+            child_evidence_positions = clamp_positions_to_range(child_evidence_positions, parent_paragraph_count)
+            child_claims_positions = [max(0, min(p, parent_paragraph_count - 1)) for p in child_claims_positions]
+            child_questions_positions = [max(0, min(q, parent_paragraph_count - 1)) for q in child_questions_positions]
+
+        # Convert relative positions to absolute
+        abs_evidence_positions = convert_relative_to_absolute(
+            child_evidence_positions,
+            child_parent_range
+        )
+
+        abs_claims_positions = convert_relative_to_absolute(
+            [[pos] for pos in child_claims_positions],
+            child_parent_range
+        )
+
+        abs_questions_positions = convert_relative_to_absolute(
+            [[q] for q in child_questions_positions],
+            child_parent_range
+        )
+
+        # Determine child type based on level
+        child_type_map = {
+            0: 'domain',
+            1: 'category',
+            2: 'concept',
+            3: 'subconcept',
+            4: 'detail'
+        }
+        child_type = child_type_map.get(level, 'detail')
+
+        # Create deterministic ID using uuid
+        node_name_hash = f"{child_data.get('name', f'child-{idx}')}-{parent.id}-{idx}"
+        child_id = f"{child_type}-{uuid.uuid5(uuid.NAMESPACE_DNS, node_name_hash).hex[:8]}"
+
+        # Create child node
+        child_node = NodeData(
+            id=child_id,
+            name=child_data.get('name', f'Child {idx + 1}'),
+            synthesis=child_data.get('synthesis', ''),
+            level=level,
+            type=child_type,
+            evidence_positions=[pos if isinstance(pos, list) else [pos] for pos in abs_evidence_positions],
+            key_claims_positions=[pos[0] for pos in abs_claims_positions if isinstance(pos, list)],
+            questions_positions=[pos[0] if isinstance(pos, list) else pos for pos in abs_questions_positions],
+            parent_id=parent.id,
+            parent_range=child_parent_range,
+            # ✅ NEW: Store actual text from LLM (higher quality)
+            key_claims_text=child_key_claims_text if isinstance(child_key_claims_text, list) else [],
+            questions_raised_text=child_questions_text if isinstance(child_questions_text, list) else []
+        )
+
+        # Extract child content immediately
+        child_evidence_content = extract_content_from_positions(
+            child_evidence_positions,
+            parent_paragraphs,
+            parent_range=None  # Already relative
+        )
+        child_node.evidence_content = child_evidence_content
+
+        # Extract key claims (for backup/positions only - prefer key_claims_text)
+        if child_claims_positions:
+            child_claims_content = extract_content_from_positions(
+                [[p, p] for p in child_claims_positions],
+                parent_paragraphs,
+                parent_range=None
+            )
+            child_node.key_claims_content = child_claims_content
+
+        # Extract questions (for backup/positions only - prefer questions_raised_text)
+        if child_questions_positions:
+            child_questions_content = extract_content_from_positions(
+                [[q, q] for q in child_questions_positions],
+                parent_paragraphs,
+                parent_range=None
+            )
+            child_node.questions_content = child_questions_content
+        
+        return child_node
+    
+    async def _call_llm(self, **kwargs) -> Any:
+        """Call the LLM, bounded by max_concurrency when set"""
+        if self._llm_semaphore is None:
+            return await self.llm_caller(**kwargs)
+        async with self._llm_semaphore:
+            return await self.llm_caller(**kwargs)
+    
+    async def _call_llm_shared(self, key: Tuple[str, str, str, int, bool], **kwargs) -> Any:
+        """
+        Call the LLM once per expansion key for this run
+        
+        A node whose prompt matches an expansion already started (or finished)
+        awaits that call; its children are still built under its own id and
+        positions. Failed or empty results are dropped so the next node with
+        the same key retries instead of reusing them.
+        """
+        call = self._expansion_calls.get(key)
+        if call is None:
+            call = self._expansion_calls[key] = asyncio.ensure_future(self._call_llm(**kwargs))
+            self.stats['llm_calls'] += 1
+        else:
+            self.stats['shared_expansions'] += 1
+        try:
+            result = await call
+        except Exception:
+            if self._expansion_calls.get(key) is call:
+                del self._expansion_calls[key]
+            raise
+        if not result and self._expansion_calls.get(key) is call:
+            del self._expansion_calls[key]
+        return result
+    
     def get_all_nodes_flat(self, root: NodeData) -> List[NodeData]:
         """
         Flatten the tree to a list of all nodes
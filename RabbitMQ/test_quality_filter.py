@@ -2,59 +2,19 @@
 """
 Test Quality Filter - Demo Script
 
-This script demonstrates the quality filtering improvements in worker.py
+This script demonstrates the quality filter in src/recursive_expander.py
 """
 
 import sys
 import os
+import logging
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.recursive_expander import NodeData
+from src.recursive_expander import NodeData, is_valid_node
 from datetime import datetime, timezone
 
-# Simulate the quality filter function from worker.py
-def is_valid_node(node):
-    """
-    Validate node quality before inserting to Neo4j
-
-    Returns:
-        True if node meets quality standards, False otherwise
-    """
-    # Rule 1: Name must be meaningful (not generic)
-    if not node.name or len(node.name) < 3:
-        print(f"  ❌ Filtered '{node.name}': name too short")
-        return False
-
-    # Rule 2: Synthesis must have substance
-    min_synthesis_length = {
-        0: 50,   # domain: 50+ chars
-        1: 40,   # category: 40+ chars
-        2: 30,   # concept: 30+ chars
-        3: 20,   # subconcept: 20+ chars
-    }
-    required_length = min_synthesis_length.get(node.level, 20)
-    if not node.synthesis or len(node.synthesis) < required_length:
-        print(f"  ❌ Filtered '{node.name}': synthesis too short ({len(node.synthesis)} < {required_length})")
-        return False
-
-    # Rule 3: Must have evidence positions (except root domain)
-    if node.level > 0 and (not node.evidence_positions or len(node.evidence_positions) == 0):
-        print(f"  ❌ Filtered '{node.name}': no evidence positions")
-        return False
-
-    # Rule 4: Must have evidence content extracted
-    if node.level > 0 and (not node.evidence_content or len(node.evidence_content) == 0):
-        print(f"  ❌ Filtered '{node.name}': no evidence content extracted")
-        return False
-
-    # Rule 5: Avoid generic/templated names
-    generic_keywords = ['child', 'node', 'item', 'concept 1', 'category 1', 'unknown', 'untitled']
-    if any(keyword in node.name.lower() for keyword in generic_keywords):
-        print(f"  ❌ Filtered '{node.name}': generic name")
-        return False
-
-    print(f"  ✅ Passed '{node.name}'")
-    return True
+# Show the filter's per-node decisions
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 
 def test_quality_filter():
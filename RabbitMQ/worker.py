@@ -17,10 +17,14 @@ import sys
 import json
 import uuid
 import gc
+import time
 import traceback
 import asyncio
 import aiohttp
-from datetime import datetime
+import threading
+from contextlib import nullcontext
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional, Tuple
 from collections import OrderedDict
 from dotenv import load_dotenv
@@ -32,22 +36,23 @@ load_dotenv()
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.rabbitmq_client import RabbitMQClient
-from src.handler.firebase import FirebaseClient
+from src.handler.firebase import FirebaseClient, FirebaseWriter
 
 # Pipeline modules
 from src.pipeline.pdf_extraction import extract_pdf_fast
-from src.pipeline.chunking import create_smart_chunks
+from src.pipeline.chunking import iter_smart_chunks
 from src.pipeline.embedding import create_embedding_via_clova, calculate_similarity
 from src.pipeline.translation import translate_batch
 from src.pipeline.llm_analysis import extract_hierarchical_structure_compact, process_chunks_ultra_compact
-from src.pipeline.neo4j_graph import now_iso
+from src.pipeline.neo4j_graph import now_iso, ensure_neo4j_schema
+from src.pipeline.llm_cache import llm_response_cache
 from src.pipeline.qdrant_storage import store_chunks_in_qdrant
 
 from src.model.Evidence import Evidence
 from src.model.QdrantChunk import QdrantChunk
 
 # External dependencies
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, WRITE_ACCESS
 from qdrant_client import QdrantClient
 
 from src.config import (
@@ -56,9 +61,11 @@ from src.config import (
     QDRANT_API_KEY,
     QDRANT_BATCH_SIZE,QDRANT_HOST,QDRANT_PORT,
     QDRANT_TIMEOUT,QDRANT_URL, NEO4J_MAX_CONNECTION_LIFETIME,
+    NEO4J_MAX_CONNECTION_POOL_SIZE, NEO4J_CONNECTION_ACQUISITION_TIMEOUT, NEO4J_DATABASE,
     NEO4J_PASSWORD,NEO4J_URI,NEO4J_USER,NODE_TYPES,
-    CLOVA_API_KEY,CHUNK_SIZE,CLOVA_API_TIMEOUT,CLOVA_API_URL,
-    EMBEDDING_BATCH_SIZE,EMBEDDING_DIMENSION,
+    CLOVA_API_KEY,CHUNK_SIZE,OVERLAP,MAX_CHUNKS,CLOVA_API_TIMEOUT,CLOVA_API_URL,
+    EMBEDDING_BATCH_SIZE,EMBEDDING_DIMENSION,PDF_WORKERS,RABBITMQ_PREFETCH_COUNT,
+    FIREBASE_PROGRESS_INTERVAL,FIREBASE_PROGRESS_EVERY_N_FILES,
     MAX_RETRY_ATTEMPTS,MAX_CHUNK_TEXT_LENGTH,MAX_CONCEPTS_PER_NODE,MAX_EVIDENCE_PER_NODE,
     MAX_SYNTHESIS_LENGTH,MAX_RETRIES,
     PAPAGO_API_TIMEOUT,PAPAGO_CLIENT_SECRET,PAPAGO_CLIENT_ID
@@ -84,8 +91,20 @@ if not os.path.exists(FIREBASE_SERVICE_ACCOUNT):
     sys.exit(1)
 
 qdrant_client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-neo4j_driver = GraphDatabase.driver(NEO4J_URL, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# Pool sized for PDF_WORKERS parallel sessions; skip INFORMATION notifications on the wire
+neo4j_driver = GraphDatabase.driver(
+    NEO4J_URI,
+    auth=(NEO4J_USER, NEO4J_PASSWORD),
+    max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+    max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+    connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+    keep_alive=True,
+    notifications_min_severity="WARNING"
+)
 firebase_client = FirebaseClient(FIREBASE_SERVICE_ACCOUNT, FIREBASE_DATABASE_URL)
+# Progress updates go through a background writer so RTDB latency never blocks PDF processing
+firebase_writer = FirebaseWriter(firebase_client)
+firebase_writer.start()
 
 print("✓ Connected to Qdrant, Neo4j & Firebase")
 
@@ -105,17 +124,15 @@ def handle_job_message(message: Dict[str, Any]):
         if not file_paths or len(file_paths) == 0:
             raise ValueError("Missing or empty filePaths in message")
         
-        # Process only the first file
-        pdf_url = file_paths[0]
-        file_name = pdf_url.split('/')[-1]
-        
-        print(f"📌 Processing first file: {file_name}")
+        print(f"📌 Processing {len(file_paths)} file(s)")
         
-        # Process the PDF with ULTRA-OPTIMIZED pipeline
-        result = process_pdf_job_optimized(workspace_id, pdf_url, file_name, job_id)
+        # Process all PDFs with the ULTRA-OPTIMIZED pipeline
+        result = process_files_batch(workspace_id, file_paths, job_id)
         
-        # Push result to Firebase
+        # Push result to Firebase (after queued progress updates, so the final
+        # result is never overwritten by a late progress write)
         print(f"\n🔥 Pushing result to Firebase...")
+        firebase_writer.flush()
         firebase_client.push_job_result(job_id, result)
         print(f"✓ Result pushed to Firebase for job {job_id}")
         
@@ -127,6 +144,7 @@ def handle_job_message(message: Dict[str, Any]):
         # Try to push error to Firebase
         try:
             job_id = message.get("jobId") or message.get("JobId") or "unknown"
+            firebase_writer.flush()
             firebase_client.push_job_result(job_id, {
                 "status": "failed",
                 "error": error_msg,
@@ -437,10 +455,14 @@ Respond in JSON format:
         }
 
 
-def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, job_id: str) -> Dict[str, Any]:
+def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, job_id: str,
+                              session=None) -> Dict[str, Any]:
     """
     Process a single PDF through the ULTRA-OPTIMIZED pipeline
     
+    Pass `session` to reuse an open Neo4j session (one per worker thread);
+    otherwise a new session is opened for each graph phase.
+    
     NEW OPTIMIZATIONS:
     - Phase 2: Compact structure extraction (100 chars max synthesis)
     - Phase 3: Pre-compute ALL embeddings in batch
@@ -454,7 +476,7 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
     from src.pipeline.neo4j_graph import create_hierarchical_graph_ultra_aggressive
     from src.pipeline.resource_discovery import discover_resources_with_hyperclova
     
-    start_time = datetime.now()
+    start_time = time.monotonic()  # elapsed-time base; immune to wall-clock jumps
     file_id = str(uuid.uuid4())
     
     print(f"\n{'='*80}")
@@ -534,7 +556,8 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
         # =================================================================
         # PHASE 4: Process Chunks (ULTRA-COMPACT) - MOVED BEFORE GRAPH CREATION
         # =================================================================
-        chunks = create_smart_chunks(full_text, CHUNK_SIZE, OVERLAP)[:MAX_CHUNKS]
+        chunks = list(islice(iter_smart_chunks(full_text, CHUNK_SIZE, OVERLAP), MAX_CHUNKS))
+        del full_text
         print(f"\n⚡ Phase 4: Processing {len(chunks)} chunks (ULTRA-COMPACT)")
         
         # Use ultra-compact chunk processing
@@ -551,12 +574,12 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
         # =================================================================
         print(f"\n🔗 Phase 5: Building graph with ultra-aggressive deduplication")
         
-        with neo4j_driver.session() as session:
+        with (nullcontext(session) if session is not None else neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=WRITE_ACCESS)) as graph_session:
             from src.pipeline.neo4j_graph import create_hierarchical_graph_ultra_aggressive
             
             # FIXED: Pass lang and processed_chunks parameters correctly
             graph_stats = create_hierarchical_graph_ultra_aggressive(
-                session, workspace_id, structure, file_id, file_name,
+                graph_session, workspace_id, structure, file_id, file_name,
                 lang="en",  # Language after translation
                 processed_chunks=chunk_results  # Real chunk data for Evidence
             )
@@ -582,6 +605,7 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
         prev_chunk_id = ""
         prev_embedding = None
         chunks_without_results = 0
+        created_at = now_iso()
         
         # Create a dict for quick lookup of chunk results
         chunk_results_dict = {r.get('chunk_index', -1): r for r in chunk_results}
@@ -646,7 +670,7 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
                 workspace_id=workspace_id,
                 language="en",
                 source_language=lang,
-                created_at=now_iso(),
+                created_at=created_at,
                 hierarchy_path=hierarchy_path,
                 chunk_index=chunk_idx,
                 prev_chunk_id=prev_chunk_id,
@@ -684,9 +708,9 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
         # PHASE 8: Smart Resource Discovery (HyperCLOVA X Web Search)
         # =================================================================
         print(f"\n🔍 Phase 8: Discovering academic resources (HyperCLOVA X Web Search)")
-        with neo4j_driver.session() as session:
+        with (nullcontext(session) if session is not None else neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=WRITE_ACCESS)) as discovery_session:
             resource_count = discover_resources_with_hyperclova(
-                session, workspace_id,
+                discovery_session, workspace_id,
                 CLOVA_API_KEY, CLOVA_API_URL
             )
             print(f"✓ Found {resource_count} academic resources")
@@ -694,7 +718,7 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
         # =================================================================
         # SUMMARY
         # =================================================================
-        processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
+        processing_time = int((time.monotonic() - start_time) * 1000)
         
         print(f"\n{'='*80}")
         print(f"✅ ULTRA-OPTIMIZED PIPELINE COMPLETED in {processing_time}ms ({processing_time/1000:.1f}s)")
@@ -756,15 +780,145 @@ def process_pdf_job_optimized(workspace_id: str, pdf_url: str, file_name: str, j
             "fileName": file_name,
             "workspaceId": workspace_id,
             "error": str(e),
-            "processingTimeMs": int((datetime.now() - start_time).total_seconds() * 1000)
+            "processingTimeMs": int((time.monotonic() - start_time) * 1000)
+        }
+        
+def process_files_batch(workspace_id: str, file_paths: List[str], job_id: str) -> Dict[str, Any]:
+    """
+    Process every PDF of a job concurrently.
+    
+    Each file is I/O-bound (download, CLOVA calls, Neo4j writes), so files are
+    submitted to a thread pool and overlap their latency. The Neo4j driver is
+    thread-safe but its sessions are not, so each worker thread opens one session
+    and reuses it for every file it processes; all are closed at the end.
+    
+    Args:
+        workspace_id: Workspace ID
+        file_paths: List of PDF URLs
+        job_id: Job ID used for Firebase progress updates
+    
+    Returns:
+        Aggregated job result with per-file results
+    """
+    start_time = time.monotonic()  # elapsed-time base; immune to wall-clock jumps
+    total_files = len(file_paths)
+    results: List[Dict[str, Any]] = []
+    counters = {"successful": 0, "failed": 0}
+    counters_lock = threading.Lock()
+    
+    max_workers = max(1, min(PDF_WORKERS, total_files))
+    print(f"⚡ Processing {total_files} file(s) with {max_workers} worker thread(s)")
+    
+    # Neo4j sessions are not thread-safe: keep one per worker thread and reuse
+    # it for every file that thread processes
+    thread_state = threading.local()
+    open_sessions = []
+    
+    def process_with_thread_session(pdf_url: str) -> Dict[str, Any]:
+        session = getattr(thread_state, "session", None)
+        if session is None:
+            session = neo4j_driver.session(database=NEO4J_DATABASE, default_access_mode=WRITE_ACCESS)
+            thread_state.session = session
+            with counters_lock:
+                open_sessions.append(session)
+        return process_pdf_job_optimized(
+            workspace_id, pdf_url, pdf_url.split('/')[-1], job_id, session=session
+        )
+    
+    last_push_time = time.monotonic()
+    last_pushed_count = 0
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(process_with_thread_session, pdf_url): pdf_url
+            for pdf_url in file_paths
         }
         
+        # Progress is reported in completion order, not submission order
+        for future in as_completed(futures):
+            pdf_url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                traceback.print_exc()
+                result = {
+                    "status": "failed",
+                    "jobId": job_id,
+                    "fileName": pdf_url.split('/')[-1],
+                    "workspaceId": workspace_id,
+                    "error": str(e)
+                }
+            
+            with counters_lock:
+                if result.get("status") == "completed":
+                    counters["successful"] += 1
+                else:
+                    counters["failed"] += 1
+                processed = counters["successful"] + counters["failed"]
+            results.append(result)
+            
+            print(f"📊 Progress: {processed}/{total_files} ({result.get('fileName', pdf_url)}: {result.get('status')})")
+            
+            # Debounce RTDB writes: at most one progress push per interval or
+            # every N files. The final result push after the batch is unconditional.
+            now = time.monotonic()
+            if (processed - last_pushed_count >= FIREBASE_PROGRESS_EVERY_N_FILES
+                    or now - last_push_time >= FIREBASE_PROGRESS_INTERVAL):
+                firebase_writer.submit(job_id, {
+                    "status": "processing",
+                    "processedFiles": processed,
+                    "totalFiles": total_files,
+                    "successful": counters["successful"],
+                    "failed": counters["failed"]
+                })
+                last_push_time = now
+                last_pushed_count = processed
+    
+    for session in open_sessions:
+        try:
+            session.close()
+        except Exception as e:
+            print(f"⚠️  Failed to close Neo4j session: {e}")
+    
+    processing_time = int((time.monotonic() - start_time) * 1000)
+    
+    cache_stats = llm_response_cache.get_stats()
+    print(f"🧠 LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']})")
+    
+    if counters["successful"] == total_files:
+        status = "completed"
+    elif counters["successful"] > 0:
+        status = "partial"
+    else:
+        status = "failed"
+    
+    return {
+        "status": status,
+        "jobId": job_id,
+        "workspaceId": workspace_id,
+        "totalFiles": total_files,
+        "successful": counters["successful"],
+        "failed": counters["failed"],
+        "processingTimeMs": processing_time,
+        "results": results
+    }
+
+
 def main():
     """Main worker loop"""
     print("\n" + "="*80)
     print("🤖 RabbitMQ Worker Starting...")
     print("="*80)
     
+    # Bootstrap Neo4j constraints/indexes (idempotent)
+    try:
+        server_info = neo4j_driver.get_server_info()
+        print(f"✓ Neo4j {server_info.agent} at {server_info.address} "
+              f"(pool size {NEO4J_MAX_CONNECTION_POOL_SIZE})")
+        ensure_neo4j_schema(neo4j_driver)
+    except Exception as e:
+        print(f"⚠️  Could not bootstrap Neo4j schema: {e}")
+    
     # Connect to RabbitMQ
     rabbitmq_client = RabbitMQClient(RABBITMQ_CONFIG)
     rabbitmq_client.connect()
@@ -775,7 +929,8 @@ def main():
     
     try:
         # Start consuming messages
-        rabbitmq_client.consume_messages(QUEUE_NAME,handle_job_message )
+        # Jobs run off the connection thread; RABBITMQ_PREFETCH_COUNT of them at once
+        rabbitmq_client.consume_messages(QUEUE_NAME, handle_job_message, prefetch_count=RABBITMQ_PREFETCH_COUNT)
     except KeyboardInterrupt:
         print("\n\n⚠ Worker interrupted by user")
     except Exception as e:
@@ -784,6 +939,7 @@ def main():
     finally:
         print("\n🔌 Closing connections...")
         rabbitmq_client.close()
+        firebase_writer.stop()
         neo4j_driver.close()
         print("✓ Worker shut down gracefully")
 